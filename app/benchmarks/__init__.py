@@ -0,0 +1 @@
+"""Benchmarks (not part of the runtime package)."""
@@ -0,0 +1,146 @@
+"""
+Compara o tempo de CPU da análise de áudio: caminho antigo vs front end único.
+
+Uso (a partir de `app/`):
+    python -m benchmarks.bench_audio --seconds 10 60 --output bench_audio.json
+
+Gera gravações sintéticas (voz com harmónicos, vibrato e pausas, f0 conhecido)
+em WAV e mede o tempo de CPU do processo para:
+
+- antigo: descodificação pelo Whisper (ffmpeg) para transcrever + segunda
+  descodificação com `librosa.load(duration=5)` + `librosa.feature.rms` +
+  `librosa.piptrack` (só os primeiros 5s);
+- novo: uma descodificação (`decode_audio`) + RMS e YIN sobre a gravação inteira.
+
+A transcrição em si não é medida (é igual nos dois caminhos). Sem Whisper/ffmpeg
+o caminho novo lê o WAV com o módulo `wave` e a descodificação extra do caminho
+antigo não é contada (`speedup` compara então só as características de voz).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import wave
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+from src.audio_frontend import AudioClip, SAMPLE_RATE, decode_audio, voice_features
+
+
+def synth_voice(seconds: float, f0: float = 180.0, sample_rate: int = 44100, seed: int = 7) -> np.ndarray:
+    """Sinal tipo voz: harmónicos de `f0` com vibrato, envelope silábico e pausas."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = f0 * (1 + 0.02 * np.sin(2 * np.pi * 5 * t))
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 2.5 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.5)
+    return (0.1 * signal * envelope + rng.normal(0, 0.002, len(t))).astype(np.float32)
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int) -> None:
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def _read_wav_16k(path: str) -> AudioClip:
+    with wave.open(path, "rb") as f:
+        rate = f.getframerate()
+        pcm = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2").astype(np.float32) / 32768
+    # reamostragem linear (só para o fallback sem ffmpeg)
+    positions = np.arange(0, len(pcm), rate / SAMPLE_RATE)
+    return AudioClip(np.interp(positions, np.arange(len(pcm)), pcm).astype(np.float32))
+
+
+def _cpu(fn: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.process_time()
+        result = fn()
+        best = min(best, time.process_time() - start)
+    return best, result
+
+
+def old_decode(path: str) -> None:
+    """A descodificação feita pelo `transcribe` antigo (além da do librosa)."""
+    import whisper
+
+    whisper.load_audio(path)
+
+
+def old_features(path: str) -> Tuple[float, float]:
+    import librosa
+
+    y, sr = librosa.load(path, duration=5)
+    avg_energy = float(np.mean(librosa.feature.rms(y=y)))
+    pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
+    indices = magnitudes > np.median(magnitudes)
+    avg_pitch = float(np.mean(pitches[indices])) if np.any(indices) else 0.0
+    return avg_energy, avg_pitch
+
+
+def new_path(path: str) -> Tuple[float, float]:
+    try:
+        clip = decode_audio(path)
+    except ImportError:
+        clip = _read_wav_16k(path)
+    return voice_features(clip)
+
+
+def run(durations, f0: float, repeat: int) -> Dict[str, object]:
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in durations:
+            path = os.path.join(tmp, f"voz_{seconds}s.wav")
+            write_wav(path, synth_voice(seconds, f0), 44100)
+            entry: Dict[str, object] = {"seconds": seconds, "true_f0": f0}
+            cpu, (energy, pitch) = _cpu(lambda: new_path(path), repeat)
+            entry["new"] = {"cpu_s": round(cpu, 4), "energia": round(energy, 4), "pitch": round(pitch, 2)}
+            old: Dict[str, object] = {}
+            try:
+                cpu, (energy, pitch) = _cpu(lambda: old_features(path), repeat)
+                old.update(features_cpu_s=round(cpu, 4), energia=round(energy, 4), pitch=round(pitch, 2))
+            except ImportError as exc:
+                old["features_skipped"] = f"missing dependency: {exc.name}"
+            try:
+                cpu, _ = _cpu(lambda: old_decode(path), repeat)
+                old["decode_cpu_s"] = round(cpu, 4)
+            except ImportError as exc:
+                old["decode_skipped"] = f"missing dependency: {exc.name}"
+            if "features_cpu_s" in old and "decode_cpu_s" in old:
+                old["cpu_s"] = round(old["features_cpu_s"] + old["decode_cpu_s"], 4)
+            entry["old"] = old
+            baseline = old.get("cpu_s", old.get("features_cpu_s"))
+            if baseline and entry["new"]["cpu_s"]:
+                entry["speedup"] = round(baseline / entry["new"]["cpu_s"], 2)
+            runs.append(entry)
+    return {"repeat": repeat, "runs": runs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[5, 30, 120])
+    parser.add_argument("--f0", type=float, default=180.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="ficheiro JSON para os resultados")
+    args = parser.parse_args()
+
+    report = run(args.seconds, args.f0, args.repeat)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
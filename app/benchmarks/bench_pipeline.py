@@ -0,0 +1,226 @@
+"""
+Benchmark do NLPPipeline: throughput, latência p50/p99 e pico de RSS.
+
+Uso (a partir de `app/`):
+    python -m benchmarks.bench_pipeline --sizes 1000 10000 --output bench_pipeline.json
+    python -m benchmarks.bench_pipeline --sizes 1000 --compare bench_pipeline.json
+
+Para cada tamanho de corpus (sintético, ver `benchmarks.corpus`, ou as frases
+de `data/test_sentences.json` repetidas com `--fixture`) são feitas duas
+passagens com a cache de correções vazia:
+
+- por etapa: Normalizer, SpellChecker, SimpleNLPParser, RuleBasedClassifier e
+  SentimentAnalyzer cronometrados individualmente para cada frase;
+- ponta a ponta: `NLPPipeline.process` por frase.
+
+O pico de RSS (`ru_maxrss`) é lido depois de cada passagem; como nunca desce,
+os valores de tamanhos maiores incluem os anteriores. Com `--compare` o
+throughput é comparado com um ficheiro de resultados anterior e o programa
+sai com código 1 se alguma etapa ficar mais lenta do que `--tolerance`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from src.pipeline import STAGES, NLPPipeline, PipelineConfig
+
+from .corpus import CorpusSpec, generate_corpus, load_fixture
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devolve KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies: Sequence[float]) -> Dict[str, float]:
+    """Throughput (frases/s) e percentis (ms) de uma lista de latências em segundos."""
+    ordered = sorted(latencies)
+    n = len(ordered)
+    if not n:
+        return {"sentences": 0, "total_s": 0.0, "throughput": 0.0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+    total = sum(ordered)
+    return {
+        "sentences": n,
+        "total_s": round(total, 4),
+        "throughput": round(n / total, 1) if total else 0.0,
+        "mean_ms": round(1000 * total / n, 4),
+        "p50_ms": round(1000 * ordered[n // 2], 4),
+        "p99_ms": round(1000 * ordered[min(n - 1, int(n * 0.99))], 4),
+    }
+
+
+def bench_stages(pipeline: NLPPipeline, texts: Sequence[str]) -> Dict[str, Dict[str, float]]:
+    """Cronometra cada etapa separadamente (mesma sequência que `NLPPipeline.process`)."""
+    clock = time.perf_counter
+    latencies = {stage: array("d") for stage in STAGES}
+    normalize = pipeline.normalizer.normalize
+    correct = pipeline.spellchecker.correct_sentence
+    classify = pipeline.classifier.classify
+    analyze = pipeline.sentiment.analyze_parsed
+    for text in texts:
+        t0 = clock()
+        normalized = normalize(text)
+        t1 = clock()
+        corrected_text, corrections = correct(normalized.cleaned, normalized.spans)
+        t2 = clock()
+        parsed = pipeline._parse(normalized, corrected_text, corrections)
+        t3 = clock()
+        classify(parsed, corrected_text)
+        t4 = clock()
+        analyze(parsed)
+        t5 = clock()
+        latencies["normalizer"].append(t1 - t0)
+        latencies["spellchecker"].append(t2 - t1)
+        latencies["parser"].append(t3 - t2)
+        latencies["classifier"].append(t4 - t3)
+        latencies["sentiment"].append(t5 - t4)
+    return {stage: summarize(values) for stage, values in latencies.items()}
+
+
+def bench_end_to_end(pipeline: NLPPipeline, texts: Sequence[str]) -> Dict[str, float]:
+    clock = time.perf_counter
+    process = pipeline.process
+    latencies = array("d")
+    for text in texts:
+        start = clock()
+        process(text)
+        latencies.append(clock() - start)
+    return summarize(latencies)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(sizes: Sequence[int], spec: CorpusSpec, fixture: bool = False) -> Dict[str, object]:
+    started = time.perf_counter()
+    pipeline = NLPPipeline(config=PipelineConfig(spellchecker_engine="symspell"))
+    pipeline.spellchecker.correct_sentence("warmup")  # constrói o índice SymSpell
+    setup_seconds = time.perf_counter() - started
+
+    report: Dict[str, object] = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "corpus": "fixture" if fixture else spec.to_dict(),
+        },
+        "setup_s": round(setup_seconds, 3),
+        "setup_peak_rss_mb": peak_rss_mb(),
+        "runs": [],
+    }
+    for size in sizes:
+        if fixture:
+            texts = load_fixture(size=size)
+        else:
+            spec.size = size
+            texts = list(generate_corpus(spec))
+
+        pipeline.spellchecker.cache.clear()
+        stages = bench_stages(pipeline, texts)
+        stages_rss = peak_rss_mb()
+        pipeline.spellchecker.cache.clear()
+        end_to_end = bench_end_to_end(pipeline, texts)
+        report["runs"].append({
+            "size": size,
+            "stages": stages,
+            "end_to_end": end_to_end,
+            "peak_rss_mb": {"stages": stages_rss, "end_to_end": peak_rss_mb()},
+        })
+        print(
+            f"{size:>9} frases: {end_to_end['throughput']:>10.1f} frases/s  "
+            f"p50 {end_to_end['p50_ms']:.3f} ms  p99 {end_to_end['p99_ms']:.3f} ms",
+            file=sys.stderr,
+        )
+    return report
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Lista de regressões de throughput (> `tolerance`) face a `baseline`, por tamanho e etapa."""
+    previous = {run["size"]: run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in report["runs"]:
+        old = previous.get(run["size"])
+        if old is None:
+            continue
+        pairs = [("end_to_end", run["end_to_end"], old["end_to_end"])]
+        pairs += [(stage, run["stages"][stage], old["stages"].get(stage)) for stage in run["stages"]]
+        for name, new_stats, old_stats in pairs:
+            if not old_stats or not old_stats["throughput"]:
+                continue
+            ratio = new_stats["throughput"] / old_stats["throughput"]
+            if ratio < 1 - tolerance:
+                regressions.append(
+                    f"{run['size']} {name}: {old_stats['throughput']:.1f} -> "
+                    f"{new_stats['throughput']:.1f} frases/s ({ratio - 1:+.1%})"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="tamanhos de corpus (ex.: 1000 10000 100000 1000000)")
+    parser.add_argument("--fixture", action="store_true", help="usar data/test_sentences.json repetido")
+    parser.add_argument("--en-ratio", type=float, default=CorpusSpec.en_ratio)
+    parser.add_argument("--typo-rate", type=float, default=CorpusSpec.typo_rate)
+    parser.add_argument("--negation-rate", type=float, default=CorpusSpec.negation_rate)
+    parser.add_argument("--question-rate", type=float, default=CorpusSpec.question_rate)
+    parser.add_argument("--length", type=int, default=CorpusSpec.mean_length, help="palavras por frase (média)")
+    parser.add_argument("--seed", type=int, default=CorpusSpec.seed)
+    parser.add_argument("--output", help="ficheiro JSON para os resultados")
+    parser.add_argument("--compare", help="resultados anteriores (JSON) para detetar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="perda de throughput tolerada (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    spec = CorpusSpec(
+        en_ratio=args.en_ratio,
+        typo_rate=args.typo_rate,
+        negation_rate=args.negation_rate,
+        question_rate=args.question_rate,
+        mean_length=args.length,
+        seed=args.seed,
+    )
+    report = run(args.sizes, spec, fixture=args.fixture)
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        for line in regressions:
+            print(f"REGRESSÃO {line}", file=sys.stderr)
+        status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
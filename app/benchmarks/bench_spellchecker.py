@@ -0,0 +1,93 @@
+"""
+Compara os motores de correção do SpellChecker (symspell vs pyspellchecker).
+
+Uso (a partir de `app/`):
+    python -m benchmarks.bench_spellchecker --words 200 --output bench_spell.json
+
+Gera gralhas sintéticas (1-2 edições) sobre palavras PT do dicionário e mede
+a latência de `_suggest` em cada motor, bem como a concordância das
+sugestões. Diferenças entre candidatos com a mesma frequência são contadas à
+parte: o pyspellchecker desempata pela ordem (arbitrária) de um `set`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+from src.spellchecker import CorrectionCache, SpellChecker
+
+from .corpus import make_typo
+
+
+def _time_engine(checker: SpellChecker, words: List[str]) -> Dict[str, object]:
+    latencies = []
+    suggestions = []
+    for word in words:
+        start = time.perf_counter()
+        suggestions.append(checker._suggest(word))
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "suggestions": suggestions,
+        "mean_ms": 1000 * sum(latencies) / len(latencies),
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p99_ms": 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def run(n_words: int, seed: int) -> Dict[str, object]:
+    rng = random.Random(seed)
+    symspell = SpellChecker(cache=CorrectionCache(), engine="symspell")
+    pyspell = SpellChecker(cache=CorrectionCache(), engine="pyspellchecker")
+
+    start = time.perf_counter()
+    symspell.index  # construção do índice (uma vez por processo)
+    build_seconds = time.perf_counter() - start
+
+    vocabulary = sorted(symspell.spell_pt.word_frequency.dictionary)
+    queries = [make_typo(w, rng) for w in rng.sample(vocabulary, n_words)]
+    queries = [q for q in queries if not symspell._is_known(q)]
+
+    fast = _time_engine(symspell, queries)
+    slow = _time_engine(pyspell, queries)
+
+    freq = symspell.spell_pt.word_frequency.dictionary
+    agree = ties = 0
+    for a, b in zip(fast["suggestions"], slow["suggestions"]):
+        if a == b:
+            agree += 1
+        elif a and b and freq[a.lower()] == freq[b.lower()]:
+            ties += 1
+
+    return {
+        "queries": len(queries),
+        "symspell_index_build_s": round(build_seconds, 3),
+        "symspell": {k: round(v, 4) for k, v in fast.items() if k != "suggestions"},
+        "pyspellchecker": {k: round(v, 4) for k, v in slow.items() if k != "suggestions"},
+        "speedup_mean": round(slow["mean_ms"] / fast["mean_ms"], 1) if fast["mean_ms"] else None,
+        "agreement": agree / len(queries) if queries else 1.0,
+        "equal_frequency_ties": ties,
+        "mismatches": len(queries) - agree - ties,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="ficheiro JSON para os resultados")
+    args = parser.parse_args()
+
+    report = run(args.words, args.seed)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Tempo de arranque: imports e construção do pipeline, contra um orçamento.
+
+Uso (a partir de `app/`):
+    python -m benchmarks.bench_startup --repeat 5 --output bench_startup.json
+
+Cada medição corre num interpretador novo (`sys.executable`), para que nada
+venha já importado ou em cache, e o valor reportado é a mediana de
+`--repeat` execuções. O arranque do próprio Python não conta. Passos medidos:
+
+- `import src.pipeline`, `import src.cli`, `import src.audio` (por esta
+  ordem: cada um conta só o que os anteriores ainda não importaram);
+- `NLPPipeline()`: com as etapas preguiçosas não carrega dicionários;
+- primeira `process()` (frase sem erros: carrega os dicionários) e
+  `warmup()` de um pipeline com `spellchecker_engine="symspell"` (constrói
+  o índice), só para referência;
+
+e, para cada import, que módulos pesados (Whisper, PyTorch, NumPy,
+Streamlit, pyspellchecker) ficaram carregados. O programa sai com código 1 se
+algum passo passar do orçamento (`BUDGET_MS`, ajustável com `--scale` em
+máquinas lentas) ou se um import trouxer um módulo pesado proibido.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Orçamento (ms, mediana) de cada passo; None = só reportado.
+BUDGET_MS: Dict[str, Optional[float]] = {
+    "import_pipeline": 100.0,
+    "import_cli": 30.0,
+    "import_audio": 30.0,
+    "construct_pipeline": 5.0,
+    "first_process": None,
+    "warmup": None,
+}
+
+HEAVY_MODULES = ("whisper", "torch", "numpy", "streamlit", "spellchecker")
+# Módulos pesados que cada import não pode carregar
+FORBIDDEN = {
+    "import_pipeline": HEAVY_MODULES,
+    "import_cli": HEAVY_MODULES,
+    "import_audio": HEAVY_MODULES,
+}
+
+# Corre no interpretador novo: imprime {passo: ms} e os módulos pesados carregados.
+_PROBE = r"""
+import json, sys, time
+clock = time.perf_counter
+heavy = {heavy!r}
+def loaded():
+    return sorted(name for name in heavy if name in sys.modules)
+timings, modules = {{}}, {{}}
+start = clock()
+import src.pipeline
+timings["import_pipeline"] = clock() - start
+modules["import_pipeline"] = loaded()
+start = clock()
+import src.cli
+timings["import_cli"] = clock() - start
+modules["import_cli"] = loaded()
+start = clock()
+import src.audio
+timings["import_audio"] = clock() - start
+modules["import_audio"] = loaded()
+start = clock()
+pipeline = src.pipeline.NLPPipeline()
+timings["construct_pipeline"] = clock() - start
+start = clock()
+pipeline.process("Eu gosto muito disto!")
+timings["first_process"] = clock() - start
+symspell = src.pipeline.NLPPipeline(config=src.pipeline.PipelineConfig(spellchecker_engine="symspell"))
+start = clock()
+symspell.warmup()
+timings["warmup"] = clock() - start
+print(json.dumps({{"timings": timings, "modules": modules}}))
+"""
+
+
+def probe() -> Dict[str, Dict]:
+    """Uma execução num processo novo (a partir de `app/`)."""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (app_dir, env.get("PYTHONPATH"))))
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=app_dir, env=env, capture_output=True, text=True, check=True,
+    )
+    # a última linha é o JSON (o pipeline escreve avisos de carregamento antes)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int, scale: float) -> Dict:
+    runs = [probe() for _ in range(repeat)]
+    steps: Dict[str, Dict] = {}
+    failures: List[str] = []
+    for step, budget in BUDGET_MS.items():
+        samples = [run_["timings"][step] * 1000 for run_ in runs]
+        median = statistics.median(samples)
+        limit = budget * scale if budget is not None else None
+        entry = {
+            "median_ms": round(median, 2),
+            "min_ms": round(min(samples), 2),
+            "max_ms": round(max(samples), 2),
+            "budget_ms": round(limit, 2) if limit is not None else None,
+        }
+        if limit is not None and median > limit:
+            failures.append(f"{step}: {median:.1f} ms > {limit:.1f} ms")
+        if step in runs[0]["modules"]:
+            heavy = runs[0]["modules"][step]
+            entry["heavy_modules"] = heavy
+            forbidden = sorted(set(heavy).intersection(FORBIDDEN.get(step, ())))
+            if forbidden:
+                failures.append(f"{step}: imported {', '.join(forbidden)}")
+        steps[step] = entry
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "steps": steps,
+        "failures": failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplicador do orçamento (máquinas lentas)")
+    parser.add_argument("--output", help="ficheiro JSON para os resultados")
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.scale)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if report["failures"]:
+        print("\n".join(f"fora do orçamento: {failure}" for failure in report["failures"]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
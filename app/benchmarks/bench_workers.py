@@ -0,0 +1,118 @@
+"""
+Memória por worker: dicionários privados vs dicionários partilhados.
+
+Uso (a partir de `app/`):
+    python -m benchmarks.bench_workers --workers 4 --output bench_workers.json
+
+Para cada modo cria um conjunto de `--workers` processos (como o
+`process_batch`), aquece o pipeline de cada um (dicionários e índice
+SymSpell), processa um bloco do corpus sintético e lê a memória de cada
+worker em `/proc/<pid>/smaps_rollup`:
+
+- `private`: cada worker carrega os dicionários do pyspellchecker e constrói
+  o seu índice (o comportamento por omissão);
+- `shared`: o processo pai cria uma vez o ficheiro de `src.shared_dictionaries`
+  e os workers só o mapeiam.
+
+RSS conta as páginas partilhadas em todos os processos que as usam; PSS
+divide-as pelos processos que as partilham (a soma dos PSS é a memória real
+do conjunto) e USS são as páginas só desse worker.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from src import pipeline as pipeline_module
+from src.pipeline import NLPPipeline, PipelineConfig, _init_worker
+
+from .corpus import CorpusSpec, generate_corpus
+
+
+def memory_mb(pid: str = "self") -> Dict[str, float]:
+    """RSS, PSS e USS (MiB) de um processo, a partir de `smaps_rollup` (Linux)."""
+    fields: Dict[str, float] = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": round(fields.get("Rss", 0.0), 1),
+        "pss": round(fields.get("Pss", 0.0), 1),
+        "uss": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 1),
+    }
+
+
+def _init_and_warm(config: PipelineConfig) -> None:
+    _init_worker(False, None, config)
+    pipeline_module._WORKER_PIPELINE.warmup()
+
+
+def _work(chunk: List[str], barrier) -> Dict:
+    pipeline_module._WORKER_PIPELINE._process_chunk(chunk)
+    # todos os workers chegam aqui antes de medir: cada tarefa corre num worker diferente
+    barrier.wait()
+    return {"pid": os.getpid(), **memory_mb()}
+
+
+def run_mode(config: PipelineConfig, workers: int, texts: List[str]) -> Dict:
+    started = time.perf_counter()
+    parent = NLPPipeline(config=config)
+    parent.prepare_workers()
+    prepared = time.perf_counter() - started
+    chunks = [texts[i::workers] for i in range(workers)]
+    with multiprocessing.Manager() as manager:
+        barrier = manager.Barrier(workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_and_warm, initargs=(config,)) as executor:
+            samples = list(executor.map(_work, chunks, [barrier] * workers))
+    total = time.perf_counter() - started
+    summary = {
+        key: round(statistics.mean(sample[key] for sample in samples), 1) for key in ("rss", "pss", "uss")
+    }
+    return {
+        "prepare_s": round(prepared, 2),
+        "total_s": round(total, 2),
+        "parent": memory_mb(),
+        "per_worker_mean": summary,
+        "workers_pss_total": round(sum(sample["pss"] for sample in samples), 1),
+        "workers": samples,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sentences", type=int, default=2000)
+    parser.add_argument("--shared-dictionaries", help="ficheiro dos dicionários partilhados (por omissão temporário)")
+    parser.add_argument("--output", help="ficheiro JSON para os resultados")
+    args = parser.parse_args()
+
+    texts = list(generate_corpus(CorpusSpec(size=args.sentences, seed=5)))
+    path: Optional[str] = args.shared_dictionaries
+    with tempfile.TemporaryDirectory() as tmp:
+        if path is None:
+            path = os.path.join(tmp, "dicionarios.bin")
+        report = {
+            "workers": args.workers,
+            "sentences": args.sentences,
+            "private": run_mode(PipelineConfig(spellchecker_engine="symspell"), args.workers, texts),
+            "shared": run_mode(PipelineConfig(shared_dictionaries=path), args.workers, texts),
+            "shared_file_mb": round(os.path.getsize(path) / (1 << 20), 1),
+        }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Gerador de corpora sintéticos PT/EN para os benchmarks.
+
+As frases são montadas a partir de vocabulário fixo (sujeitos, verbos,
+palavras dos dicionários e termos do léxico de sentimento) com parâmetros
+controlados: proporção de frases em inglês, taxa de gralhas por palavra,
+densidade de negações e comprimento médio. Com a mesma semente o corpus é
+sempre o mesmo, o que permite comparar resultados entre commits.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyzáéíóúâêôãõç"
+
+VOCABULARY: Dict[str, Dict[str, List[str]]] = {
+    "pt": {
+        "subjects": ["eu", "a nicole", "o professor", "nós", "a equipa", "o relatório", "segundo o estudo,"],
+        "verbs": ["acho que", "sinto que", "vi que", "disse que", "penso que", "anda", "vai", "fica"],
+        "negations": ["não", "nunca", "nem", "sem", "jamais"],
+        "sentiment": [
+            "feliz", "triste", "excelente", "horrível", "medo", "raiva", "fantástico",
+            "infelizmente", "nojento", "surpresa", "chato", "lindo", "cansado", "ansioso",
+        ],
+        "fillers": [
+            "de", "bicicleta", "durante", "tarde", "casa", "trabalho", "escola", "hoje",
+            "amanhã", "muito", "sempre", "com", "para", "os", "alunos", "viagem", "dia",
+            "cidade", "carro", "comida", "filme", "jogo", "dados", "resultado",
+        ],
+        "questions": ["quando", "porque", "como", "onde"],
+    },
+    "en": {
+        "subjects": ["i", "my friend", "the teacher", "we", "the team", "the report", "according to the study,"],
+        "verbs": ["think that", "feel that", "saw that", "said that", "believe", "went", "is", "looks"],
+        "negations": ["not", "never", "no", "without", "don't"],
+        "sentiment": [
+            "happy", "sad", "great", "terrible", "afraid", "angry", "amazing",
+            "disappointed", "gross", "surprise", "annoying", "love", "tired", "scared",
+        ],
+        "fillers": [
+            "the", "bike", "during", "afternoon", "home", "work", "school", "today",
+            "tomorrow", "very", "always", "with", "for", "students", "trip", "day",
+            "city", "car", "food", "movie", "game", "data", "result",
+        ],
+        "questions": ["when", "why", "how", "where"],
+    },
+}
+
+
+@dataclass
+class CorpusSpec:
+    """Parâmetros de um corpus sintético."""
+
+    size: int = 1000
+    en_ratio: float = 0.3  # proporção de frases em inglês
+    typo_rate: float = 0.05  # probabilidade de gralha por palavra
+    negation_rate: float = 0.3  # proporção de frases com negação
+    question_rate: float = 0.1
+    mean_length: int = 10  # palavras por frase (média)
+    seed: int = 7
+
+    def to_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+def make_typo(word: str, rng: random.Random) -> str:
+    """Aplica 1-2 edições aleatórias (apagar, inserir, trocar, substituir)."""
+    for _ in range(rng.choice((1, 1, 2))):
+        i = rng.randrange(len(word) + 1)
+        op = rng.random()
+        if op < 0.3 and len(word) > 1:
+            word = word[:i] + word[i + 1:]
+        elif op < 0.6:
+            word = word[:i] + rng.choice(ALPHABET) + word[i:]
+        elif op < 0.8 and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(ALPHABET) + word[i + 1:]
+    return word
+
+
+def _sentence(spec: CorpusSpec, rng: random.Random) -> str:
+    vocab = VOCABULARY["en" if rng.random() < spec.en_ratio else "pt"]
+    length = max(3, int(rng.gauss(spec.mean_length, spec.mean_length / 4)))
+    question = rng.random() < spec.question_rate
+
+    words: List[str] = []
+    if question:
+        words.append(rng.choice(vocab["questions"]))
+    words.extend(rng.choice(vocab["subjects"]).split())
+    words.extend(rng.choice(vocab["verbs"]).split())
+    if rng.random() < spec.negation_rate:
+        words.append(rng.choice(vocab["negations"]))
+    words.append(rng.choice(vocab["sentiment"]))
+    fillers = vocab["fillers"]
+    while len(words) < length:
+        words.append(rng.choice(fillers))
+
+    if spec.typo_rate:
+        words = [
+            make_typo(word, rng) if len(word) > 2 and rng.random() < spec.typo_rate else word
+            for word in words
+        ]
+    text = " ".join(words)
+    ending = "?" if question else rng.choice((".", ".", "!", ""))
+    return text[0].upper() + text[1:] + ending
+
+
+def generate_corpus(spec: CorpusSpec) -> Iterator[str]:
+    """Gera `spec.size` frases (de forma preguiçosa e determinística)."""
+    rng = random.Random(spec.seed)
+    for _ in range(spec.size):
+        yield _sentence(spec, rng)
+
+
+def load_fixture(path: str = os.path.join(DATA_DIR, "test_sentences.json"), size: int = 0) -> List[str]:
+    """Frases de um ficheiro no formato de `test_sentences.json`, repetidas até `size`."""
+    with open(path, encoding="utf-8") as f:
+        texts = [item["text"] for item in json.load(f)]
+    if size and texts:
+        texts = (texts * (size // len(texts) + 1))[:size]
+    return texts
+
+
+__all__ = ["CorpusSpec", "generate_corpus", "load_fixture", "make_typo", "VOCABULARY"]
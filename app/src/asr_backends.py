@@ -0,0 +1,253 @@
+"""
+Motores de reconhecimento de fala (ASR) por trás do `AudioTranscriber`.
+
+Um backend sabe duas coisas: dar as probabilidades de idioma de uma janela de
+áudio e descodificar um bloco num idioma fixo. O resto (VAD, blocos, idioma
+restrito a PT/EN, workers, cache) fica no `TranscriptionEngine` e no
+`AudioTranscriber`, iguais para todos os backends.
+
+- `whisper` (openai-whisper, PyTorch, fp32 no CPU): o comportamento de
+  sempre; os workers do motor partilham o modelo por `fork`.
+- `faster-whisper` (CTranslate2, opcional): o mesmo modelo quantizado em int8
+  no CPU, várias vezes mais rápido; o número de threads é fixado ao carregar
+  (`threads`). Não sobrevive a `fork`, por isso descodifica sempre no próprio
+  processo (as threads do CTranslate2 já usam os cores).
+
+`select_backend` escolhe o tamanho do modelo (tiny/base/small) medindo o
+fator de tempo real (RTF = tempo de transcrição / duração do áudio) num clip
+de calibração: fica o maior modelo que cumpre o RTF pedido. O clip deve ser
+uma gravação real de voz; sem ela usa-se um clip sintético, com um aviso.
+"""
+from __future__ import annotations
+
+import time
+import warnings
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .audio_frontend import AudioSource
+
+MODEL_SIZES = ("tiny", "base", "small")
+# RTF pedido por omissão em `model_size="auto"`: 1 min de áudio em <= 30 s
+DEFAULT_TARGET_RTF = 0.5
+CALIBRATION_SECONDS = 20.0
+
+Segments = List[Dict[str, Any]]
+
+
+class ASRBackend(ABC):
+    """Interface dos backends (ver o docstring do módulo)."""
+
+    name = ""
+    # os workers do `TranscriptionEngine` podem herdar o modelo por fork
+    forkable = False
+
+    def __init__(self, model_size: str, threads: Optional[int] = None) -> None:
+        self.model_size = model_size
+        self.threads = threads
+
+    @abstractmethod
+    def cache_tag(self) -> List[str]:
+        """Tudo aquilo de que a transcrição depende (para a versão da cache)."""
+
+    @abstractmethod
+    def language_probs(self, audio: "np.ndarray") -> Dict[str, float]:
+        """Probabilidade de cada idioma nos primeiros ~30 s de `audio`."""
+
+    @abstractmethod
+    def decode(self, audio: "np.ndarray", language: str) -> Tuple[str, Segments]:
+        """(texto, segmentos [{"start", "end", "text"}]) de um bloco, no idioma dado."""
+
+    def set_threads(self, threads: int) -> None:
+        """Threads de inferência neste processo (chamado em cada worker)."""
+
+
+class WhisperBackend(ASRBackend):
+    """openai-whisper em fp32 (`fp16=False`: o CPU não tem fp16)."""
+
+    name = "whisper"
+    forkable = True
+
+    def __init__(self, model_size: str = "base", threads: Optional[int] = None, model=None) -> None:
+        super().__init__(model_size, threads)
+        if model is None:
+            import whisper
+
+            print(f"A carregar modelo Whisper ({model_size})...")
+            model = whisper.load_model(model_size)
+        self.model = model
+        if threads:
+            self.set_threads(threads)
+
+    def cache_tag(self) -> List[str]:
+        import whisper
+
+        return [self.model_size, getattr(whisper, "__version__", "")]
+
+    def language_probs(self, audio: "np.ndarray") -> Dict[str, float]:
+        import whisper
+
+        from .transcription import SAMPLE_RATE, WINDOW_SECONDS
+
+        window = whisper.pad_or_trim(audio[: WINDOW_SECONDS * SAMPLE_RATE])
+        mel = whisper.log_mel_spectrogram(window, n_mels=self.model.dims.n_mels).to(self.model.device)
+        _, probs = self.model.detect_language(mel)
+        return probs
+
+    def decode(self, audio: "np.ndarray", language: str) -> Tuple[str, Segments]:
+        result = self.model.transcribe(audio, language=language, fp16=False, condition_on_previous_text=False)
+        segments = [
+            {"start": segment["start"], "end": segment["end"], "text": segment["text"].strip()}
+            for segment in result.get("segments", ())
+        ]
+        return result["text"].strip(), segments
+
+    def set_threads(self, threads: int) -> None:
+        import torch
+
+        torch.set_num_threads(threads)
+
+
+class FasterWhisperBackend(ASRBackend):
+    """
+    faster-whisper (CTranslate2) no CPU, por omissão com pesos int8.
+
+    `threads` (0/None = todos os cores) é o número de threads do CTranslate2
+    para este modelo. A descodificação é gulosa (`beam_size=1`), como o
+    openai-whisper com `fp16=False`.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str = "base", threads: Optional[int] = None, compute_type: str = "int8") -> None:
+        super().__init__(model_size, threads)
+        from faster_whisper import WhisperModel
+
+        print(f"A carregar modelo faster-whisper ({model_size}, {compute_type})...")
+        self.compute_type = compute_type
+        self.model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=threads or 0)
+
+    def cache_tag(self) -> List[str]:
+        import faster_whisper
+
+        return [self.name, self.model_size, self.compute_type, getattr(faster_whisper, "__version__", "")]
+
+    def language_probs(self, audio: "np.ndarray") -> Dict[str, float]:
+        from .transcription import SAMPLE_RATE, WINDOW_SECONDS
+
+        # a deteção de idioma corre logo em `transcribe`; os segmentos (preguiçosos) não são pedidos
+        _, info = self.model.transcribe(audio[: WINDOW_SECONDS * SAMPLE_RATE], beam_size=1)
+        probs = getattr(info, "all_language_probs", None) or [(info.language, info.language_probability)]
+        return dict(probs)
+
+    def decode(self, audio: "np.ndarray", language: str) -> Tuple[str, Segments]:
+        segments, _ = self.model.transcribe(audio, language=language, beam_size=1, condition_on_previous_text=False)
+        segments = [
+            {"start": segment.start, "end": segment.end, "text": segment.text.strip()} for segment in segments
+        ]
+        return "".join(" " + segment["text"] for segment in segments).strip(), segments
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(name: str = "whisper", model_size: str = "base", threads: Optional[int] = None) -> ASRBackend:
+    """Carrega o backend `name` (ver `BACKENDS`) com o modelo `model_size`."""
+    if name not in BACKENDS:
+        raise ValueError(f"unknown ASR backend {name!r} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_size, threads=threads)
+
+
+def calibration_clip(seconds: float = CALIBRATION_SECONDS) -> "np.ndarray":
+    """
+    Clip sintético tipo voz (harmónicos de 180 Hz com vibrato e sílabas), a
+    16 kHz. Só serve para ordenar tamanhos de modelo: o Whisper descodifica-o
+    quase sem texto, por isso o RTF medido fica abaixo do de uma gravação real.
+    """
+    import numpy as np
+
+    from .transcription import SAMPLE_RATE
+
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(180.0 * (1 + 0.02 * np.sin(2 * np.pi * 5 * t))) / SAMPLE_RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 2.5 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.5)
+    return (0.1 * signal * envelope + rng.normal(0, 0.002, len(t))).astype(np.float32)
+
+
+def measure_rtf(backend: ASRBackend, clip: "np.ndarray") -> float:
+    """RTF de `backend` em `clip` (deteção de idioma + descodificação), depois de um aquecimento curto."""
+    from .transcription import SAMPLE_RATE, restrict_language
+
+    backend.decode(clip[:SAMPLE_RATE], "pt")
+    started = time.perf_counter()
+    language, _ = restrict_language(backend.language_probs(clip))
+    backend.decode(clip, language)
+    return (time.perf_counter() - started) / (len(clip) / SAMPLE_RATE)
+
+
+def select_backend(
+    name: str = "whisper",
+    target_rtf: float = DEFAULT_TARGET_RTF,
+    sizes: Sequence[str] = MODEL_SIZES,
+    threads: Optional[int] = None,
+    clip: Optional["AudioSource"] = None,
+) -> Tuple[ASRBackend, Dict[str, float]]:
+    """
+    Maior modelo de `sizes` (do mais pequeno para o maior) com RTF <=
+    `target_rtf` em `clip`: uma gravação de voz (caminho, bytes ou array
+    float32 a 16 kHz, como em `load_clip`). Sem `clip` usa-se
+    `calibration_clip()` e é emitido um `UserWarning`: o RTF medido no clip
+    sintético é otimista e pode escolher um modelo demasiado grande. Os
+    tamanhos são medidos por ordem e a calibração pára no primeiro que falha
+    (os maiores seriam mais lentos); se nem o primeiro cumprir, fica esse.
+    Devolve (backend carregado, {tamanho: RTF medido}).
+    """
+    if not sizes:
+        raise ValueError("sizes must not be empty")
+    if clip is None:
+        warnings.warn(
+            "ASR calibration is using a synthetic clip; pass a real speech recording "
+            "(calibration_clip=...) for a realistic RTF",
+            UserWarning,
+            stacklevel=2,
+        )
+        clip = calibration_clip()
+    else:
+        from .audio_frontend import load_clip
+
+        clip = load_clip(clip).samples
+    chosen: Optional[ASRBackend] = None
+    measured: Dict[str, float] = {}
+    for size in sizes:
+        backend = create_backend(name, size, threads=threads)
+        rtf = measure_rtf(backend, clip)
+        measured[size] = round(rtf, 3)
+        print(f"Calibração ASR: {name} {size} RTF={rtf:.3f} (objetivo {target_rtf})")
+        if chosen is not None and rtf > target_rtf:
+            break
+        chosen = backend
+        if rtf > target_rtf:
+            break
+    return chosen, measured
+
+
+__all__ = [
+    "ASRBackend",
+    "BACKENDS",
+    "DEFAULT_TARGET_RTF",
+    "FasterWhisperBackend",
+    "MODEL_SIZES",
+    "WhisperBackend",
+    "calibration_clip",
+    "create_backend",
+    "measure_rtf",
+    "select_backend",
+]
@@ -1,68 +1,309 @@
 """
-Módulo de processamento de voz usando Whisper (Texto) e Librosa (Características de Voz).
-Configurado para modelo 'base' e força apenas PT ou EN.
+Módulo de processamento de voz usando Whisper (Texto) e características de voz (RMS e pitch YIN).
+Configurado para modelo 'base' (ou escolhido por calibração) e força apenas PT ou EN.
+
+Importar este módulo é leve: Whisper (e PyTorch) só são importados ao criar um
+`AudioTranscriber`, NumPy e o front end de áudio na primeira gravação e o
+Streamlit só em `get_transcriber`/`get_audio_jobs`.
 """
-import whisper
 import os
-import librosa
-import numpy as np
-import streamlit as st
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .result_cache import content_hash, fingerprint
+
+# Incrementar quando a análise de voz (limiares, algoritmo) muda: invalida a cache.
+VOICE_FEATURES_VERSION = 1
+
+
+def _audio_digest(audio):
+    """
+    (áudio, SHA-256 do conteúdo) para a cache de resultados. Objetos tipo
+    ficheiro são lidos uma vez e devolvidos como bytes; um caminho
+    inexistente não tem digest.
+    """
+    import numpy as np
+
+    from .audio_frontend import AudioClip
+
+    if isinstance(audio, AudioClip):
+        return audio, content_hash(str(audio.sample_rate), np.ascontiguousarray(audio.samples).tobytes())
+    if isinstance(audio, np.ndarray):
+        return audio, content_hash(str(audio.dtype), str(audio.shape), np.ascontiguousarray(audio).tobytes())
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return audio, content_hash(audio)
+    if hasattr(audio, "read"):
+        if hasattr(audio, "seek"):
+            audio.seek(0)
+        data = audio.read()
+        return data, content_hash(data)
+    if not os.path.exists(audio):
+        return audio, None
+    with open(audio, "rb") as f:
+        return audio, content_hash(f.read())
+
+
+@dataclass
+class AudioAnalysis:
+    """
+    Resultado de `AudioTranscriber.analyze`: transcrição, análise de voz e
+    (com pipeline) análise do texto, com os tempos de cada etapa em segundos.
+    """
+
+    text: str
+    language: str
+    voice: dict
+    duration: float = 0.0  # segundos de áudio
+    # um dict por bloco de voz ({"index", "start", "end", "text", "language"}
+    # e, com pipeline, "analise")
+    chunks: list = field(default_factory=list)
+    analysis: Optional[dict] = None
+    timings: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "transcricao": {"text": self.text, "language": self.language, "chunks": self.chunks},
+            "voz": self.voice,
+            "duracao": round(self.duration, 3),
+            "analise": self.analysis,
+            "tempos": {stage: round(seconds, 4) for stage, seconds in self.timings.items()},
+        }
+
 
 class AudioTranscriber:
-    def __init__(self, model_size="base"):
-        print(f"A carregar modelo Whisper ({model_size})...")
-        self.model = whisper.load_model(model_size)
+    """
+    Transcrição (PT/EN) e análise de voz de gravações.
+
+    `backend` escolhe o motor de ASR (`src.asr_backends`: "whisper" ou
+    "faster-whisper", int8 no CPU) e `threads` as threads de inferência.
+    `model_size="auto"` mede o RTF de tiny/base/small num clip de calibração
+    (`calibration_clip`: uma gravação de voz; sem ela, um clip sintético, com
+    um aviso) e fica com o maior modelo que cumpre `target_rtf`; as medições
+    ficam em `self.calibration`.
+    """
 
-    def transcribe(self, audio_path: str) -> dict:
+    def __init__(
+        self, model_size="base", workers=None, cache=None, backend="whisper", threads=None,
+        target_rtf=None, calibration_clip=None,
+    ):
+        from .asr_backends import DEFAULT_TARGET_RTF, create_backend, select_backend
+        from .transcription import SUPPORTED_LANGUAGES, TranscriptionEngine
+
+        self.calibration = None
+        if model_size == "auto":
+            self.backend, self.calibration = select_backend(
+                backend, target_rtf or DEFAULT_TARGET_RTF, threads=threads, clip=calibration_clip
+            )
+        else:
+            self.backend = create_backend(backend, model_size, threads=threads)
+        self.model_size = self.backend.model_size
+        self.model = self.backend.model
+        # Blocos de áudio longo descodificados em paralelo (processos partilham o modelo)
+        self.engine = TranscriptionEngine(self.backend, workers=workers)
+        # ResultCache opcional: a mesma gravação não volta a ser transcrita nem analisada
+        self.cache = cache
+        self.transcript_version = fingerprint([
+            *self.backend.cache_tag(), SUPPORTED_LANGUAGES, self.engine.max_chunk_s,
+        ])
+        # análise de voz em paralelo com o Whisper (`analyze`); criado no primeiro uso
+        self._voice_executor = None
+
+    def _cache_digest(self, audio):
+        """(áudio, digest de `audio` para a cache ou None sem cache/digest)."""
+        if self.cache is None:
+            return audio, None
+        return _audio_digest(audio)
+
+    def _cache_key(self, kind, version, audio):
+        """(áudio, chave de `audio` na cache ou None sem cache/digest)."""
+        audio, digest = self._cache_digest(audio)
+        if digest is None:
+            return audio, None
+        return audio, content_hash(kind, version, digest)
+
+    def _cached(self, kind, version, audio, compute):
+        """Resultado de `compute(audio)` através de `self.cache`, com chave no conteúdo do áudio."""
+        audio, key = self._cache_key(kind, version, audio)
+        if key is None:
+            return compute(audio)
+        result = self.cache.get(key)
+        if result is None:
+            result = compute(audio)
+            self.cache.put(key, result)
+        return result
+
+    def load_audio(self, audio):
+        """
+        Descodifica a gravação uma única vez (float32 mono, 16 kHz). Aceita um
+        caminho, bytes, um objeto tipo ficheiro (ex.: o upload do Streamlit) ou
+        um array NumPy a 16 kHz; WAV é lido em memória, sem ficheiros
+        temporários. Devolve None se o caminho não existir. O resultado pode
+        ser passado a `transcribe` e a `analyze_voice_features`.
+        """
+        from .audio_frontend import load_clip
+
+        if isinstance(audio, (str, os.PathLike)) and not os.path.exists(audio):
+            return None
+        return load_clip(audio)
+
+    def _clip(self, audio):
+        from .audio_frontend import AudioClip
+
+        if audio is None or isinstance(audio, AudioClip):
+            return audio
+        return self.load_audio(audio)
+
+    def transcribe(self, audio) -> dict:
         """
-        Transcreve áudio. Se detetar Inglês, mantém. 
-        Se detetar qualquer outra coisa, força Português.
+        Transcreve áudio (caminho, bytes, ficheiro, array ou `AudioClip` já
+        descodificado): {"text", "language", "chunks", "duration"}. Se detetar Inglês, mantém. Se detetar qualquer outra coisa, força Português.
+        O idioma é decidido uma só vez (primeiros ~30s), antes de descodificar.
         """
-        if not os.path.exists(audio_path):
+        return self._cached("transcript", self.transcript_version, audio, self._transcribe)
+
+    def _transcribe(self, audio) -> dict:
+        clip = self._clip(audio)
+        if clip is None:
             return {"text": "", "language": "unknown"}
-        
-        # 1. Primeira tentativa: Deteção Automática
-        result = self.model.transcribe(audio_path, fp16=False)
-        detected_lang = result["language"]
-        text = result["text"].strip()
-
-        # 2. Lógica de Restrição (Só PT ou EN)
-        if detected_lang == 'en':
-            return {"text": text, "language": "en"}
-        elif detected_lang == 'pt':
-            return {"text": text, "language": "pt"}
+
+        result = self.engine.transcribe(clip.samples)
+        result["duration"] = clip.duration
+        if result["language"].endswith("(forçado)"):
+            print("Idioma fora de PT/EN detetado. A forçar PT...")
+        return result
+
+    def transcribe_stream(self, audio, pipeline=None):
+        """
+        Gera um dict por bloco de voz assim que é transcrito. Com `pipeline`
+        (NLPPipeline) cada bloco traz também a análise do texto em "analise".
+        """
+        clip = self._clip(audio)
+        if clip is None:
+            return
+        for chunk in self.engine.stream(clip.samples):
+            item = chunk.to_dict()
+            if pipeline is not None and chunk.text:
+                item["analise"] = pipeline.process(chunk.text)
+            yield item
+
+    def analyze(self, audio, pipeline=None, on_chunk=None) -> AudioAnalysis:
+        """
+        Transcrição e análise de voz da mesma gravação, em simultâneo.
+
+        O áudio é descodificado uma vez; a análise de voz (NumPy) corre numa
+        thread enquanto o Whisper transcreve (ambos largam o GIL no código
+        nativo), por isso a latência fica perto da etapa mais lenta e não da
+        soma. Com `pipeline` (NLPPipeline) cada bloco de voz é analisado assim
+        que é transcrito e, no fim, o texto completo. `on_chunk(dict)` recebe
+        cada bloco à medida que chega. Usa as mesmas entradas da cache que
+        `transcribe` e `analyze_voice_features` (chave no conteúdo da
+        gravação antes de descodificar); se ambas existirem, o áudio nem é
+        descodificado.
+        """
+        clock = time.perf_counter
+        started = clock()
+        audio, digest = self._cache_digest(audio)
+        key = voice_key = transcript = voice = None
+        if digest is not None:
+            key = content_hash("transcript", self.transcript_version, digest)
+            voice_key = content_hash("voice", str(VOICE_FEATURES_VERSION), digest)
+            transcript = self.cache.get(key)
+            voice = self.cache.get(voice_key)
+        cached_chunks = transcript.get("chunks") if transcript is not None else None
+        duration = transcript.get("duration") if transcript is not None else None
+        clip = None
+        if cached_chunks is None or duration is None or voice is None:
+            clip = self._clip(audio)
+            if clip is None:
+                transcript = self._transcribe(None)
+                return AudioAnalysis(
+                    transcript["text"], transcript["language"], self._analyze_voice_features(None),
+                    timings={"decode": clock() - started},
+                )
+            duration = clip.duration
+        timings = {"decode": clock() - started}
+
+        def timed_voice():
+            start = clock()
+            result = self._analyze_voice_features(clip)
+            if voice_key is not None:
+                self.cache.put(voice_key, result)
+            return result, clock() - start
+
+        voice_future = None
+        if voice is None:
+            if self._voice_executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._voice_executor = ThreadPoolExecutor(thread_name_prefix="voice-features")
+            voice_future = self._voice_executor.submit(timed_voice)
+
+        start = clock()
+        nlp_seconds = 0.0
+        chunks = []
+        stream = cached_chunks if cached_chunks is not None else (
+            chunk.to_dict() for chunk in self.engine.stream(clip.samples)
+        )
+        for item in stream:
+            if pipeline is not None and item["text"]:
+                nlp_start = clock()
+                item = dict(item, analise=pipeline.process(item["text"]))
+                nlp_seconds += clock() - nlp_start
+            chunks.append(item)
+            if on_chunk is not None:
+                on_chunk(item)
+        if cached_chunks is None:
+            transcript = _join_chunks([{k: v for k, v in item.items() if k != "analise"} for item in chunks])
+            transcript["duration"] = duration
+            if transcript["language"].endswith("(forçado)"):
+                print("Idioma fora de PT/EN detetado. A forçar PT...")
+            if key is not None:
+                self.cache.put(key, transcript)
+        timings["transcription"] = clock() - start - nlp_seconds
+
+        analysis = None
+        if pipeline is not None:
+            nlp_start = clock()
+            analysis = pipeline.process(transcript["text"])
+            nlp_seconds += clock() - nlp_start
+            timings["nlp"] = nlp_seconds
+
+        if voice_future is not None:
+            voice, timings["voice"] = voice_future.result()
         else:
-            print(f"Idioma '{detected_lang}' detetado. A forçar PT...")
-            result_forced = self.model.transcribe(audio_path, fp16=False, language="pt")
-            return {
-                "text": result_forced["text"].strip(),
-                "language": "pt (forçado)"
-            }
-
-    def analyze_voice_features(self, audio_path: str) -> dict:
+            timings["voice"] = 0.0
+        timings["total"] = clock() - started
+        return AudioAnalysis(
+            transcript["text"], transcript["language"], voice, duration, chunks, analysis, timings
+        )
+
+    def close(self):
+        """Termina os workers de transcrição e a thread da análise de voz."""
+        self.engine.close()
+        if self._voice_executor is not None:
+            self._voice_executor.shutdown(wait=True)
+            self._voice_executor = None
+
+    def analyze_voice_features(self, audio) -> dict:
         """
-        Analisa características físicas da voz (Pitch e Energia) usando Librosa.
+        Analisa características físicas da voz (Pitch e Energia) em toda a gravação:
+        RMS e pitch (YIN) frame a frame sobre o mesmo buffer usado pelo Whisper.
         """
-        if not os.path.exists(audio_path):
-            return {"tom": "Desconhecido", "intensidade": "N/A"}
+        return self._cached("voice", str(VOICE_FEATURES_VERSION), audio, self._analyze_voice_features)
+
+    def _analyze_voice_features(self, audio) -> dict:
+        from .audio_frontend import voice_features
 
         try:
-            # Carregar áudio (apenas primeiros 5s)
-            y, sr = librosa.load(audio_path, duration=5) 
+            clip = self._clip(audio)
         except Exception:
             return {"emoção_voz": "Erro", "detalhes": "Ficheiro inválido", "energia": 0, "pitch": 0}
-        
-        # 1. Energia (Volume - RMS)
-        rms = librosa.feature.rms(y=y)
-        avg_energy = np.mean(rms)
-        
-        # 2. Pitch (Frequência)
-        # piptrack é mais robusto que zero-crossing
-        pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
-        
-        # Filtrar apenas as frequências com magnitude forte (ignorar ruído)
-        indices = magnitudes > np.median(magnitudes)
-        avg_pitch = np.mean(pitches[indices]) if np.any(indices) else 0
+        if clip is None:
+            return {"tom": "Desconhecido", "intensidade": "N/A"}
+
+        # 1. Energia (Volume - RMS) e 2. Pitch (Frequência fundamental)
+        avg_energy, avg_pitch = voice_features(clip)
 
         # --- Lógica de Decisão (Calibrada) ---
         voice_emotion = "Neutro"
@@ -106,6 +347,45 @@ class AudioTranscriber:
             "pitch": round(float(avg_pitch), 2)
         }
 
-@st.cache_resource
+def _join_chunks(chunks) -> dict:
+    """Transcrição completa ({"text", "language", "chunks"}) a partir dos blocos (dicts)."""
+    return {
+        "text": " ".join(chunk["text"] for chunk in chunks if chunk["text"]).strip(),
+        "language": chunks[0]["language"] if chunks else "unknown",
+        "chunks": chunks,
+    }
+
+
+def _load_transcriber():
+    # Um só processo: o Streamlit corre isto numa thread, com o PyTorch já
+    # carregado, e fazer `fork` de um processo com threads não é seguro.
+    return AudioTranscriber(model_size="base", workers=1)
+
+
 def get_transcriber():
-    return AudioTranscriber(model_size="base")
\ No newline at end of file
+    """Transcriber partilhado pela app Streamlit (`st.cache_resource`: um modelo por servidor)."""
+    import streamlit as st
+
+    return st.cache_resource(_load_transcriber)()
+
+
+# Resultados da app Streamlit em disco: a mesma gravação não volta a ser
+# transcrita depois de um reinício do servidor.
+AUDIO_CACHE_PATH = os.path.join("cache", "audio.sqlite")
+
+
+def _load_audio_jobs():
+    from .audio_jobs import AudioJobs
+    from .result_cache import ResultCache
+
+    return AudioJobs(_load_transcriber, cache=ResultCache(maxsize=1024, path=AUDIO_CACHE_PATH, ttl=30 * 86400))
+
+
+def get_audio_jobs():
+    """
+    Fila de gravações partilhada pela app Streamlit (`st.cache_resource`: uma
+    por servidor, com o seu modelo). Ver `src.audio_jobs`.
+    """
+    import streamlit as st
+
+    return st.cache_resource(_load_audio_jobs)()
@@ -0,0 +1,333 @@
+"""
+Análise em lote de gravações (arquivos de chamadas).
+
+Percorre uma pasta (recursivamente, por extensão) ou um manifesto e escreve um
+objeto JSON por gravação com a transcrição, a análise de voz, a análise do
+texto (`NLPPipeline`) e os tempos de cada etapa. Cada worker é um processo
+com um modelo ASR e um pipeline carregados uma única vez; cada gravação é
+descodificada uma vez para a transcrição e para a análise de voz
+(`AudioTranscriber.analyze`), e com `--cache` gravações repetidas (os mesmos
+bytes, neste ou noutro lote) não voltam a ser processadas.
+
+Uso (a partir de `app/`):
+    python -m src.audio_batch /dados/chamadas -o chamadas.jsonl --workers 4 --model base
+    python -m src.audio_batch manifesto.jsonl -o chamadas.jsonl --resume --summary resumo.json
+
+Manifesto: ficheiro de texto com um caminho por linha, ou JSONL com "path" (e
+opcionalmente "id", copiado para o output); caminhos relativos são relativos à
+pasta do manifesto.
+
+Retomar: com `--resume` as gravações que já têm resultado no output são
+saltadas; as linhas com erro e uma última linha incompleta são retiradas do
+output e essas gravações voltam a ser processadas. As linhas são escritas
+pela ordem em que as gravações terminam.
+
+No fim é escrito (stderr e `--summary`) um resumo com o RTF (fator de tempo
+real = tempo de processamento / duração do áudio) por gravação (mediana, p90)
+e agregado, e o RTF de parede do lote inteiro (tempo decorrido / áudio), que é
+o que interessa para dimensionar máquinas.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg", ".opus", ".m4a", ".webm", ".aac", ".wma")
+
+
+@dataclass
+class AudioItem:
+    path: str
+    item_id: Optional[str] = None
+
+
+def find_audio(root: str, extensions: Iterable[str] = AUDIO_EXTENSIONS) -> Iterator[AudioItem]:
+    """Gravações em `root` (recursivamente), por ordem alfabética do caminho."""
+    extensions = tuple(extension.lower() for extension in extensions)
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield AudioItem(os.path.join(directory, name))
+
+
+def read_manifest(path: str) -> Iterator[AudioItem]:
+    """Gravações de um manifesto (um caminho por linha ou JSONL com "path"/"id")."""
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item_id = None
+            if line.startswith("{"):
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(item.get("path"), str):
+                    continue
+                line = item["path"]
+                item_id = None if item.get("id") is None else str(item["id"])
+            yield AudioItem(os.path.join(base, line), item_id)
+
+
+def list_items(source: str) -> Iterator[AudioItem]:
+    """Gravações de uma pasta ou de um manifesto."""
+    if os.path.isdir(source):
+        return find_audio(source)
+    return read_manifest(source)
+
+
+def resume_output(path: str) -> Set[str]:
+    """
+    Prepara um output JSONL anterior para `--resume` e devolve os caminhos
+    que já têm resultado. As linhas com "erro" e o que vier depois da
+    primeira linha incompleta ou inválida são retirados do ficheiro
+    (reescrito de forma atómica): essas gravações voltam a ser processadas
+    sem ficarem com duas linhas.
+    """
+    done: Set[str] = set()
+    kept: List[bytes] = []
+    changed = False
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                record = None
+            if record is None:
+                changed = True
+                break
+            if "erro" in record:
+                changed = True
+                continue
+            done.add(record["path"])
+            kept.append(line)
+    if changed:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(kept)
+        os.replace(tmp_path, path)
+    return done
+
+
+# --- workers -----------------------------------------------------------------
+
+_WORKER: Optional[Tuple[Any, Any]] = None
+
+
+def _init_worker(
+    transcriber_args: Dict[str, Any], pipeline_config: Any, cache_config: Optional[Dict[str, Any]]
+) -> None:
+    """Carrega o modelo e o pipeline uma única vez por processo."""
+    global _WORKER
+    from .audio import AudioTranscriber
+    from .pipeline import NLPPipeline
+    from .result_cache import ResultCache
+
+    cache = ResultCache(**cache_config) if cache_config is not None else None
+    # dentro do worker a transcrição corre num só processo (sem pools aninhadas)
+    transcriber = AudioTranscriber(workers=1, cache=cache, **transcriber_args)
+    pipeline = NLPPipeline(result_cache=cache, config=pipeline_config)
+    pipeline.warmup()
+    _WORKER = (transcriber, pipeline)
+
+
+def analyze_file(item: AudioItem) -> Dict[str, Any]:
+    """Linha do output para uma gravação (no worker já inicializado)."""
+    transcriber, pipeline = _WORKER
+    record: Dict[str, Any] = {"path": item.path}
+    if item.item_id is not None:
+        record["id"] = item.item_id
+    started = time.perf_counter()
+    try:
+        if not os.path.exists(item.path):
+            raise FileNotFoundError(f"ficheiro não encontrado: {item.path}")
+        record.update(transcriber.analyze(item.path, pipeline=pipeline).to_dict())
+    except Exception as exc:
+        record["erro"] = f"{type(exc).__name__}: {exc}"
+        record["tempos"] = {"total": round(time.perf_counter() - started, 4)}
+        return record
+    duration = record["duracao"]
+    record["rtf"] = round(record["tempos"]["total"] / duration, 4) if duration else None
+    return record
+
+
+def _results(items: Iterable[AudioItem], workers: int, initargs: Tuple) -> Iterator[Dict[str, Any]]:
+    """Resultados de cada gravação, pela ordem em que terminam."""
+    items = iter(items)
+    if workers <= 1:
+        _init_worker(*initargs)
+        for item in items:
+            yield analyze_file(item)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        # no máximo 2 gravações por worker em voo (memória constante em arquivos grandes)
+        pending: Set[Future] = set()
+        for item in items:
+            pending.add(executor.submit(analyze_file, item))
+            if len(pending) >= 2 * workers:
+                break
+        while pending:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                following = next(items, None)
+                if following is not None:
+                    pending.add(executor.submit(analyze_file, following))
+                yield future.result()
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(fraction * len(values)))], 4)
+
+
+def run(
+    items: Iterable[AudioItem],
+    output: BinaryIO,
+    workers: int = 1,
+    transcriber_args: Optional[Dict[str, Any]] = None,
+    pipeline_config: Any = None,
+    cache_config: Optional[Dict[str, Any]] = None,
+    skip: Optional[Set[str]] = None,
+) -> Dict[str, Any]:
+    """Processa `items` (saltando os caminhos em `skip`), escrevendo JSONL em `output`. Devolve o resumo."""
+    skip = skip or set()
+    skipped = 0
+
+    def pending_items() -> Iterator[AudioItem]:
+        nonlocal skipped
+        for item in items:
+            if item.path in skip:
+                skipped += 1
+                continue
+            yield item
+
+    started = time.perf_counter()
+    files = errors = 0
+    audio_seconds = processing_seconds = 0.0
+    rtfs: List[float] = []
+    stages: Dict[str, float] = {}
+    initargs = (transcriber_args or {}, pipeline_config, cache_config)
+    for record in _results(pending_items(), workers, initargs):
+        output.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        output.flush()  # cada linha com resultado é uma gravação que `--resume` não repete
+        files += 1
+        if "erro" in record:
+            errors += 1
+            print(f"erro: {record['path']}: {record['erro']}", file=sys.stderr)
+            continue
+        audio_seconds += record["duracao"]
+        processing_seconds += record["tempos"]["total"]
+        for stage, seconds in record["tempos"].items():
+            stages[stage] = stages.get(stage, 0.0) + seconds
+        if record["rtf"] is not None:
+            rtfs.append(record["rtf"])
+
+    elapsed = time.perf_counter() - started
+    return {
+        "files": files,
+        "errors": errors,
+        "skipped": skipped,
+        "workers": workers,
+        "audio_seconds": round(audio_seconds, 2),
+        "processing_seconds": round(processing_seconds, 2),
+        "wall_seconds": round(elapsed, 2),
+        # RTF de uma gravação num worker: processamento / áudio
+        "rtf": round(processing_seconds / audio_seconds, 4) if audio_seconds else None,
+        "rtf_p50": _percentile(rtfs, 0.5),
+        "rtf_p90": _percentile(rtfs, 0.9),
+        # RTF do lote inteiro com `workers` processos (inclui o carregamento dos modelos)
+        "wall_rtf": round(elapsed / audio_seconds, 4) if audio_seconds else None,
+        "stage_seconds": {stage: round(seconds, 2) for stage, seconds in stages.items()},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .asr_backends import BACKENDS
+    from .pipeline import PipelineConfig
+
+    parser = argparse.ArgumentParser(description="Análise em lote de gravações (pasta ou manifesto) para JSONL.")
+    parser.add_argument("source", help="pasta com gravações ou manifesto (caminhos ou JSONL com 'path')")
+    parser.add_argument("-o", "--output", required=True, help="ficheiro JSONL de saída")
+    parser.add_argument("--workers", type=int, default=1, help="processos, cada um com um modelo (0 = todos os cores)")
+    parser.add_argument("--threads", type=int, help="threads de inferência por worker (por omissão cores/workers)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="whisper", help="motor de ASR")
+    parser.add_argument("--model", default="base", help="tamanho do modelo ('auto' = calibrar pelo RTF)")
+    parser.add_argument("--target-rtf", type=float, help="RTF pedido com --model auto")
+    parser.add_argument("--resume", action="store_true",
+                        help="saltar as gravações que já têm resultado no output (as com erro são repetidas)")
+    parser.add_argument("--cache", help="cache de resultados SQLite (gravações repetidas não são reprocessadas)")
+    parser.add_argument("--no-spellcheck", action="store_true", help="não corrigir o texto transcrito")
+    parser.add_argument("--shared-dictionaries", help="dicionários partilhados pelos workers (criado se faltar)")
+    parser.add_argument("--summary", help="ficheiro JSON para o resumo (também escrito em stderr)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.source):
+        parser.error(f"{args.source!r} does not exist")
+    workers = args.workers or (os.cpu_count() or 1)
+    threads = args.threads or max(1, (os.cpu_count() or 1) // workers)
+    config = PipelineConfig(spellcheck=not args.no_spellcheck, shared_dictionaries=args.shared_dictionaries)
+    model_size = args.model
+    if model_size == "auto":
+        # calibrar uma vez aqui, com as threads de um worker, em vez de em cada worker
+        from .asr_backends import DEFAULT_TARGET_RTF, select_backend
+
+        backend, _ = select_backend(args.backend, args.target_rtf or DEFAULT_TARGET_RTF, threads=threads)
+        model_size = backend.model_size
+        del backend
+    if workers > 1:
+        from .pipeline import NLPPipeline
+
+        NLPPipeline(config=config).prepare_workers()
+
+    skip: Set[str] = set()
+    if args.resume and os.path.exists(args.output):
+        skip = resume_output(args.output)
+    output = open(args.output, "ab" if args.resume else "wb")
+    try:
+        summary = run(
+            list_items(args.source),
+            output,
+            workers=workers,
+            transcriber_args={
+                "model_size": model_size, "backend": args.backend, "threads": threads,
+            },
+            pipeline_config=config,
+            cache_config={"path": args.cache} if args.cache else None,
+            skip=skip,
+        )
+    finally:
+        output.close()
+    text = json.dumps(summary, ensure_ascii=False)
+    print(text, file=sys.stderr)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(json.dumps(summary, indent=2, ensure_ascii=False) + "\n")
+    return 0
+
+
+__all__ = [
+    "AUDIO_EXTENSIONS",
+    "AudioItem",
+    "analyze_file",
+    "find_audio",
+    "list_items",
+    "main",
+    "read_manifest",
+    "resume_output",
+    "run",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Front end de áudio partilhado pela transcrição e pela análise de voz.
+
+Cada gravação é descodificada e reamostrada uma única vez para um buffer
+float32 mono a 16 kHz (o formato que o Whisper usa), e esse buffer alimenta
+tanto o Whisper como as características de voz. A energia (RMS) e o pitch
+(YIN) são calculados sobre a gravação inteira, frame a frame e por blocos de
+frames, sem construir espectrogramas completos em memória.
+
+As gravações podem chegar como bytes, objetos tipo ficheiro ou arrays NumPy
+(`load_clip`): WAV PCM é descodificado em memória com o módulo `wave` e os
+outros formatos passam pelo ffmpeg via stdin, sem ficheiros temporários.
+"""
+from __future__ import annotations
+
+import io
+import os
+import subprocess
+import wave
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class AudioClip:
+    """Áudio já descodificado: float32 mono em `sample_rate`."""
+
+    samples: np.ndarray
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+AudioSource = Union[AudioClip, np.ndarray, bytes, bytearray, memoryview, BinaryIO, str, "os.PathLike[str]"]
+
+_RIFF = b"RIFF"
+
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Reamostragem limitada em banda (por FFT) de um sinal mono."""
+    if source_rate == target_rate or not len(samples):
+        return samples.astype(np.float32, copy=False)
+    n_out = int(round(len(samples) * target_rate / source_rate))
+    spectrum = np.fft.rfft(samples.astype(np.float64))
+    n_bins = n_out // 2 + 1
+    if n_bins <= len(spectrum):
+        spectrum = spectrum[:n_bins]
+    else:
+        spectrum = np.concatenate((spectrum, np.zeros(n_bins - len(spectrum), dtype=spectrum.dtype)))
+    out = np.fft.irfft(spectrum, n_out) * (n_out / len(samples))
+    return out.astype(np.float32)
+
+
+def _pcm_to_float(frames: bytes, sample_width: int, channels: int) -> np.ndarray:
+    if sample_width == 1:
+        data = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        data = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        data = values.astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        data = np.frombuffer(frames, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"unsupported PCM sample width: {sample_width}")
+    if channels > 1:
+        data = data[: len(data) - len(data) % channels].reshape(-1, channels).mean(axis=1)
+    return data
+
+
+def decode_wav(data: bytes, sample_rate: int = SAMPLE_RATE) -> AudioClip:
+    """Descodifica WAV PCM em memória (módulo `wave`), em mono a `sample_rate`."""
+    with wave.open(io.BytesIO(data), "rb") as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        frames = f.readframes(f.getnframes())
+    return AudioClip(resample(_pcm_to_float(frames, width, channels), rate, sample_rate), sample_rate)
+
+
+def _ffmpeg(input_args, data: Optional[bytes], sample_rate: int) -> AudioClip:
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", *input_args,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg is required to decode non-WAV audio") from None
+    except subprocess.CalledProcessError as exc:
+        raise RuntimeError(f"failed to decode audio: {exc.stderr.decode(errors='replace')[-500:]}") from exc
+    return AudioClip(np.frombuffer(out, dtype="<i2").astype(np.float32) / 32768.0, sample_rate)
+
+
+def decode_bytes(data: bytes, sample_rate: int = SAMPLE_RATE) -> AudioClip:
+    """
+    Descodifica um ficheiro de áudio em memória: WAV PCM diretamente em Python,
+    outros formatos (webm, mp3, WAV float...) por ffmpeg através de stdin.
+    """
+    if data[:4] == _RIFF:
+        try:
+            return decode_wav(data, sample_rate)
+        except (wave.Error, EOFError, ValueError):
+            pass  # ex.: WAV em vírgula flutuante
+    return _ffmpeg(["-i", "pipe:0"], data, sample_rate)
+
+
+def decode_audio(path: str, sample_rate: int = SAMPLE_RATE) -> AudioClip:
+    """Descodifica e reamostra um ficheiro de áudio para float32 mono."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+        if head == _RIFF:
+            return decode_bytes(head + f.read(), sample_rate)
+    return _ffmpeg(["-i", os.fspath(path)], None, sample_rate)
+
+
+def load_clip(source: AudioSource, sample_rate: int = SAMPLE_RATE) -> AudioClip:
+    """
+    Converte qualquer fonte de áudio num `AudioClip`, sem ficheiros temporários:
+    `AudioClip`, array NumPy (amostras a `sample_rate`; inteiros PCM são
+    escalados), bytes de um ficheiro, objeto com `read()` ou caminho.
+    """
+    if isinstance(source, AudioClip):
+        if source.sample_rate != sample_rate:
+            return AudioClip(resample(source.samples, source.sample_rate, sample_rate), sample_rate)
+        return source
+    if isinstance(source, np.ndarray):
+        samples = source
+        if samples.ndim == 2:  # (amostras, canais)
+            samples = samples.mean(axis=1)
+        if np.issubdtype(samples.dtype, np.integer):
+            samples = samples.astype(np.float32) / float(np.iinfo(samples.dtype).max + 1)
+        return AudioClip(samples.astype(np.float32, copy=False), sample_rate)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return decode_bytes(bytes(source), sample_rate)
+    if hasattr(source, "read"):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return decode_bytes(source.read(), sample_rate)
+    return decode_audio(source, sample_rate)
+
+
+def _frame_blocks(
+    samples: np.ndarray, frame_length: int, hop_length: int, block_frames: int
+) -> Iterator[np.ndarray]:
+    """Vistas (sem cópia) de blocos de até `block_frames` frames consecutivos."""
+    if len(samples) < frame_length:
+        return
+    n_frames = 1 + (len(samples) - frame_length) // hop_length
+    for first in range(0, n_frames, block_frames):
+        count = min(block_frames, n_frames - first)
+        start = first * hop_length
+        stop = start + (count - 1) * hop_length + frame_length
+        yield np.lib.stride_tricks.sliding_window_view(samples[start:stop], frame_length)[::hop_length]
+
+
+def mean_rms(
+    samples: np.ndarray, frame_length: int = 2048, hop_length: int = 512, block_frames: int = 2048
+) -> float:
+    """Média da energia RMS por frame de toda a gravação."""
+    total = 0.0
+    count = 0
+    for frames in _frame_blocks(samples, frame_length, hop_length, block_frames):
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        total += float(rms.sum())
+        count += len(rms)
+    if not count:  # gravação mais curta do que um frame
+        return float(np.sqrt(np.mean(np.square(samples, dtype=np.float64)))) if len(samples) else 0.0
+    return total / count
+
+
+def yin(
+    samples: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    fmin: float = 65.0,
+    fmax: float = 500.0,
+    frame_length: int = 1024,
+    hop_length: int = 512,
+    threshold: float = 0.1,
+    silence_rms: float = 0.005,
+    block_frames: int = 512,
+) -> np.ndarray:
+    """
+    Frequência fundamental (Hz) por frame pelo algoritmo YIN; NaN nos frames sem voz.
+
+    A função de diferença é calculada por FFT para um bloco de frames de cada
+    vez; o período é o primeiro mínimo da diferença normalizada abaixo de
+    `threshold`, refinado por interpolação parabólica.
+    """
+    tau_min = max(1, int(sample_rate / fmax))
+    tau_max = int(np.ceil(sample_rate / fmin))
+    window = frame_length - tau_max  # janela de integração
+    if window <= tau_min:
+        raise ValueError("frame_length too short for fmin")
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + window)))
+    taus = np.arange(tau_max + 1)
+
+    results = []
+    for block in _frame_blocks(samples, frame_length, hop_length, block_frames):
+        f0 = np.full(len(block), np.nan)
+        # frames em silêncio não têm pitch: ficam de fora das FFTs
+        loud = np.sqrt(np.mean(np.square(block, dtype=np.float64), axis=1)) > silence_rms
+        results.append(f0)
+        if not loud.any():
+            continue
+        frames = block[loud].astype(np.float64)
+        # autocorrelação r(tau) = sum_j x[j] x[j + tau], j < window
+        spectrum = np.fft.rfft(frames, n_fft)
+        head = np.fft.rfft(frames[:, :window], n_fft)
+        acf = np.fft.irfft(spectrum * np.conj(head), n_fft)[:, : tau_max + 1]
+        # energia e(tau) = sum_{j=tau}^{tau+window-1} x[j]^2
+        cumulative = np.concatenate(
+            (np.zeros((len(frames), 1)), np.cumsum(np.square(frames), axis=1)), axis=1
+        )
+        energy = cumulative[:, taus + window] - cumulative[:, taus]
+        diff = np.maximum(energy[:, :1] + energy - 2.0 * acf, 0.0)
+
+        # diferença normalizada pela média cumulativa
+        cmnd = np.ones_like(diff)
+        running = np.cumsum(diff[:, 1:], axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cmnd[:, 1:] = diff[:, 1:] * taus[1:] / running
+        cmnd = np.nan_to_num(cmnd, nan=1.0, posinf=1.0)
+
+        search = cmnd[:, tau_min:tau_max]
+        below = search < threshold
+        voiced = below.any(axis=1)
+        tau = np.argmax(below, axis=1)
+        # descer até ao mínimo local a seguir ao primeiro ponto abaixo do limiar
+        rows = np.arange(len(search))
+        last = search.shape[1] - 1
+        while True:
+            step = (tau < last) & (search[rows, np.minimum(tau + 1, last)] < search[rows, tau])
+            if not step.any():
+                break
+            tau = tau + step
+        tau = tau + tau_min
+
+        # interpolação parabólica à volta do mínimo
+        left = cmnd[rows, tau - 1]
+        centre = cmnd[rows, tau]
+        right = cmnd[rows, np.minimum(tau + 1, tau_max)]
+        denominator = left - 2.0 * centre + right
+        with np.errstate(invalid="ignore", divide="ignore"):
+            shift = np.where(np.abs(denominator) > 1e-12, 0.5 * (left - right) / denominator, 0.0)
+        period = tau + np.clip(shift, -1.0, 1.0)
+
+        f0[loud] = np.where(voiced, sample_rate / period, np.nan)
+    if not results:
+        return np.zeros(0)
+    return np.concatenate(results)
+
+
+def voice_features(clip: AudioClip) -> Tuple[float, float]:
+    """(energia RMS média, pitch médio em Hz nos frames com voz) de toda a gravação."""
+    energy = mean_rms(clip.samples)
+    f0 = yin(clip.samples, clip.sample_rate)
+    voiced = f0[~np.isnan(f0)]
+    pitch = float(voiced.mean()) if len(voiced) else 0.0
+    return energy, pitch
+
+
+__all__ = [
+    "AudioClip",
+    "AudioSource",
+    "SAMPLE_RATE",
+    "decode_audio",
+    "decode_bytes",
+    "decode_wav",
+    "load_clip",
+    "mean_rms",
+    "resample",
+    "voice_features",
+    "yin",
+]
@@ -0,0 +1,158 @@
+"""
+Gravações processadas em segundo plano, com resultados por conteúdo.
+
+O Streamlit volta a correr o script inteiro a cada interação: enquanto o
+`st.audio_input` tem uma gravação, cada rerun voltaria a correr o Whisper e a
+análise de voz. Aqui cada gravação é identificada pelo SHA-256 dos seus bytes
+e processada uma única vez numa thread de fundo; os reruns (de qualquer
+sessão) só consultam o estado do trabalho e a interface vai verificando até
+estar concluído. Os resultados ficam numa LRU em memória e, com uma
+`ResultCache`, também em disco (sobrevivem a reinícios do servidor).
+"""
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from .result_cache import content_hash
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from .audio import AudioTranscriber
+    from .result_cache import ResultCache
+
+PENDING = "pendente"
+RUNNING = "a processar"
+DONE = "concluido"
+FAILED = "erro"
+
+
+@dataclass
+class AudioJob:
+    """Estado do processamento de uma gravação (`key` = SHA-256 dos bytes)."""
+
+    key: str
+    status: str = PENDING
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    seconds: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class AudioJobs:
+    """
+    Fila de gravações partilhada por todas as sessões (um por servidor).
+
+    `submit(bytes)` devolve logo o `AudioJob` da gravação: um já existente se
+    os mesmos bytes foram enviados antes (ainda a correr ou concluído), senão
+    um novo, processado por uma thread de fundo. O transcriber (modelo
+    Whisper) é criado por `transcriber_factory` na primeira gravação, também
+    em fundo. As gravações correm uma de cada vez (`workers=1`): o Whisper já
+    usa todos os cores.
+
+    O resultado é `AudioTranscriber.analyze(...).to_dict()`:
+    {"transcricao": {"text", "language", "chunks"}, "voz", "analise", "tempos"}.
+    Com `cache` os resultados concluídos também são guardados por conteúdo (a
+    chave inclui as versões do modelo e da análise de voz). Erros só ficam na
+    LRU em memória (não em disco): os reruns não voltam a tentar, mas depois
+    de um reinício a gravação é reprocessada.
+    """
+
+    def __init__(
+        self,
+        transcriber_factory: Callable[[], "AudioTranscriber"],
+        cache: Optional["ResultCache"] = None,
+        maxsize: int = 256,
+        workers: int = 1,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.transcriber_factory = transcriber_factory
+        self.cache = cache
+        self.maxsize = maxsize
+        self.workers = workers
+        self._jobs: "OrderedDict[str, AudioJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._transcriber_lock = threading.Lock()
+        self._transcriber: Optional["AudioTranscriber"] = None
+        self._executor: Optional["Executor"] = None
+
+    @property
+    def transcriber(self) -> "AudioTranscriber":
+        with self._transcriber_lock:
+            if self._transcriber is None:
+                self._transcriber = self.transcriber_factory()
+            return self._transcriber
+
+    def _cache_key(self, transcriber: "AudioTranscriber", key: str) -> str:
+        from .audio import VOICE_FEATURES_VERSION
+
+        return content_hash("recording", transcriber.transcript_version, str(VOICE_FEATURES_VERSION), key)
+
+    def submit(self, data: bytes) -> AudioJob:
+        """Job da gravação `data` (bytes do ficheiro), criando-o se ainda não existir."""
+        key = content_hash(data)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+                return job
+            job = AudioJob(key)
+            self._jobs[key] = job
+            self._evict()
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="audio-jobs")
+            self._executor.submit(self._run, job, bytes(data))
+        return job
+
+    def get(self, key: str) -> Optional[AudioJob]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _evict(self) -> None:
+        # só trabalhos terminados saem: os pendentes ainda vão ser consultados
+        while len(self._jobs) > self.maxsize:
+            oldest = next((key for key, job in self._jobs.items() if job.finished), None)
+            if oldest is None:
+                break
+            del self._jobs[oldest]
+
+    def _run(self, job: AudioJob, data: bytes) -> None:
+        job.status = RUNNING
+        started = time.perf_counter()
+        try:
+            transcriber = self.transcriber
+            cache_key = self._cache_key(transcriber, job.key) if self.cache is not None else None
+            result = self.cache.get(cache_key) if cache_key is not None else None
+            if result is None:
+                # Whisper e análise de voz em simultâneo, sobre o mesmo áudio descodificado
+                result = transcriber.analyze(data).to_dict()
+                if cache_key is not None:
+                    self.cache.put(cache_key, result)
+            job.result = result
+            job.seconds = time.perf_counter() - started
+            job.status = DONE
+        except Exception as exc:
+            traceback.print_exc()
+            job.error = str(exc) or type(exc).__name__
+            job.seconds = time.perf_counter() - started
+            job.status = FAILED
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+__all__ = ["AudioJob", "AudioJobs", "DONE", "FAILED", "PENDING", "RUNNING"]
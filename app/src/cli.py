@@ -0,0 +1,312 @@
+"""
+Command-line entry point for bulk offline analysis.
+
+Lê um ficheiro JSONL, CSV ou de texto simples (ou stdin) em streaming, passa
+cada texto pelo `NLPPipeline` e escreve um objeto JSON por linha com o output
+de `process()`. A memória usada não depende do tamanho do ficheiro.
+
+Uso (a partir de `app/`):
+    python -m src.cli export.jsonl -o resultados.jsonl --workers 8 \\
+        --fields tipo,emocao,polaridade --checkpoint resultados.ckpt
+    python -m src.cli export.jsonl -o resultados.jsonl --checkpoint resultados.ckpt --resume
+    cat frases.txt | python -m src.cli - --format text > resultados.jsonl
+
+Retomar: o checkpoint guarda o offset (em bytes) do próximo registo do input
+e o tamanho do output já escrito; com `--resume` o output é truncado para esse
+tamanho e a leitura continua a partir desse offset. `--offset N` começa
+diretamente no byte N (que tem de ser o início de um registo).
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .pipeline import NLPPipeline, PipelineConfig
+from .result_cache import ResultCache
+
+FORMATS = ("jsonl", "csv", "text")
+
+
+@dataclass
+class Record:
+    text: str
+    record_id: Optional[str]
+    end_offset: int  # offset (bytes) do registo seguinte
+
+
+@dataclass
+class Checkpoint:
+    input: str
+    offset: int
+    records: int
+    output_bytes: int
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+
+def detect_format(path: str) -> str:
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return "text"
+
+
+def _decode(line: bytes, first: bool) -> str:
+    text = line.decode("utf-8")
+    if first and text.startswith("\ufeff"):
+        text = text[1:]
+    return text
+
+
+class RecordReader:
+    """
+    Lê registos de um stream binário, a partir de `offset`, mantendo a posição em bytes.
+
+    Registos inválidos (JSON mal formado, campo em falta) são ignorados e
+    contados em `skipped`.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        fmt: str,
+        text_field: str = "text",
+        id_field: Optional[str] = None,
+        offset: int = 0,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        self.stream = stream
+        self.fmt = fmt
+        self.text_field = text_field
+        self.id_field = id_field
+        self.offset = offset
+        self.skipped = 0
+        self._header: Optional[List[str]] = None
+
+    def _seek(self) -> int:
+        """Posiciona o stream em `self.offset`; devolve a posição atual."""
+        if self.fmt == "csv":
+            # o cabeçalho está sempre no início do ficheiro
+            header_line = self.stream.readline()
+            self._header = self._parse_csv(_decode(header_line, first=True))
+            position = len(header_line)
+            if self.offset < position:
+                return position
+        else:
+            position = 0
+        if self.offset <= position:
+            return position
+        if self.stream.seekable():
+            self.stream.seek(self.offset)
+            return self.offset
+        while position < self.offset:  # stdin: descartar até ao offset
+            line = self.stream.readline()
+            if not line:
+                break
+            position += len(line)
+        if position != self.offset:
+            raise ValueError(f"offset {self.offset} is not at a record boundary")
+        return position
+
+    @staticmethod
+    def _parse_csv(text: str) -> List[str]:
+        return next(csv.reader([text]), [])
+
+    def _lines(self) -> Iterator[Tuple[str, int]]:
+        position = self._seek()
+        first = position == 0
+        pending = ""
+        for line in self.stream:
+            position += len(line)
+            text = _decode(line, first)
+            first = False
+            if self.fmt == "csv":
+                # campos entre aspas podem ter quebras de linha: juntar até as aspas fecharem
+                pending += text
+                if pending.count('"') % 2:
+                    continue
+                text, pending = pending, ""
+            yield text, position
+        if pending:
+            yield pending, position
+
+    def __iter__(self) -> Iterator[Record]:
+        for line, end_offset in self._lines():
+            if not line.strip():
+                continue
+            record = self._parse(line.rstrip("\r\n"))
+            if record is None:
+                self.skipped += 1
+                continue
+            text, record_id = record
+            yield Record(text, record_id, end_offset)
+
+    def _parse(self, line: str) -> Optional[Tuple[str, Optional[str]]]:
+        if self.fmt == "text":
+            return line, None
+        if self.fmt == "jsonl":
+            try:
+                item = json.loads(line)
+            except ValueError:
+                return None
+            if isinstance(item, str):
+                return item, None
+            if not isinstance(item, dict):
+                return None
+        else:
+            item = dict(zip(self._header or (), self._parse_csv(line)))
+        text = item.get(self.text_field)
+        if not isinstance(text, str):
+            return None
+        record_id = item.get(self.id_field) if self.id_field else None
+        return text, None if record_id is None else str(record_id)
+
+
+def run(
+    reader: RecordReader,
+    output: BinaryIO,
+    pipeline: NLPPipeline,
+    workers: int = 1,
+    chunksize: int = 256,
+    fields: Optional[List[str]] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 10_000,
+    input_name: str = "-",
+    records_done: int = 0,
+    output_bytes: int = 0,
+) -> Dict[str, float]:
+    """Processa todos os registos de `reader`, escrevendo JSONL em `output`. Devolve um resumo."""
+    started = time.perf_counter()
+    # offsets/ids dos registos já entregues ao pipeline e ainda sem resultado
+    in_flight: Deque[Tuple[Optional[str], int]] = deque()
+
+    def texts() -> Iterator[str]:
+        for record in reader:
+            in_flight.append((record.record_id, record.end_offset))
+            yield record.text
+
+    processed = 0
+    offset = reader.offset
+    for result in pipeline.process_batch(texts(), workers=workers, chunksize=chunksize, fields=fields):
+        record_id, offset = in_flight.popleft()
+        if record_id is not None:
+            result = {"id": record_id, **result}
+        line = (json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8")
+        output.write(line)
+        output_bytes += len(line)
+        processed += 1
+        if checkpoint_path and processed % checkpoint_every == 0:
+            output.flush()
+            Checkpoint(input_name, offset, records_done + processed, output_bytes).save(checkpoint_path)
+    output.flush()
+    if checkpoint_path:
+        Checkpoint(input_name, offset, records_done + processed, output_bytes).save(checkpoint_path)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "records": processed,
+        "skipped": reader.skipped,
+        "seconds": round(elapsed, 3),
+        "throughput": round(processed / elapsed, 1) if elapsed else 0.0,
+        "offset": offset,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Análise em lote de ficheiros JSONL/CSV/texto (streaming).")
+    parser.add_argument("input", help="ficheiro de entrada ou '-' para stdin")
+    parser.add_argument("-o", "--output", help="ficheiro JSONL de saída (por omissão stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="formato do input (por omissão pela extensão)")
+    parser.add_argument("--text-field", default="text", help="campo/coluna com o texto (JSONL/CSV)")
+    parser.add_argument("--id-field", help="campo/coluna copiado para o output como 'id'")
+    parser.add_argument("--fields", help="campos do output separados por vírgulas (as etapas não usadas não correm)")
+    parser.add_argument("--workers", type=int, default=1, help="processos (0 = todos os cores)")
+    parser.add_argument("--chunksize", type=int, default=256)
+    parser.add_argument("--offset", type=int, default=0, help="começar neste byte do input")
+    parser.add_argument("--checkpoint", help="ficheiro de checkpoint (escrito periodicamente)")
+    parser.add_argument("--checkpoint-every", type=int, default=10_000, help="registos entre checkpoints")
+    parser.add_argument("--resume", action="store_true", help="retomar a partir de --checkpoint")
+    parser.add_argument("--cache", help="cache de resultados SQLite (frases repetidas não são reprocessadas)")
+    parser.add_argument("--no-spellcheck", action="store_true", help="não corrigir (não carrega os dicionários)")
+    parser.add_argument("--shared-dictionaries", help="dicionários partilhados pelos workers (criado se faltar)")
+    args = parser.parse_args(argv)
+
+    fields = [name.strip() for name in args.fields.split(",") if name.strip()] if args.fields else None
+    fmt = args.format or ("jsonl" if args.input == "-" else detect_format(args.input))
+    offset, records_done, output_bytes = args.offset, 0, 0
+    if args.resume:
+        if not args.checkpoint:
+            parser.error("--resume requires --checkpoint")
+        if not args.output:
+            parser.error("--resume requires --output (stdout cannot be truncated)")
+        if os.path.exists(args.checkpoint):
+            checkpoint = Checkpoint.load(args.checkpoint)
+            if checkpoint.input != args.input:
+                parser.error(f"checkpoint is for {checkpoint.input!r}, not {args.input!r}")
+            offset, records_done, output_bytes = checkpoint.offset, checkpoint.records, checkpoint.output_bytes
+
+    stream = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    if args.output:
+        output = open(args.output, "r+b" if args.resume and os.path.exists(args.output) else "wb")
+        # descartar o que foi escrito depois do último checkpoint
+        output.truncate(output_bytes)
+        output.seek(output_bytes)
+    else:
+        output = sys.stdout.buffer
+
+    try:
+        reader = RecordReader(stream, fmt, args.text_field, args.id_field, offset)
+        summary = run(
+            reader,
+            output,
+            NLPPipeline(
+                result_cache=ResultCache(path=args.cache) if args.cache else None,
+                config=PipelineConfig(
+                    spellcheck=not args.no_spellcheck, shared_dictionaries=args.shared_dictionaries
+                ),
+            ),
+            workers=args.workers or (os.cpu_count() or 1),
+            chunksize=args.chunksize,
+            fields=fields,
+            checkpoint_path=args.checkpoint,
+            checkpoint_every=args.checkpoint_every,
+            input_name=args.input,
+            records_done=records_done,
+            output_bytes=output_bytes,
+        )
+    except ValueError as exc:
+        print(f"erro: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+__all__ = ["Checkpoint", "Record", "RecordReader", "detect_format", "main", "run"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
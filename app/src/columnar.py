@@ -0,0 +1,459 @@
+"""
+Output em colunas (struct of arrays) para lotes grandes.
+
+`NLPPipeline.process_columnar` devolve, por bloco de frases, um
+`ColumnarBatch` em vez de um dict por frase. Cada campo do output é uma
+coluna compacta, com o layout de buffers do Apache Arrow e sem objetos Python
+por frase:
+
+- texto (`original`, `normalizada`, `corrigida`): UTF-8 contíguo + offsets
+  int64 (`large_string`);
+- categorias (`tipo`, `pessoal_factual`, `emocao`): códigos uint8 + lista de
+  categorias (`dictionary<uint8, string>`);
+- `polaridade`, `subjetividade`: float64, já arredondados como em `process`;
+- `debug_features`: uma coluna uint8 (0/1) por flag;
+- `correcoes` e `evidencias`: offsets int64 + colunas dos elementos
+  (`large_list`).
+
+Os blocos atravessam processos como meia dúzia de buffers em vez de milhares
+de dicts. `rows()` (ou iterar o lote) reconstrói os dicts de `process()`;
+`to_pydict()`, `to_numpy()` e `to_arrow()` (pyarrow, sem copiar os buffers)
+dão as colunas. NumPy e pyarrow só são importados nesses métodos.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+FLAGS = ("has_negation", "is_question", "is_exclamation", "first_person")
+
+
+class StringColumn:
+    """Strings UTF-8 contíguas com offsets int64."""
+
+    __slots__ = ("offsets", "data")
+
+    def __init__(self) -> None:
+        self.offsets = array("q", [0])
+        self.data = bytearray()
+
+    def add(self, value: str) -> None:
+        self.data += value.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def extend(self, other: "StringColumn") -> None:
+        base = self.offsets[-1]
+        self.data += other.data
+        self.offsets.extend([offset + base for offset in other.offsets[1:]])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def value(self, index: int) -> str:
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+    def to_list(self) -> List[str]:
+        return [self.value(index) for index in range(len(self))]
+
+    def to_numpy(self):
+        import numpy as np
+
+        return np.array(self.to_list(), dtype=object)
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        return pa.Array.from_buffers(
+            pa.large_string(), len(self), [None, pa.py_buffer(self.offsets), pa.py_buffer(self.data)]
+        )
+
+
+class CategoryColumn:
+    """Valores repetidos de um conjunto pequeno: códigos uint8 + categorias."""
+
+    __slots__ = ("codes", "categories", "_ids")
+
+    def __init__(self) -> None:
+        self.codes = array("B")
+        self.categories: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def _code(self, value: str) -> int:
+        code = self._ids.get(value)
+        if code is None:
+            if len(self.categories) == 255:
+                raise ValueError("at most 255 distinct categories per column")
+            code = self._ids[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def add(self, value: str) -> None:
+        self.codes.append(self._code(value))
+
+    def extend(self, other: "CategoryColumn") -> None:
+        mapping = [self._code(value) for value in other.categories]
+        if mapping == list(range(len(mapping))):
+            self.codes.extend(other.codes)
+        else:
+            self.codes.extend([mapping[code] for code in other.codes])
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def value(self, index: int) -> str:
+        return self.categories[self.codes[index]]
+
+    def to_list(self) -> List[str]:
+        categories = self.categories
+        return [categories[code] for code in self.codes]
+
+    def to_numpy(self):
+        import numpy as np
+
+        return np.array(self.categories, dtype=object)[np.frombuffer(self.codes, dtype=np.uint8)]
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        indices = pa.Array.from_buffers(pa.uint8(), len(self), [None, pa.py_buffer(self.codes)])
+        return pa.DictionaryArray.from_arrays(indices, pa.array(self.categories, pa.string()))
+
+    def __getstate__(self):
+        return self.codes, self.categories
+
+    def __setstate__(self, state) -> None:
+        self.codes, self.categories = state
+        self._ids = {value: code for code, value in enumerate(self.categories)}
+
+
+class FloatColumn:
+    """float64."""
+
+    __slots__ = ("values",)
+
+    def __init__(self) -> None:
+        self.values = array("d")
+
+    def add(self, value: float) -> None:
+        self.values.append(value)
+
+    def extend(self, other: "FloatColumn") -> None:
+        self.values.extend(other.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def value(self, index: int) -> float:
+        return self.values[index]
+
+    def to_list(self) -> List[float]:
+        return self.values.tolist()
+
+    def to_numpy(self):
+        import numpy as np
+
+        return np.frombuffer(self.values, dtype=np.float64)
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        return pa.Array.from_buffers(pa.float64(), len(self), [None, pa.py_buffer(self.values)])
+
+
+class FlagsColumn:
+    """`debug_features`: uma coluna uint8 (0/1) por flag."""
+
+    __slots__ = ("flags",)
+
+    def __init__(self) -> None:
+        self.flags = {name: array("B") for name in FLAGS}
+
+    def add(self, value: Dict[str, bool]) -> None:
+        for name, column in self.flags.items():
+            column.append(value[name])
+
+    def add_flags(self, has_negation: bool, is_question: bool, is_exclamation: bool, first_person: bool) -> None:
+        flags = self.flags
+        flags["has_negation"].append(has_negation)
+        flags["is_question"].append(is_question)
+        flags["is_exclamation"].append(is_exclamation)
+        flags["first_person"].append(first_person)
+
+    def extend(self, other: "FlagsColumn") -> None:
+        for name, column in self.flags.items():
+            column.extend(other.flags[name])
+
+    def __len__(self) -> int:
+        return len(self.flags[FLAGS[0]])
+
+    def value(self, index: int) -> Dict[str, bool]:
+        return {name: bool(column[index]) for name, column in self.flags.items()}
+
+    def to_list(self) -> List[Dict[str, bool]]:
+        return [self.value(index) for index in range(len(self))]
+
+    def to_numpy(self):
+        import numpy as np
+
+        return {name: np.frombuffer(column, dtype=np.uint8).astype(bool) for name, column in self.flags.items()}
+
+    def to_arrow(self):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        n = len(self)
+        return pa.StructArray.from_arrays(
+            [
+                pc.cast(pa.Array.from_buffers(pa.uint8(), n, [None, pa.py_buffer(column)]), pa.bool_())
+                for column in self.flags.values()
+            ],
+            names=list(self.flags),
+        )
+
+
+class _ListColumn:
+    """Base das colunas de listas: offsets int64 (elementos da linha i em offsets[i]:offsets[i + 1])."""
+
+    __slots__ = ("offsets",)
+
+    def __init__(self) -> None:
+        self.offsets = array("q", [0])
+
+    def _extend_offsets(self, other: "_ListColumn") -> None:
+        base = self.offsets[-1]
+        self.offsets.extend([offset + base for offset in other.offsets[1:]])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def to_list(self) -> List[Any]:
+        return [self.value(index) for index in range(len(self))]
+
+    def to_numpy(self):
+        import numpy as np
+
+        values = np.empty(len(self), dtype=object)
+        values[:] = self.to_list()
+        return values
+
+    def _arrow_offsets(self):
+        import pyarrow as pa
+
+        return pa.Array.from_buffers(pa.int64(), len(self.offsets), [None, pa.py_buffer(self.offsets)])
+
+
+class StringListColumn(_ListColumn):
+    """Listas de strings (`evidencias`)."""
+
+    __slots__ = ("items",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.items = StringColumn()
+
+    def add(self, value: Iterable[str]) -> None:
+        items = self.items
+        for item in value:
+            items.add(item)
+        self.offsets.append(len(items))
+
+    def extend(self, other: "StringListColumn") -> None:
+        self._extend_offsets(other)
+        self.items.extend(other.items)
+
+    def value(self, index: int) -> List[str]:
+        return [self.items.value(item) for item in range(self.offsets[index], self.offsets[index + 1])]
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        return pa.LargeListArray.from_arrays(self._arrow_offsets(), self.items.to_arrow())
+
+
+class CorrectionsColumn(_ListColumn):
+    """Listas de correções (`correcoes`): colunas `from`, `to` e `pos`."""
+
+    __slots__ = ("source", "target", "position")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.source = StringColumn()
+        self.target = StringColumn()
+        self.position = array("q")
+
+    def add(self, value: Iterable[Dict[str, Any]]) -> None:
+        for correction in value:
+            self.source.add(correction["from"])
+            self.target.add(correction["to"])
+            self.position.append(correction["pos"])
+        self.offsets.append(len(self.position))
+
+    def add_corrections(self, corrections: Sequence) -> None:
+        """Como `add`, a partir dos `Correction` do corretor."""
+        for correction in corrections:
+            self.source.add(correction.original)
+            self.target.add(correction.corrected)
+            self.position.append(correction.position)
+        self.offsets.append(len(self.position))
+
+    def extend(self, other: "CorrectionsColumn") -> None:
+        self._extend_offsets(other)
+        self.source.extend(other.source)
+        self.target.extend(other.target)
+        self.position.extend(other.position)
+
+    def value(self, index: int) -> List[Dict[str, Any]]:
+        return [
+            {"from": self.source.value(item), "to": self.target.value(item), "pos": self.position[item]}
+            for item in range(self.offsets[index], self.offsets[index + 1])
+        ]
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        positions = pa.Array.from_buffers(pa.int64(), len(self.position), [None, pa.py_buffer(self.position)])
+        items = pa.StructArray.from_arrays(
+            [self.source.to_arrow(), self.target.to_arrow(), positions], names=["from", "to", "pos"]
+        )
+        return pa.LargeListArray.from_arrays(self._arrow_offsets(), items)
+
+
+COLUMN_TYPES = {
+    "original": StringColumn,
+    "normalizada": StringColumn,
+    "idioma": CategoryColumn,
+    "corrigida": StringColumn,
+    "correcoes": CorrectionsColumn,
+    "tipo": CategoryColumn,
+    "pessoal_factual": CategoryColumn,
+    "polaridade": FloatColumn,
+    "subjetividade": FloatColumn,
+    "emocao": CategoryColumn,
+    "evidencias": StringListColumn,
+    "debug_features": FlagsColumn,
+}
+
+
+class ColumnarBatch:
+    """
+    Resultados de várias frases, uma coluna por campo de `fields` (pela
+    ordem de `OUTPUT_FIELDS`). `batch.rows()` dá os mesmos dicts que
+    `process()`/`process_batch()` com esses campos.
+    """
+
+    __slots__ = ("fields", "columns", "_size")
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        unknown = set(fields).difference(COLUMN_TYPES)
+        if unknown:
+            raise ValueError(f"unknown output fields: {', '.join(sorted(unknown))}")
+        self.fields = tuple(fields)
+        self.columns: Dict[str, Any] = {name: COLUMN_TYPES[name]() for name in self.fields}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, normalized, corrected_text, corrections, parsed, classification, sentiment) -> None:
+        """
+        Acrescenta uma frase a partir dos resultados das etapas (os mesmos
+        argumentos de `NLPPipeline._build_output`), sem construir o dict.
+        Só são lidas as etapas dos campos deste lote.
+        """
+        columns = self.columns
+        get = columns.get
+        column = get("original")
+        if column is not None:
+            column.add(normalized.original)
+        column = get("normalizada")
+        if column is not None:
+            column.add(normalized.normalized)
+        column = get("idioma")
+        if column is not None:
+            column.add(normalized.language.language)
+        column = get("corrigida")
+        if column is not None:
+            column.add(corrected_text)
+        column = get("correcoes")
+        if column is not None:
+            column.add_corrections(corrections)
+        if classification is not None:
+            column = get("tipo")
+            if column is not None:
+                column.add(classification.sentence_type)
+            column = get("pessoal_factual")
+            if column is not None:
+                column.add(classification.nature)
+            column = get("evidencias")
+            if column is not None:
+                column.add(classification.evidences)
+        if sentiment is not None:
+            polarity, subjectivity, emotion = sentiment
+            column = get("polaridade")
+            if column is not None:
+                column.add(round(polarity, 2))
+            column = get("subjetividade")
+            if column is not None:
+                column.add(round(subjectivity, 2))
+            column = get("emocao")
+            if column is not None:
+                column.add(emotion)
+        column = get("debug_features")
+        if column is not None:
+            column.add_flags(parsed.has_negation, parsed.is_question, parsed.is_exclamation, parsed.first_person)
+        self._size += 1
+
+    def append_output(self, output: Dict[str, Any]) -> None:
+        """Acrescenta uma frase a partir de um dict de output (ex.: vindo da cache de resultados)."""
+        for name, column in self.columns.items():
+            column.add(output[name])
+        self._size += 1
+
+    def extend(self, other: "ColumnarBatch") -> None:
+        if other.fields != self.fields:
+            raise ValueError("cannot concatenate batches with different fields")
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+        self._size += other._size
+
+    @classmethod
+    def concat(cls, batches: Iterable["ColumnarBatch"], fields: Sequence[str] = ()) -> "ColumnarBatch":
+        """Junta vários lotes (com os mesmos campos) num só."""
+        result = None
+        for batch in batches:
+            if result is None:
+                result = cls(batch.fields)
+            result.extend(batch)
+        return result if result is not None else cls(fields)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        if not -self._size <= index < self._size:
+            raise IndexError(index)
+        index %= self._size
+        return {name: column.value(index) for name, column in self.columns.items()}
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._size):
+            yield self.row(index)
+
+    __iter__ = rows
+
+    def to_pydict(self) -> Dict[str, List[Any]]:
+        """{campo: lista de valores}."""
+        return {name: column.to_list() for name, column in self.columns.items()}
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        {campo: array NumPy}: números sem cópia, categorias e texto como
+        arrays de objetos, flags de `debug_features` como arrays booleanos.
+        """
+        return {name: column.to_numpy() for name, column in self.columns.items()}
+
+    def to_arrow(self):
+        """`pyarrow.Table` com uma coluna por campo (buffers partilhados, não copiados)."""
+        import pyarrow as pa
+
+        return pa.table({name: column.to_arrow() for name, column in self.columns.items()})
+
+
+__all__ = ["COLUMN_TYPES", "ColumnarBatch", "FLAGS"]
@@ -0,0 +1,252 @@
+"""
+Formato binário compacto (e mapeável em memória) para léxicos de sentimento.
+
+O compilador converte fontes CSV/texto (`termo, polaridade, subjetividade,
+emoção`) num ficheiro com:
+
+    cabeçalho | nomes das emoções | offsets uint32 | tabela de strings
+    ordenada (UTF-8) | polaridade float32 | subjetividade float32 | emoção uint8
+
+Em runtime, `CompiledLexicon` abre o ficheiro com `mmap` só no primeiro acesso
+e procura termos por pesquisa binária diretamente nas páginas mapeadas. O
+mapeamento é só de leitura, pelo que vários processos (workers) partilham as
+mesmas páginas da cache do sistema em vez de cada um ter a sua cópia.
+
+Uso:
+    python -m src.compiled_lexicon fontes.csv dominio.txt -o lexico.bin
+    python -m src.compiled_lexicon --builtin -o lexico.bin
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .lexicon import LEXICON
+
+LexiconEntry = Tuple[float, float, str]
+
+MAGIC = b"LEX1"
+VERSION = 1
+# magic, versão, nº termos, nº máx. de palavras por termo, bytes das emoções, bytes das strings
+_HEADER = struct.Struct("<4sIIIII")
+
+
+def _pad4(size: int) -> int:
+    return (4 - size % 4) % 4
+
+
+def read_source(path: str) -> Dict[str, LexiconEntry]:
+    """
+    Lê um ficheiro de léxico.
+
+    `.csv`: colunas termo, polaridade, subjetividade, emoção (cabeçalho
+    opcional). Outros ficheiros: uma entrada por linha, campos separados por
+    TAB; linhas vazias ou começadas por `#` são ignoradas.
+    """
+    entries: Dict[str, LexiconEntry] = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows: Iterable[List[str]] = csv.reader(f)
+        else:
+            rows = (
+                line.rstrip("\n").split("\t")
+                for line in f
+                if line.strip() and not line.lstrip().startswith("#")
+            )
+        for line_no, row in enumerate(rows, start=1):
+            if len(row) != 4:
+                raise ValueError(f"{path}:{line_no}: expected 4 fields, got {len(row)}")
+            term, polarity, subjectivity, emotion = (field.strip() for field in row)
+            try:
+                entries[term.lower()] = (float(polarity), float(subjectivity), emotion)
+            except ValueError:
+                if line_no == 1:  # cabeçalho
+                    continue
+                raise ValueError(f"{path}:{line_no}: invalid number in {row!r}") from None
+    return entries
+
+
+def write_lexicon(entries: Mapping[str, LexiconEntry], path: str) -> None:
+    """Escreve `entries` no formato binário (de forma atómica)."""
+    lowered = {term.lower(): entry for term, entry in entries.items()}
+    encoded = sorted((term.encode("utf-8"), entry) for term, entry in lowered.items())
+    emotions = sorted({entry[2] for _, entry in encoded})
+    if len(emotions) > 255:
+        raise ValueError("at most 255 distinct emotions are supported")
+    emotion_ids = {name: i for i, name in enumerate(emotions)}
+    emotions_blob = "\n".join(emotions).encode("utf-8")
+
+    offsets = array("I", [0])
+    strings = bytearray()
+    for term, _ in encoded:
+        strings += term
+        offsets.append(len(strings))
+    polarity = array("f", (entry[0] for _, entry in encoded))
+    subjectivity = array("f", (entry[1] for _, entry in encoded))
+    emotion = array("B", (emotion_ids[entry[2]] for _, entry in encoded))
+    if sys.byteorder != "little":
+        for column in (offsets, polarity, subjectivity):
+            column.byteswap()
+    max_words = max((len(term.split()) for term, _ in encoded), default=0)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(encoded), max_words, len(emotions_blob), len(strings)))
+        f.write(emotions_blob + b"\0" * _pad4(len(emotions_blob)))
+        f.write(offsets.tobytes())
+        f.write(bytes(strings) + b"\0" * _pad4(len(strings)))
+        f.write(polarity.tobytes())
+        f.write(subjectivity.tobytes())
+        f.write(emotion.tobytes())
+    os.replace(tmp_path, path)
+
+
+def compile_lexicon(sources: Iterable[str], path: str) -> int:
+    """Junta várias fontes (as últimas têm prioridade) e compila-as. Devolve o nº de termos."""
+    entries: Dict[str, LexiconEntry] = {}
+    for source in sources:
+        entries.update(read_source(source))
+    write_lexicon(entries, path)
+    return len(entries)
+
+
+class CompiledLexicon(Mapping):
+    """
+    Léxico binário só de leitura, carregado preguiçosamente via `mmap`.
+
+    Comporta-se como um `dict` termo -> (polaridade, subjetividade, emoção).
+    Os valores são float32, pelo que podem diferir do CSV na 7ª casa decimal.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, max_words, emotions_size, strings_size = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{self.path} is not a compiled lexicon (version {VERSION})")
+        pos = _HEADER.size
+        self._emotions = mm[pos:pos + emotions_size].decode("utf-8").split("\n")
+        pos += emotions_size + _pad4(emotions_size)
+        view = memoryview(mm)
+        self._offsets = self._column(view[pos:pos + 4 * (count + 1)], "I")
+        pos += 4 * (count + 1)
+        self._strings_start = pos
+        pos += strings_size + _pad4(strings_size)
+        self._polarity = self._column(view[pos:pos + 4 * count], "f")
+        pos += 4 * count
+        self._subjectivity = self._column(view[pos:pos + 4 * count], "f")
+        pos += 4 * count
+        self._emotion_ids = view[pos:pos + count]
+        self._count = count
+        self.max_words = max_words
+        self._mm = mm
+
+    @staticmethod
+    def _column(view: memoryview, typecode: str):
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        column = array(typecode, view.tobytes())
+        column.byteswap()
+        return column
+
+    def _ensure_loaded(self) -> None:
+        if self._mm is None:
+            self._load()
+
+    def _term_bytes(self, index: int) -> bytes:
+        start = self._strings_start
+        return self._mm[start + self._offsets[index]:start + self._offsets[index + 1]]
+
+    def _find(self, term: str) -> int:
+        self._ensure_loaded()
+        key = term.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._term_bytes(lo) == key:
+            return lo
+        return -1
+
+    def _entry(self, index: int) -> LexiconEntry:
+        return (
+            self._polarity[index],
+            self._subjectivity[index],
+            self._emotions[self._emotion_ids[index]],
+        )
+
+    def __getitem__(self, term: str) -> LexiconEntry:
+        index = self._find(term)
+        if index < 0:
+            raise KeyError(term)
+        return self._entry(index)
+
+    def get(self, term: str, default=None):
+        index = self._find(term)
+        return default if index < 0 else self._entry(index)
+
+    def __contains__(self, term: object) -> bool:
+        return isinstance(term, str) and self._find(term) >= 0
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        self._ensure_loaded()
+        for index in range(self._count):
+            yield self._term_bytes(index).decode("utf-8")
+
+    def close(self) -> None:
+        if self._mm is None:
+            return
+        for name in ("_offsets", "_polarity", "_subjectivity", "_emotion_ids"):
+            column = getattr(self, name)
+            if isinstance(column, memoryview):
+                column.release()
+        self._mm.close()
+        self._mm = None
+
+
+def load_lexicon(path: str) -> CompiledLexicon:
+    """Devolve um léxico compilado (o ficheiro só é mapeado no primeiro acesso)."""
+    return CompiledLexicon(path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compila léxicos CSV/texto para o formato binário.")
+    parser.add_argument("sources", nargs="*", help="ficheiros .csv ou de texto separado por TAB")
+    parser.add_argument("-o", "--output", required=True, help="ficheiro binário de saída")
+    parser.add_argument("--builtin", action="store_true", help="incluir o LEXICON embutido (antes das fontes)")
+    args = parser.parse_args(argv)
+
+    entries: Dict[str, LexiconEntry] = dict(LEXICON) if args.builtin else {}
+    for source in args.sources:
+        entries.update(read_source(source))
+    if not entries:
+        parser.error("no lexicon entries (give sources or --builtin)")
+    write_lexicon(entries, args.output)
+    print(f"{len(entries)} termos -> {args.output}")
+
+
+__all__ = ["CompiledLexicon", "compile_lexicon", "load_lexicon", "read_source", "write_lexicon"]
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,286 @@
+"""
+Modo documento: parágrafos, transcrições e emails analisados frase a frase.
+
+`NLPPipeline.process` trata o input como uma só frase (pergunta = termina em
+"?", sentimento = média de todos os tokens). Aqui o texto é normalizado e
+tokenizado uma única vez (por parágrafo), partido em frases com regras PT/EN
+(abreviaturas, iniciais, números decimais) e cada frase passa pelas restantes
+etapas do pipeline, em paralelo quando há workers. O resultado tem a análise
+de cada frase e estatísticas agregadas do documento.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import pipeline as pipeline_module
+from .lexicon import EMOTION_PRIORITY
+from .normalizer import NormalizedText, Normalizer
+from .pipeline import NLPPipeline, _init_worker
+
+# Palavras (em minúsculas, sem o ponto) que terminam em ponto sem acabar a frase.
+ABBREVIATIONS = frozenset({
+    # PT
+    "sr", "sra", "srs", "sras", "srta", "dr", "dra", "drs", "dras", "prof", "profa", "profs",
+    "eng", "enga", "arq", "exmo", "exma", "av", "pág", "pag", "pp", "vol", "nº", "tel",
+    "telef", "obs", "séc", "lda", "cia", "aprox", "dept", "depto",
+    "máx", "mín", "jan", "fev", "abr", "mai", "jun", "jul", "ago", "nov", "dez",
+    # EN
+    "mr", "mrs", "ms", "mx", "jr", "vs", "inc", "ltd", "corp", "approx",
+    "feb", "apr", "aug", "sep", "sept", "oct", "dec",
+})
+
+# Abreviaturas que também são palavras comuns ("Fomos ao mar.", "He went out.",
+# "I said no."): só contam como abreviatura antes de um número ("art. 5",
+# "set. 2024", "No. 3") ou de um nome próprio ("St. Louis", "Co. Ltd"). Como
+# nome próprio conta uma palavra com maiúscula depois de uma abreviatura também
+# com maiúscula a meio da frase.
+AMBIGUOUS_ABBREVIATIONS = frozenset({
+    # PT
+    "mar", "set", "out", "ex", "etc", "art", "cap", "sec",
+    # EN
+    "no", "st", "co", "est", "fig",
+})
+
+# Terminadores (o normalizador deixa um espaço depois de cada um: "..." -> ". . . ")
+# seguidos de aspas ou parênteses de fecho.
+_TERMINATOR_RE = re.compile(r"[.!?…](?: ?[.!?…])*(?: ?[\"'»”’)\]])*")
+# pontuação a que o normalizador acrescenta sempre um espaço
+_SPACED_PUNCT = ",.;:!?"
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def segment(normalized: NormalizedText) -> List[Tuple[int, int]]:
+    """
+    Frases de um texto normalizado, como (início, fim) em `normalized.cleaned`.
+
+    Cada frase inclui o espaço que o normalizador põe depois da pontuação
+    final, para ser igual ao `cleaned` que `Normalizer` daria à frase
+    sozinha. "!" e "?" terminam sempre a frase; um
+    ponto não termina depois de abreviaturas (as ambíguas só antes de um
+    número ou nome próprio), iniciais ("J. K."), entre algarismos ("3. 5")
+    nem antes de minúscula.
+    """
+    text = normalized.cleaned
+    spans = normalized.spans
+    ends = [end for _start, end in spans]
+    sentences: List[Tuple[int, int]] = []
+    start = 0
+    for match in _TERMINATOR_RE.finditer(text):
+        position = match.start()
+        # token imediatamente antes do terminador (se estiver colado) e primeiro token depois
+        index = bisect_left(ends, position)
+        previous = None
+        if index < len(spans) and ends[index] == position:
+            previous = spans[index]
+            index += 1
+        if index == len(spans):
+            break  # só pontuação até ao fim: a última frase vai até lá
+        following = spans[index]
+        if (
+            text[position] == "."
+            and match.end() - position == 1
+            and not _ends_sentence(text, previous, following, start)
+        ):
+            continue
+        boundary = following[0]
+        if boundary <= start:
+            continue
+        sentences.append((start, _sentence_end(text, start, boundary)))
+        start = boundary
+    if start < len(text) and text[start:].strip():
+        sentences.append((start, len(text)))
+    elif sentences and start < len(text):
+        sentences[-1] = (sentences[-1][0], len(text))
+    return sentences
+
+
+def _sentence_end(text: str, start: int, boundary: int) -> int:
+    """Fim de uma frase que acaba antes de `boundary`: só fica o espaço que o normalizador lhe daria."""
+    end = boundary
+    while end > start and text[end - 1] == " ":
+        end -= 1
+    if end > start and text[end - 1] in _SPACED_PUNCT and end < boundary:
+        end += 1
+    return end
+
+
+def _after_letter(text: str, position: int) -> bool:
+    """True se antes de `position` está uma letra isolada seguida de ponto ("e. " em "e. g.")."""
+    return (
+        position >= 3
+        and text[position - 2:position] == ". "
+        and text[position - 3].isalpha()
+        and (position == 3 or not text[position - 4].isalnum())
+    )
+
+
+def _ends_sentence(
+    text: str, previous: Optional[Tuple[int, int]], following: Tuple[int, int], start: int
+) -> bool:
+    """Decide se um ponto isolado entre `previous` e `following` termina a frase que começa em `start`."""
+    next_token = text[following[0]:following[1]]
+    if next_token[0].islower():
+        return False
+    if previous is None:
+        return True
+    word = text[previous[0]:previous[1]]
+    lowered = word.lower()
+    if lowered in ABBREVIATIONS:
+        return False
+    if lowered in AMBIGUOUS_ABBREVIATIONS:
+        if next_token[0].isdigit():
+            return False
+        if word[0].isupper() and next_token[0].isupper() and previous[0] > start:
+            return False
+    # iniciais ("J. K. Rowling") e "e. g."/"i. e."; uma letra solta ("às 3.5 h. Ele") termina
+    if len(word) == 1 and word.isalpha() and (word.isupper() or _after_letter(text, previous[0])):
+        return False
+    if word.isdigit() and next_token[0].isdigit():  # "3.5" normalizado para "3. 5"
+        return False
+    return True
+
+
+def _sentence(paragraph: NormalizedText, normalized_text: str, start: int, end: int) -> NormalizedText:
+    """`NormalizedText` de uma frase, a partir do parágrafo já normalizado (sem voltar a tokenizar)."""
+    cleaned = paragraph.cleaned[start:end]
+    first = bisect_left(paragraph.spans, (start, start))
+    last = bisect_left(paragraph.spans, (end, end))
+    return NormalizedText(
+        original=cleaned.strip(),
+        cleaned=cleaned,
+        normalized=normalized_text[start:end] if paragraph.aligned else cleaned.lower(),
+        steps=paragraph.steps,
+        spans=[(s - start, e - start) for s, e in paragraph.spans[first:last]],
+    )
+
+
+def split_document(text: str, normalizer: Normalizer) -> List[NormalizedText]:
+    """Normaliza cada parágrafo (separados por linhas em branco) uma vez e parte-o em frases."""
+    sentences: List[NormalizedText] = []
+    for paragraph_text in _PARAGRAPH_RE.split(text or ""):
+        paragraph = normalizer.normalize(paragraph_text)
+        if not paragraph.cleaned:
+            continue
+        normalized_text = paragraph.normalized
+        for start, end in segment(paragraph):
+            sentences.append(_sentence(paragraph, normalized_text, start, end))
+    return sentences
+
+
+def split_sentences(text: str) -> List[str]:
+    """Frases de `text` (já normalizadas), por ordem."""
+    return [sentence.original for sentence in split_document(text, Normalizer())]
+
+
+def _analyze_in_worker(sentences: List[NormalizedText]) -> List[Dict[str, Any]]:
+    pipeline = pipeline_module._WORKER_PIPELINE
+    return [pipeline._analyze(sentence) for sentence in sentences]
+
+
+def summarize(sentences: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Estatísticas agregadas de um documento a partir das análises das frases."""
+    n = len(sentences)
+    emotions = Counter(sentence["emocao"] for sentence in sentences)
+    polarities = [sentence["polaridade"] for sentence in sentences]
+    dominant = "neutro"
+    best = 0
+    for emotion in EMOTION_PRIORITY:  # empate: a ordem de prioridade do léxico decide
+        if emotions.get(emotion, 0) > best:
+            dominant, best = emotion, emotions[emotion]
+    return {
+        "frases": n,
+        "tokens": sum(sentence.get("tokens", 0) for sentence in sentences),
+        "tipos": dict(Counter(sentence["tipo"] for sentence in sentences)),
+        "naturezas": dict(Counter(sentence["pessoal_factual"] for sentence in sentences)),
+        "emocoes": dict(emotions),
+        "emocao": dominant,
+        "polaridade": round(sum(polarities) / n, 2) if n else 0.0,
+        "subjetividade": round(sum(sentence["subjetividade"] for sentence in sentences) / n, 2) if n else 0.0,
+        "positivas": sum(1 for value in polarities if value > 0),
+        "negativas": sum(1 for value in polarities if value < 0),
+        "neutras": sum(1 for value in polarities if value == 0),
+        "perguntas": sum(1 for sentence in sentences if sentence["debug_features"]["is_question"]),
+        "correcoes": sum(len(sentence["correcoes"]) for sentence in sentences),
+    }
+
+
+class DocumentAnalyzer:
+    """
+    Analisa documentos frase a frase.
+
+    Com `workers > 1` as frases de cada documento são distribuídas (em
+    blocos de `chunksize`) por processos com um pipeline carregado uma única
+    vez; o conjunto é criado no primeiro documento com frases suficientes e
+    reutilizado até `close()`. Documentos curtos são analisados no próprio
+    processo.
+    """
+
+    def __init__(self, pipeline: Optional[NLPPipeline] = None, workers: int = 1, chunksize: int = 256) -> None:
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1")
+        self.pipeline = pipeline if pipeline is not None else NLPPipeline()
+        self.workers = workers
+        self.chunksize = chunksize
+        self._executor: Optional[Executor] = None
+
+    def __enter__(self) -> "DocumentAnalyzer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self.pipeline.prepare_workers()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(False, None, self.pipeline.config)
+            )
+        return self._executor
+
+    def _analyze_all(self, sentences: List[NormalizedText]) -> List[Dict[str, Any]]:
+        if self.workers <= 1 or len(sentences) <= self.chunksize:
+            return [self.pipeline._analyze(sentence) for sentence in sentences]
+        executor = self._pool()
+        iterator = iter(sentences)
+        futures = []
+        while True:
+            chunk = list(islice(iterator, self.chunksize))
+            if not chunk:
+                break
+            futures.append(executor.submit(_analyze_in_worker, chunk))
+        return [result for future in futures for result in future.result()]
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        {"original", "frases": [análise de cada frase + "tokens"], "documento": agregados}.
+
+        Cada frase tem o mesmo output que `NLPPipeline.process` daria para essa
+        frase sozinha.
+        """
+        sentences = split_document(text, self.pipeline.normalizer)
+        results = self._analyze_all(sentences)
+        for sentence, result in zip(sentences, results):
+            result["tokens"] = len(sentence.spans)
+        return {
+            "original": "" if text is None else text,
+            "frases": results,
+            "documento": summarize(results),
+        }
+
+    def analyze_many(self, texts: Iterable[str]) -> Iterable[Dict[str, Any]]:
+        """`analyze` para vários documentos, reutilizando o mesmo conjunto de processos."""
+        for text in texts:
+            yield self.analyze(text)
+
+
+__all__ = ["ABBREVIATIONS", "AMBIGUOUS_ABBREVIATIONS", "DocumentAnalyzer", "segment", "split_document", "split_sentences", "summarize"]
@@ -0,0 +1,509 @@
+"""
+Análise incremental de texto escrito ao vivo (chat, caixa de texto).
+
+Uma `IncrementalSession` guarda da versão anterior do texto os tokens (com as
+posições no texto original e no normalizado), a correção de cada token e as
+entradas do léxico encontradas. A cada edição só a região alterada é
+normalizada, corrigida e pontuada de novo, juntamente com os vizinhos de que
+o resultado depende: o token a seguir (janela de negação) e os tokens que
+podem formar uma frase do léxico com a região. Os totais de polaridade,
+subjetividade e emoções são atualizados subtraindo as contribuições antigas e
+somando as novas (as somas de polaridade e subjetividade são refeitas a partir
+do ponto editado, pela ordem do texto, para arredondarem exatamente como o
+pipeline). A pontuação de idioma de cada token e as contagens de palavras
+PT/EN (`src.langid`, inteiras) são somadas da mesma forma; se o dicionário
+preferido da frase mudar, o texto é corrigido de novo por inteiro. O
+resultado é o de `NLPPipeline.process` sobre o texto completo.
+
+As fronteiras dos tokens são pontos de corte seguros para a normalização: o
+`FUSED_SPACING_RE` só reescreve blocos de espaços e pontuação, que nunca
+atravessam um token, por isso normalizar a região entre duas fronteiras dá o
+mesmo que normalizar o texto inteiro.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .langid import DEFAULT_LANGUAGE
+from .matcher import LexiconEntry, LexiconHit, ScanResult, match_lexicon_at
+from .nlp_parser import TOKEN_RE, VOCABULARY, ParsedSentence, SimpleNLPParser
+from .normalizer import FUSED_SPACING_RE
+from .pipeline import NLPPipeline
+from .sentiment import NEGATED_EMOTION
+
+class _Token:
+    """Estado de um token: posições, idioma, correção, categorias e entrada do léxico que começa nele."""
+
+    __slots__ = (
+        "raw_start", "raw_end", "start", "end", "language", "word_offset", "word", "fixed",
+        "lowered", "categories", "match", "score", "running",
+    )
+
+    def __init__(self, raw_start: int, raw_end: int, start: int, end: int) -> None:
+        self.raw_start = raw_start  # posições no texto original (sem espaços nas pontas)
+        self.raw_end = raw_end
+        self.start = start  # posições no texto normalizado (`cleaned`)
+        self.end = end
+        # (log-odds EN contra PT, pende para PT?, EN com confiança?): `LanguageModel.evidence`
+        self.language: Tuple[int, int, int] = (0, 0, 0)
+        self.word_offset = 0  # palavra corrigível = token sem apóstrofos nas pontas
+        self.word = ""
+        self.fixed: Optional[str] = None  # correção da palavra (None se fica igual)
+        self.lowered = ""  # token corrigido em minúsculas (o que o parser vê)
+        self.categories: Tuple[str, ...] = ()
+        # (termo, entrada, número de tokens) da entrada do léxico que começa aqui
+        self.match: Optional[Tuple[str, LexiconEntry, int]] = None
+        # contribuição para os totais (polaridade, subjetividade, emoção), já com a negação
+        self.score: Optional[Tuple[float, float, str]] = None
+        # somas de polaridade e subjetividade até este token (inclusive)
+        self.running: Tuple[float, float] = (0.0, 0.0)
+
+
+def _is_token_char(char: str) -> bool:
+    return TOKEN_RE.fullmatch(char) is not None
+
+
+def _is_boundary(text: str, position: int) -> bool:
+    """True se `position` é início ou fim de um token (ou uma ponta do texto)."""
+    if position <= 0 or position >= len(text):
+        return True
+    return _is_token_char(text[position - 1]) != _is_token_char(text[position])
+
+
+def _language_totals(tokens: Sequence[_Token]) -> Tuple[int, int, int]:
+    """Somas de `_Token.language` (os argumentos de `LanguageModel.guess`)."""
+    score = portuguese = english = 0
+    for token in tokens:
+        score += token.language[0]
+        portuguese += token.language[1]
+        english += token.language[2]
+    return score, portuguese, english
+
+
+def _common_prefix(a: str, b: str) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:  # pesquisa binária com comparações de fatias (em C)
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    la, lb = len(a), len(b)
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:la - lo] == b[lb - mid:lb - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _count_before(tokens: Sequence[_Token], position: int) -> int:
+    """Número de tokens que começam antes de `position` (no texto original)."""
+    lo, hi = 0, len(tokens)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if tokens[mid].raw_start < position:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class _Unsupported(Exception):
+    """Edição que o caminho incremental não reproduz exatamente (ex.: correção com hífen)."""
+
+
+class IncrementalSession:
+    """
+    Sessão de análise de um texto que vai sendo editado.
+
+        session = IncrementalSession(pipeline)
+        for text in ("Eu nao", "Eu nao gosto", "Eu nao gosto disto!"):
+            result = session.update(text)   # mesmo output de pipeline.process(text)
+
+    `last_update` diz quanto trabalho a última edição fez (caracteres
+    normalizados, tokens corrigidos e tokens pontuados de novo). Correções
+    que mudam o número de tokens (ex.: "anti-herói") fazem a sessão recorrer
+    ao `pipeline.process` enquanto estiverem no texto; um parser com `parse`
+    próprio, sempre. O tipo, a natureza e as evidências vêm de
+    `pipeline.classifier`, com o `ParsedSentence` montado a partir dos tokens.
+    """
+
+    def __init__(self, pipeline: Optional[NLPPipeline] = None) -> None:
+        self.pipeline = pipeline if pipeline is not None else NLPPipeline()
+        self.text: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.last_update: Dict[str, int] = {}
+        self._reset()
+
+    def _reset(self) -> None:
+        self._stripped = ""
+        self._cleaned = ""
+        self._tokens: List[_Token] = []
+        self._polarity = 0.0
+        self._subjectivity = 0.0
+        self._hits = 0
+        self._emotions: Counter = Counter()
+        self._language: Tuple[int, int, int] = (0, 0, 0)  # somas de `_Token.language`
+        self._dictionary = DEFAULT_LANGUAGE  # dicionário preferido com que os tokens foram corrigidos
+        self._valid = True
+        self._components = self._component_ids()
+
+    def _component_ids(self) -> Tuple[int, ...]:
+        pipeline = self.pipeline
+        sentiment = pipeline.sentiment
+        return (
+            id(sentiment), id(sentiment.lexicon), id(pipeline.spellchecker), id(pipeline.language_model),
+            id(pipeline.parser), id(pipeline.classifier),
+        )
+
+    # --- API -----------------------------------------------------------------
+
+    def update(self, text: str) -> Dict[str, Any]:
+        """Analisa a nova versão de `text`, reaproveitando o que não mudou."""
+        if text is None:
+            text = ""
+        if text == self.text and self.result is not None:
+            return self.result
+        if not self._valid or self._components != self._component_ids():
+            self._reset()
+        self.text = text
+        if type(self.pipeline.parser).parse is not SimpleNLPParser.parse:
+            # um parser com `parse` próprio não se reproduz a partir do estado dos tokens
+            self._reset()
+            self.last_update = {"fallback": 1}
+            self.result = self.pipeline.process(text)
+            return self.result
+        try:
+            self._apply(text.strip())
+            self.result = self._build_output(text)
+        except _Unsupported:
+            self._reset()
+            self._valid = False
+            self.last_update = {"fallback": 1}
+            self.result = self.pipeline.process(text)
+        return self.result
+
+    def reset(self) -> None:
+        """Esquece o texto anterior (a próxima edição é analisada por inteiro)."""
+        self.text = None
+        self.result = None
+        self._reset()
+
+    # --- edição ----------------------------------------------------------------
+
+    def _cuts(self, stripped: str) -> Tuple[int, int, int, int]:
+        """
+        Região a refazer: (início, fim no texto antigo, primeiro token
+        removido, primeiro token mantido à direita). Os cortes são fronteiras
+        de tokens fora da parte alterada.
+        """
+        old, tokens = self._stripped, self._tokens
+        prefix = _common_prefix(old, stripped)
+        suffix = _common_suffix(old, stripped, min(len(old), len(stripped)) - prefix)
+        delta = len(stripped) - len(old)
+
+        left, first = 0, 0
+        count = _count_before(tokens, prefix)
+        if count:
+            token = tokens[count - 1]
+            # um corte em `prefix` só é válido se também for fronteira no texto novo
+            if token.raw_end < prefix or (token.raw_end == prefix and _is_boundary(stripped, prefix)):
+                left, first = token.raw_end, count
+            else:
+                left, first = token.raw_start, count - 1
+
+        threshold = len(old) - suffix
+        right, last = len(old), len(tokens)
+        count = _count_before(tokens, threshold)
+        candidates = []
+        if count and tokens[count - 1].raw_end >= threshold:
+            candidates.append((tokens[count - 1].raw_end, count))
+        if count < len(tokens):
+            candidates.append((tokens[count].raw_start, count))
+        for position, keep in candidates:
+            if position > threshold or _is_boundary(stripped, position + delta):
+                right, last = position, keep
+                break
+        return left, right, first, last
+
+    def _apply(self, stripped: str) -> None:
+        tokens = self._tokens
+        left, right, first, last = self._cuts(stripped)
+        delta = len(stripped) - len(self._stripped)
+        clean_left = self._clean_position(left, first)
+        clean_right = self._clean_position(right, last)
+
+        piece = FUSED_SPACING_RE.sub(r"\1 ", stripped[left:right + delta])
+        cleaned = self._cleaned[:clean_left] + piece + self._cleaned[clean_right:]
+        clean_delta = len(cleaned) - len(self._cleaned)
+
+        raw_spans = [m.span() for m in TOKEN_RE.finditer(stripped, left, right + delta)]
+        clean_spans = [(clean_left + start, clean_left + end) for start, end in
+                       (m.span() for m in TOKEN_RE.finditer(piece))]
+        if len(raw_spans) != len(clean_spans):
+            raise _Unsupported("token mismatch")
+        region = [
+            _Token(raw_start, raw_end, start, end)
+            for (raw_start, raw_end), (start, end) in zip(raw_spans, clean_spans)
+        ]
+        language_model = self.pipeline.language_model
+        for token in region:
+            token.language = language_model.evidence(language_model.token_score(cleaned[token.start:token.end]))
+        language = tuple(
+            total - removed + added
+            for total, removed, added in zip(
+                self._language, _language_totals(tokens[first:last]), _language_totals(region)
+            )
+        )
+        dictionary = language_model.guess(*language).dictionary
+        if dictionary != self._dictionary and (first or last < len(tokens)):
+            # as correções dos tokens fora da região dependem do dicionário preferido
+            self._reset()
+            self._apply(stripped)
+            return
+        self._language = language
+        self._dictionary = dictionary
+        for token in region:
+            self._correct(token, cleaned)
+
+        # contribuições e alcance (no índice novo) das entradas dos tokens removidos
+        shift = len(region) - (last - first)
+        reach = 0
+        for index in range(first, last):
+            removed = tokens[index]
+            self._unscore(removed)
+            if removed.match is not None:
+                reach = max(reach, self._new_index(index + removed.match[2], first, last, shift))
+        for token in tokens[last:]:
+            token.raw_start += delta
+            token.raw_end += delta
+            token.start += clean_delta
+            token.end += clean_delta
+        tokens[first:last] = region
+
+        self._stripped = stripped
+        self._cleaned = cleaned
+        begin, rescored = self._rescore(first, first + len(region), reach, first, last, shift)
+        self._resum(begin)
+        self.last_update = {
+            "normalized_chars": len(piece),
+            "corrected_tokens": len(region),
+            "rescored_tokens": rescored,
+            "tokens": len(tokens),
+        }
+
+    def _clean_position(self, position: int, index: int) -> int:
+        """Posição no texto normalizado de um corte em `position` (antes/depois do token `index`)."""
+        tokens = self._tokens
+        if index < len(tokens) and tokens[index].raw_start == position:
+            return tokens[index].start
+        if index and tokens[index - 1].raw_end == position:
+            return tokens[index - 1].end
+        return 0 if position == 0 else len(self._cleaned)
+
+    @staticmethod
+    def _new_index(old_index: int, first: int, last: int, shift: int) -> int:
+        if old_index <= first:
+            return old_index
+        if old_index >= last:
+            return old_index + shift
+        return last + shift  # dentro da região refeita: até ao fim dela
+
+    def _correct(self, token: _Token, cleaned: str) -> None:
+        text = cleaned[token.start:token.end]
+        word = text.strip("'")
+        token.word_offset = text.index(word) if word else 0
+        token.word = word
+        token.fixed = self.pipeline.spellchecker.correct_word(word, self._dictionary) if word else None
+        if token.fixed is not None:
+            text = text[:token.word_offset] + token.fixed + text[token.word_offset + len(word):]
+        token.lowered = text.lower()
+        # o parser volta a separar o texto em minúsculas: se mudar de tamanho
+        # ("İ" -> "i̇") ou deixar de ser um só token, usa-se `process`
+        if len(token.lowered) != len(text) or TOKEN_RE.fullmatch(token.lowered) is None:
+            raise _Unsupported(token.lowered)
+        token.categories = VOCABULARY.categories(token.lowered)
+
+    # --- léxico e totais ---------------------------------------------------------
+
+    def _match(self, index: int) -> Optional[Tuple[str, LexiconEntry, int]]:
+        lexicon = self.pipeline.sentiment.lexicon
+        width = VOCABULARY.max_words if lexicon is None else self.pipeline.sentiment.max_words
+        window = self._tokens[index:index + width]
+        words = [token.lowered for token in window]
+        spans = [(token.start, token.end) for token in window]
+        if lexicon is None:
+            return VOCABULARY.match_at(words, 0, self._cleaned, spans)
+        return match_lexicon_at(words, 0, lexicon, width, self._cleaned, spans)
+
+    def _rescore(self, start: int, stop: int, reach: int, first: int, last: int, shift: int) -> Tuple[int, int]:
+        """
+        Refaz as entradas do léxico e as contribuições de [start, stop) e dos
+        vizinhos afetados; devolve (primeiro token refeito, número de tokens).
+        """
+        tokens = self._tokens
+        lexicon = self.pipeline.sentiment.lexicon
+        width = VOCABULARY.max_words if lexicon is None else self.pipeline.sentiment.max_words
+        # recuar o suficiente para apanhar frases do léxico que entram na região
+        # (e o token antes dela, cuja pontuação final pode ter mudado)
+        begin = max(0, start - width)
+        for index in range(max(0, begin - width + 1), begin):
+            match = tokens[index].match
+            if match is not None and index + match[2] > begin:
+                begin = index
+                break
+        # `resume`: o próximo token livre na análise nova; `reach`: idem na antiga
+        resume = begin
+        index = begin
+        while index < len(tokens):
+            if index > stop and index >= resume and index >= reach:
+                break  # daqui para a frente a análise antiga continua válida
+            token = tokens[index]
+            if token.match is not None:
+                end = index + token.match[2]
+                reach = max(reach, self._new_index(end, first, last, shift) if index < start else end)
+            self._unscore(token)
+            token.match = None
+            if index >= resume:
+                token.match = self._match(index)
+                if token.match is not None:
+                    resume = index + token.match[2]
+            self._score(index)
+            index += 1
+        return begin, index - begin
+
+    def _resum(self, begin: int) -> None:
+        """
+        Refaz as somas de polaridade e subjetividade a partir do token `begin`.
+
+        As somas são feitas pela ordem do texto, como em `score_hits`, para os
+        arredondamentos serem exatamente os mesmos; numa escrita no fim do
+        texto isto é só a cauda.
+        """
+        tokens = self._tokens
+        polarity = subjectivity = 0.0
+        for index in range(begin - 1, -1, -1):
+            if tokens[index].score is not None:
+                polarity, subjectivity = tokens[index].running
+                break
+        for token in tokens[begin:]:
+            if token.score is not None:
+                polarity += token.score[0]
+                subjectivity += token.score[1]
+                token.running = (polarity, subjectivity)
+        self._polarity, self._subjectivity = polarity, subjectivity
+
+    def _score(self, index: int) -> None:
+        token = self._tokens[index]
+        if token.match is None:
+            return
+        _term, (polarity, subjectivity, emotion), _width = token.match
+        if index and "negation" in self._tokens[index - 1].categories:
+            polarity = polarity * -1.0
+            emotion = NEGATED_EMOTION.get(emotion, emotion)
+        token.score = (polarity, subjectivity, emotion)
+        self._hits += 1
+        self._emotions[emotion] += 1
+
+    def _unscore(self, token: _Token) -> None:
+        if token.score is None:
+            return
+        polarity, subjectivity, emotion = token.score
+        token.score = None
+        self._hits -= 1
+        self._emotions[emotion] -= 1
+        if not self._emotions[emotion]:
+            del self._emotions[emotion]
+
+    # --- output ------------------------------------------------------------------
+
+    def _build_output(self, text: str) -> Dict[str, Any]:
+        tokens, cleaned = self._tokens, self._cleaned
+        corrected = [index for index, token in enumerate(tokens) if token.fixed is not None]
+        # posições dos tokens no texto corrigido, por troços com o mesmo desvio
+        spans: List[Tuple[int, int]] = []
+        parts = []
+        cursor = shift = previous = 0
+        for index in corrected:
+            token = tokens[index]
+            spans.extend([(other.start + shift, other.end + shift) for other in tokens[previous:index]])
+            start = token.start + token.word_offset
+            parts.append(cleaned[cursor:start])
+            parts.append(token.fixed)
+            cursor = start + len(token.word)
+            growth = len(token.fixed) - len(token.word)
+            spans.append((token.start + shift, token.end + shift + growth))
+            shift += growth
+            previous = index + 1
+        spans.extend([(other.start + shift, other.end + shift) for other in tokens[previous:]])
+        parts.append(cleaned[cursor:])
+        corrected_text = "".join(parts)
+
+        parsed = self._parsed(corrected_text, spans)
+        classification = self.pipeline.classifier.classify(parsed, corrected_text)
+        if not tokens:
+            polarity, subjectivity, emotion = 0.0, 0.0, "neutro"
+        elif not self._hits:
+            polarity, subjectivity, emotion = 0.0, 0.1, "neutro"
+        else:
+            polarity = self._polarity / self._hits
+            subjectivity = self._subjectivity / self._hits
+            emotion = self.pipeline.sentiment.select_emotion(self._emotions)
+
+        return {
+            "original": text,
+            "normalizada": cleaned.lower(),
+            "idioma": self.pipeline.language_model.guess(*self._language).language,
+            "corrigida": corrected_text,
+            "correcoes": [
+                {"from": token.word, "to": token.fixed, "pos": token.start + token.word_offset}
+                for token in map(tokens.__getitem__, corrected)
+            ],
+            "tipo": classification.sentence_type,
+            "pessoal_factual": classification.nature,
+            "polaridade": round(polarity, 2),
+            "subjetividade": round(subjectivity, 2),
+            "emocao": emotion,
+            "evidencias": classification.evidences,
+            "debug_features": {
+                "has_negation": parsed.has_negation,
+                "is_question": parsed.is_question,
+                "is_exclamation": parsed.is_exclamation,
+                "first_person": parsed.first_person,
+            },
+        }
+
+    def _parsed(self, corrected_text: str, spans: List[Tuple[int, int]]) -> ParsedSentence:
+        """O `ParsedSentence` que `pipeline.parser.parse` daria, montado com o estado dos tokens."""
+        tokens = self._tokens
+        words = [token.lowered for token in tokens]
+        lowered = corrected_text.lower()
+        terms: Dict[str, List[str]] = {name: [] for name in VOCABULARY.category_names}
+        negation = VOCABULARY.negation_category
+        negated = set()
+        for index, token in [(index, token) for index, token in enumerate(tokens) if token.categories]:
+            for name in token.categories:
+                terms[name].append(token.lowered)
+                if name == negation:
+                    negated.add(index + 1)
+        if self.pipeline.sentiment.lexicon is None:
+            hits = [
+                LexiconHit(index, token.match[0], *token.match[1])
+                for index, token in enumerate(tokens)
+                if token.match is not None
+            ]
+        else:
+            # `token.match` vem do léxico próprio; o parser regista as do léxico base
+            hits = VOCABULARY.scan(words, lowered, spans).lexicon_hits
+        scan = ScanResult(tokens=words, terms=terms, lexicon_hits=hits, negated=negated)
+        return self.pipeline.parser.from_scan(corrected_text, scan, lowered, spans)
+
+__all__ = ["IncrementalSession"]
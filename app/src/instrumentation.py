@@ -0,0 +1,234 @@
+"""
+Opt-in instrumentation for the NLP pipeline.
+
+Regista histogramas de tempo real (wall) e de CPU por etapa, contadores
+(frases, tokens, correções) e estatísticas de caches registadas. Os dados
+podem ser lidos em processo (`snapshot`) ou exportados em JSON ou no formato
+de texto do Prometheus. Sem instrumentação (`NLPPipeline(instrumentation=None)`)
+o custo é uma comparação com `None` por frase.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Limites (segundos) dos buckets dos histogramas: 10µs .. 2.5s
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+class Histogram:
+    """Histograma de buckets fixos (contagens não cumulativas, como no Prometheus ao exportar)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # último = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        if other.buckets != self.buckets:
+            raise ValueError("cannot merge histograms with different buckets")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """Estimativa (limite superior do bucket) do quantil `q`."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+
+class Instrumentation:
+    """Recolhe métricas do pipeline; seguro entre threads."""
+
+    COUNTERS = ("sentences", "tokens", "corrections")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.wall: Dict[str, Histogram] = {}
+        self.cpu: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = dict.fromkeys(self.COUNTERS, 0)
+        self._caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+        # estatísticas de caches vindas de outros processos: pid -> nome -> stats
+        self._remote_caches: Dict[int, Dict[str, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    # --- recolha -----------------------------------------------------------
+
+    def _histogram(self, table: Dict[str, Histogram], stage: str) -> Histogram:
+        histogram = table.get(stage)
+        if histogram is None:
+            histogram = table[stage] = Histogram(self.buckets)
+        return histogram
+
+    def record_stage(self, stage: str, wall_seconds: float, cpu_seconds: float) -> None:
+        with self._lock:
+            self._histogram(self.wall, stage).observe(wall_seconds)
+            self._histogram(self.cpu, stage).observe(cpu_seconds)
+
+    def record_sentence(
+        self,
+        stage_wall: Dict[str, float],
+        stage_cpu: Dict[str, float],
+        tokens: int,
+        corrections: int,
+    ) -> None:
+        """Regista todas as etapas de uma frase com um só lock."""
+        with self._lock:
+            for stage, seconds in stage_wall.items():
+                self._histogram(self.wall, stage).observe(seconds)
+            for stage, seconds in stage_cpu.items():
+                self._histogram(self.cpu, stage).observe(seconds)
+            self.counters["sentences"] += 1
+            self.counters["tokens"] += tokens
+            self.counters["corrections"] += corrections
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, int]]) -> None:
+        """`stats()` deve devolver pelo menos `hits`, `misses` (e opcionalmente `evictions`, `size`)."""
+        self._caches[name] = stats
+
+    def merge(self, other: "Instrumentation", source_pid: Optional[int] = None) -> None:
+        """Soma as métricas de `other` (ex.: de um processo worker)."""
+        with self._lock:
+            for table, other_table in ((self.wall, other.wall), (self.cpu, other.cpu)):
+                for stage, histogram in other_table.items():
+                    self._histogram(table, stage).merge(histogram)
+            for name, value in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            if source_pid is not None:
+                self._remote_caches[source_pid] = other.cache_stats(local_only=True)
+
+    def drain(self) -> "Instrumentation":
+        """Devolve as métricas acumuladas (histogramas e contadores) e recomeça do zero."""
+        with self._lock:
+            drained = Instrumentation(self.buckets)
+            drained.wall, self.wall = self.wall, {}
+            drained.cpu, self.cpu = self.cpu, {}
+            drained.counters = self.counters
+            self.counters = dict.fromkeys(self.COUNTERS, 0)
+            drained._caches = dict(self._caches)
+        return drained
+
+    def reset(self) -> None:
+        with self._lock:
+            self.wall.clear()
+            self.cpu.clear()
+            self.counters = dict.fromkeys(self.COUNTERS, 0)
+            self._remote_caches.clear()
+
+    # --- leitura -----------------------------------------------------------
+
+    def cache_stats(self, local_only: bool = False) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = {}
+        sources: List[Dict[str, Dict[str, int]]] = [
+            {name: stats() for name, stats in self._caches.items()}
+        ]
+        if not local_only:
+            sources.extend(self._remote_caches.values())
+        for source in sources:
+            for name, stats in source.items():
+                entry = totals.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0, "size": 0})
+                for key in entry:
+                    entry[key] += stats.get(key, 0)
+        for entry in totals.values():
+            lookups = entry["hits"] + entry["misses"]
+            entry["hit_ratio"] = entry["hits"] / lookups if lookups else 0.0
+        return totals
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "stages": {
+                    stage: {"wall": self.wall[stage].to_dict(), "cpu": self.cpu[stage].to_dict()}
+                    for stage in self.wall
+                },
+                "caches": self.cache_stats(),
+            }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = "nlp") -> str:
+        """Formato de exposição de texto do Prometheus (versão 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for kind, table, help_text in (
+                ("wall", self.wall, "Wall-clock time per pipeline stage."),
+                ("cpu", self.cpu, "CPU time (thread) per pipeline stage."),
+            ):
+                name = f"{prefix}_stage_{kind}_seconds"
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for stage, histogram in table.items():
+                    cumulative = 0
+                    for bound, count in zip([*map(repr, histogram.buckets), "+Inf"], histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum!r}')
+                    lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in self.counters.items():
+                name = f"{prefix}_{counter}_total"
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {value}")
+            caches = self.cache_stats()
+        for key, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                          ("size", "gauge"), ("hit_ratio", "gauge")):
+            name = f"{prefix}_cache_{key}" + ("_total" if kind == "counter" else "")
+            lines.append(f"# TYPE {name} {kind}")
+            for cache, stats in caches.items():
+                lines.append(f'{name}{{cache="{cache}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+    # --- pickling (para devolver métricas de processos worker) ---------------
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        # as funções das caches não atravessam processos: enviar os valores
+        state["_caches"] = {}
+        state["_cache_values"] = {name: stats() for name, stats in self._caches.items()}
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        values = state.pop("_cache_values", {})
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._caches = {name: (lambda stats=stats: stats) for name, stats in values.items()}
+
+
+__all__ = ["Instrumentation", "Histogram", "DEFAULT_BUCKETS"]
@@ -0,0 +1,275 @@
+"""
+Identificação de idioma PT/EN por n-gramas de caracteres.
+
+Um modelo Naive Bayes de n-gramas (1 a 3 letras, com marcas de início e fim
+de palavra) treinado offline a partir das listas de frequências do
+pyspellchecker e de `data/dictionaries`. Cada n-grama guarda um só número,
+o log-odds EN contra PT em vírgula fixa (int16). A pontuação de uma palavra é
+a soma dos pesos dos seus n-gramas: positiva é inglês, negativa é português.
+A de uma frase é a soma das palavras, cada uma limitada a
+±`TOKEN_CLIP`. Uma frase só é inglesa se, além da soma, as suas palavras
+inglesas com confiança forem mais do que as que pendem para o português (e
+pelo menos `MIN_ENGLISH_WORDS`): uma palavra emprestada ("O show foi top") ou um "Ok" isolado não fazem uma
+frase inglesa. As somas e contagens são inteiras, por isso a análise
+incremental pode somar e subtrair palavras sem erros de arredondamento.
+
+O modelo (`data/langid.bin`, ~55 KB) é criado com
+    python -m src.langid -o data/langid.bin
+e carregado na primeira utilização.
+
+Formato do ficheiro: cabeçalho `<4sIIIII` (magia, versão, n mínimo, n
+máximo, escala, número de n-gramas), os pesos (array int16) e os n-gramas em
+UTF-8 separados por "\\n".
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import struct
+import threading
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+LANGUAGES = ("pt", "en")
+DEFAULT_LANGUAGE = "pt"
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+MODEL_PATH = os.path.join(DATA_DIR, "langid.bin")
+
+MAGIC = b"LID1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sIIIII")
+
+# pesos em vírgula fixa: log-odds * SCALE
+SCALE = 64
+# limite da contribuição de cada palavra para a frase (log-odds * SCALE)
+TOKEN_CLIP = 8 * SCALE
+# |log-odds| a partir do qual uma palavra é atribuída a um só idioma
+TOKEN_THRESHOLD = 4 * SCALE
+# probabilidade a partir da qual uma frase é atribuída a um só idioma
+SENTENCE_CONFIDENCE = 0.9
+# palavras inglesas com confiança (>= TOKEN_THRESHOLD) de que uma frase EN precisa
+MIN_ENGLISH_WORDS = 2
+
+
+class LanguageGuess(NamedTuple):
+    language: str  # "pt" ou "en" (empate, indecisão e texto vazio: DEFAULT_LANGUAGE)
+    confidence: float  # probabilidade do idioma escolhido, entre 0,5 e 1
+
+    @property
+    def confident(self) -> bool:
+        return self.confidence >= SENTENCE_CONFIDENCE
+
+    @property
+    def dictionary(self) -> str:
+        """Dicionário preferido do corretor: EN só numa frase inglesa com confiança, senão PT."""
+        return "en" if self.language == "en" and self.confident else DEFAULT_LANGUAGE
+
+
+def _ngrams(word: str, n_min: int, n_max: int) -> Iterable[str]:
+    padded = f"<{word}>"
+    length = len(padded)
+    for n in range(n_min, n_max + 1):
+        for start in range(length - n + 1):
+            yield padded[start:start + n]
+
+
+class LanguageModel:
+    """Pesos EN-vs-PT de cada n-grama (ver o docstring do módulo)."""
+
+    def __init__(self, weights: Mapping[str, int], n_min: int = 1, n_max: int = 3, tag: str = "") -> None:
+        self.weights: Dict[str, int] = dict(weights)
+        self.n_min = n_min
+        self.n_max = n_max
+        # identifica o modelo nas versões de cache (corretor e resultados)
+        self.tag = tag
+        self._scores: Dict[str, int] = {}
+
+    def token_score(self, word: str) -> int:
+        """
+        Log-odds EN contra PT de uma palavra (em unidades de 1/SCALE),
+        limitado a ±TOKEN_CLIP; 0 para tokens que não começam por uma letra.
+        """
+        word = word.lower()
+        score = self._scores.get(word)
+        if score is None:
+            score = 0
+            if word[:1].isalpha():
+                get = self.weights.get
+                score = sum(get(gram, 0) for gram in _ngrams(word, self.n_min, self.n_max))
+                score = max(-TOKEN_CLIP, min(TOKEN_CLIP, score))
+            if len(self._scores) < 100_000:
+                self._scores[word] = score
+        return score
+
+    def token_language(self, word: str) -> Optional[str]:
+        """Idioma de uma palavra isolada, ou None se a confiança for baixa."""
+        score = self.token_score(word)
+        if score >= TOKEN_THRESHOLD:
+            return "en"
+        if score <= -TOKEN_THRESHOLD:
+            return "pt"
+        return None
+
+    @staticmethod
+    def evidence(score: int) -> Tuple[int, int, int]:
+        """
+        Contribuição de uma palavra com pontuação `score` para `guess`:
+        (pontuação, pende para o português?, inglesa com confiança?).
+        """
+        return score, int(score < 0), int(score >= TOKEN_THRESHOLD)
+
+    @staticmethod
+    def guess(score: int, portuguese: int, english: int) -> LanguageGuess:
+        """
+        `LanguageGuess` a partir da soma das pontuações das palavras de uma
+        frase, do número de palavras com pontuação negativa e do das
+        inglesas com confiança (ver `evidence`). Uma soma inglesa sem mais
+        palavras inglesas do que portuguesas (ou com menos de
+        `MIN_ENGLISH_WORDS`) fica indecisa, como um empate.
+        """
+        if score > 0 and (english < MIN_ENGLISH_WORDS or english <= portuguese):
+            return LanguageGuess(DEFAULT_LANGUAGE, 0.5)
+        probability = 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, score / SCALE))))
+        if score > 0:
+            return LanguageGuess("en", probability)
+        return LanguageGuess(DEFAULT_LANGUAGE, 1.0 - probability if score else 0.5)
+
+    def identify(self, words: Iterable[str]) -> LanguageGuess:
+        """Idioma de uma frase a partir das suas palavras (tokens)."""
+        score = portuguese = english = 0
+        for word in words:
+            word_score, word_portuguese, word_english = self.evidence(self.token_score(word))
+            score += word_score
+            portuguese += word_portuguese
+            english += word_english
+        return self.guess(score, portuguese, english)
+
+    # --- ficheiro --------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        grams = sorted(self.weights)
+        weights = array("h", (self.weights[gram] for gram in grams))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, self.n_min, self.n_max, SCALE, len(grams)))
+            f.write(weights.tobytes())
+            f.write("\n".join(grams).encode("utf-8"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH) -> "LanguageModel":
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, n_min, n_max, scale, count = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or scale != SCALE:
+            raise ValueError(f"{path} is not a language model in format {FORMAT_VERSION}")
+        offset = _HEADER.size
+        weights = array("h")
+        weights.frombytes(data[offset:offset + 2 * count])
+        grams = data[offset + 2 * count:].decode("utf-8").split("\n") if count else []
+        from .result_cache import content_hash
+
+        return cls(dict(zip(grams, weights)), n_min, n_max, tag=content_hash(data)[:16])
+
+
+def train(
+    dictionaries: Mapping[str, Mapping[str, int]],
+    n_min: int = 1,
+    n_max: int = 3,
+    vocabulary_size: int = 30_000,
+    alpha: float = 0.5,
+    min_count: float = 3.0,
+    min_weight: float = 0.1,
+) -> LanguageModel:
+    """
+    Treina o modelo a partir de {"pt": palavra -> frequência, "en": ...}.
+
+    Só entram as `vocabulary_size` palavras mais frequentes de cada idioma: as
+    listas completas são dominadas por flexões raras (sobretudo as do PT), que
+    puxam os n-gramas das palavras comuns para o lado errado. Cada palavra
+    conta log(1 + frequência) vezes para os seus n-gramas. N-gramas com
+    contagem total abaixo de `min_count` ou |log-odds| abaixo de `min_weight`
+    são descartados.
+    """
+    counts = {language: defaultdict(float) for language in LANGUAGES}
+    for language in LANGUAGES:
+        language_counts = counts[language]
+        words = sorted(dictionaries[language].items(), key=lambda item: item[1], reverse=True)
+        for word, frequency in words[:vocabulary_size]:
+            weight = math.log1p(frequency)
+            for gram in _ngrams(word.lower(), n_min, n_max):
+                language_counts[gram] += weight
+    totals = {language: sum(counts[language].values()) for language in LANGUAGES}
+    vocabulary = set(counts["pt"]).union(counts["en"])
+    denominators = {language: totals[language] + alpha * len(vocabulary) for language in LANGUAGES}
+    weights: Dict[str, int] = {}
+    for gram in vocabulary:
+        pt, en = counts["pt"].get(gram, 0.0), counts["en"].get(gram, 0.0)
+        if pt + en < min_count:
+            continue
+        log_odds = math.log((en + alpha) / denominators["en"]) - math.log((pt + alpha) / denominators["pt"])
+        if abs(log_odds) < min_weight:
+            continue
+        weights[gram] = max(-32768, min(32767, round(log_odds * SCALE)))
+    return LanguageModel(weights, n_min, n_max)
+
+
+def training_dictionaries() -> Dict[str, Dict[str, int]]:
+    """Frequências PT/EN do pyspellchecker mais as palavras de `data/dictionaries` (com a frequência máxima)."""
+    from spellchecker import SpellChecker as PySpellChecker
+
+    dictionaries: Dict[str, Dict[str, int]] = {}
+    for language in LANGUAGES:
+        words = dict(PySpellChecker(language=language).word_frequency.dictionary)
+        top = max(words.values())
+        with open(os.path.join(DATA_DIR, "dictionaries", f"{language}.txt"), encoding="utf-8") as f:
+            for line in f:
+                word = line.strip().lower()
+                if word:
+                    words[word] = top
+        dictionaries[language] = words
+    return dictionaries
+
+
+_DEFAULT: Optional[LanguageModel] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_model() -> LanguageModel:
+    """Modelo de `data/langid.bin`, carregado uma vez por processo."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        with _DEFAULT_LOCK:
+            if _DEFAULT is None:
+                _DEFAULT = LanguageModel.load(MODEL_PATH)
+    return _DEFAULT
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Treina o modelo de idioma PT/EN por n-gramas.")
+    parser.add_argument("-o", "--output", default=MODEL_PATH, help="ficheiro do modelo")
+    parser.add_argument("--n-max", type=int, default=3, help="tamanho máximo dos n-gramas")
+    args = parser.parse_args(argv)
+
+    model = train(training_dictionaries(), n_max=args.n_max)
+    model.save(args.output)
+    print(f"{len(model.weights)} n-gramas, {os.path.getsize(args.output) / 1024:.0f} KB -> {args.output}")
+
+
+__all__ = [
+    "DEFAULT_LANGUAGE",
+    "LANGUAGES",
+    "MIN_ENGLISH_WORDS",
+    "LanguageGuess",
+    "LanguageModel",
+    "default_model",
+    "train",
+    "training_dictionaries",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Compiled single-pass matcher for term categories and lexicon phrases."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+# Pontuação que pode terminar uma entrada do léxico ("really?", "sério?").
+PHRASE_PUNCT = "?!"
+
+_TERM_WORD_RE = re.compile(r"[\wáéíóúàâêôãõçñ']+", re.IGNORECASE)
+
+LexiconEntry = Tuple[float, float, str]
+
+
+class LexiconHit(NamedTuple):
+    position: int  # índice do primeiro token
+    term: str
+    polarity: float
+    subjectivity: float
+    emotion: str
+
+
+@dataclass(slots=True)
+class ScanResult:
+    tokens: List[str]
+    terms: Dict[str, List[str]]
+    lexicon_hits: List[LexiconHit]
+    # posições cujo token anterior é uma negação
+    negated: Set[int] = field(default_factory=set)
+
+
+class _Node:
+    __slots__ = ("children", "categories", "entry", "term", "punct")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _Node] = {}
+        self.categories: Tuple[str, ...] = ()
+        self.entry: Optional[LexiconEntry] = None
+        self.term: Optional[str] = None
+        # pontuação final -> (termo, entrada), para "really?"
+        self.punct: Dict[str, Tuple[str, LexiconEntry]] = {}
+
+
+class VocabularyMatcher:
+    """
+    Trie de tokens com todas as categorias de termos e o léxico.
+
+    `scan` percorre os tokens uma única vez: cada token custa uma consulta ao
+    dict da raiz e, só para inícios de frases do léxico ("fed up"), alguns
+    passos extra. Categorias podem sobrepor-se (todas são registadas); no
+    léxico vence a correspondência mais longa, sem sobreposição.
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, Iterable[str]],
+        lexicon: Mapping[str, LexiconEntry],
+        negation_category: str = "negation",
+    ) -> None:
+        self._root: Dict[str, _Node] = {}
+        # número máximo de tokens de uma entrada do léxico
+        self.max_words = 1
+        self.category_names: Tuple[str, ...] = tuple(categories)
+        self.negation_category = negation_category
+        for name, terms in categories.items():
+            for term in terms:
+                node, punct = self._insert(term)
+                if punct or node is not self._root.get(term.lower()):
+                    raise ValueError(f"category terms must be single words: {term!r}")
+                if name not in node.categories:
+                    node.categories += (name,)
+        for term, entry in lexicon.items():
+            node, punct = self._insert(term)
+            if punct:
+                node.punct[punct] = (term, entry)
+            else:
+                node.entry = entry
+                node.term = term
+
+    def _insert(self, term: str) -> Tuple[_Node, str]:
+        term = term.lower()
+        words = _TERM_WORD_RE.findall(term)
+        if not words:
+            raise ValueError(f"term has no words: {term!r}")
+        punct = term[term.rindex(words[-1]) + len(words[-1]):].strip()
+        if punct and punct not in PHRASE_PUNCT:
+            raise ValueError(f"unsupported trailing characters in term: {term!r}")
+        self.max_words = max(self.max_words, len(words))
+        level = self._root
+        node = None
+        for word in words:
+            node = level.get(word)
+            if node is None:
+                node = level[word] = _Node()
+            level = node.children
+        return node, punct
+
+    def categories(self, token: str) -> Tuple[str, ...]:
+        """Categorias de um token (já em minúsculas)."""
+        node = self._root.get(token)
+        return node.categories if node is not None else ()
+
+    def _longest(
+        self,
+        node: _Node,
+        tokens: Sequence[str],
+        i: int,
+        text: Optional[str],
+        spans: Optional[Sequence[Tuple[int, int]]],
+    ) -> Optional[Tuple[str, LexiconEntry, int]]:
+        """Entrada mais longa do léxico a começar em `i` (cujo nó é `node`): (termo, entrada, fim)."""
+        check_punct = text is not None and spans is not None
+        n_tokens = len(tokens)
+        best: Optional[Tuple[str, LexiconEntry]] = None
+        best_end = i
+        j = i
+        while node is not None:
+            if node.entry is not None:
+                best, best_end = (node.term, node.entry), j + 1
+            if node.punct and check_punct:
+                end = spans[j][1]
+                if end < len(text) and text[end] in node.punct:
+                    best, best_end = node.punct[text[end]], j + 1
+            j += 1
+            if j >= n_tokens or not node.children:
+                break
+            node = node.children.get(tokens[j])
+        if best is None:
+            return None
+        return best[0], best[1], best_end
+
+    def match_at(
+        self,
+        tokens: Sequence[str],
+        i: int,
+        text: Optional[str] = None,
+        spans: Optional[Sequence[Tuple[int, int]]] = None,
+    ) -> Optional[Tuple[str, LexiconEntry, int]]:
+        """
+        Entrada do léxico que `scan` marcaria em `i` se lá chegasse livre:
+        (termo, entrada, índice do token a seguir ao termo) ou None.
+        """
+        node = self._root.get(tokens[i])
+        if node is None:
+            return None
+        return self._longest(node, tokens, i, text, spans)
+
+    def scan(
+        self,
+        tokens: Sequence[str],
+        text: Optional[str] = None,
+        spans: Optional[Sequence[Tuple[int, int]]] = None,
+    ) -> ScanResult:
+        """
+        Marca categorias e entradas do léxico em `tokens` (já em minúsculas).
+
+        Com `text` e `spans` (posições de cada token em `text`), entradas
+        terminadas em pontuação só correspondem se esse carácter vier logo a
+        seguir ao token.
+        """
+        root = self._root
+        terms: Dict[str, List[str]] = {name: [] for name in self.category_names}
+        hits: List[LexiconHit] = []
+        negated: Set[int] = set()
+        negation = self.negation_category
+        lexicon_resume = 0
+
+        for i, token in enumerate(tokens):
+            node = root.get(token)
+            if node is None:
+                continue
+            for name in node.categories:
+                terms[name].append(token)
+                if name == negation:
+                    negated.add(i + 1)
+            if i < lexicon_resume:
+                continue
+
+            match = self._longest(node, tokens, i, text, spans)
+            if match is not None:
+                term, (polarity, subjectivity, emotion), lexicon_resume = match
+                hits.append(LexiconHit(i, term, polarity, subjectivity, emotion))
+
+        return ScanResult(tokens=list(tokens), terms=terms, lexicon_hits=hits, negated=negated)
+
+
+def match_lexicon_at(
+    tokens: Sequence[str],
+    i: int,
+    lexicon: Mapping[str, LexiconEntry],
+    max_words: int = 1,
+    text: Optional[str] = None,
+    spans: Optional[Sequence[Tuple[int, int]]] = None,
+) -> Optional[Tuple[str, LexiconEntry, int]]:
+    """Como `VocabularyMatcher.match_at`, por consultas a `lexicon`."""
+    check_punct = text is not None and spans is not None
+    width = min(max_words, len(tokens) - i)
+    while width > 0:
+        term = " ".join(tokens[i:i + width]) if width > 1 else tokens[i]
+        if check_punct:
+            end = spans[i + width - 1][1]
+            if end < len(text) and text[end] in PHRASE_PUNCT:
+                entry = lexicon.get(term + text[end])
+                if entry is not None:
+                    return term + text[end], entry, i + width
+        entry = lexicon.get(term)
+        if entry is not None:
+            return term, entry, i + width
+        width -= 1
+    return None
+
+
+def match_lexicon(
+    tokens: Sequence[str],
+    lexicon: Mapping[str, LexiconEntry],
+    max_words: int = 1,
+    text: Optional[str] = None,
+    spans: Optional[Sequence[Tuple[int, int]]] = None,
+) -> List[LexiconHit]:
+    """
+    Correspondência mais longa contra um léxico arbitrário (ex.: compilado).
+
+    Mesma semântica do léxico em `VocabularyMatcher.scan`, mas por consultas
+    a `lexicon` (até `max_words` palavras por termo) em vez de uma trie.
+    """
+    hits: List[LexiconHit] = []
+    n_tokens = len(tokens)
+    i = 0
+    while i < n_tokens:
+        found = match_lexicon_at(tokens, i, lexicon, max_words, text, spans)
+        if found is None:
+            i += 1
+            continue
+        term, (polarity, subjectivity, emotion), end = found
+        hits.append(LexiconHit(i, term, polarity, subjectivity, emotion))
+        i = end
+    return hits
+
+
+__all__ = [
+    "VocabularyMatcher",
+    "ScanResult",
+    "LexiconHit",
+    "PHRASE_PUNCT",
+    "match_lexicon",
+    "match_lexicon_at",
+]
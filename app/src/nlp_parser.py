@@ -2,8 +2,11 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+from .lexicon import LEXICON
+from .matcher import LexiconHit, ScanResult, VocabularyMatcher
 
 TOKEN_RE = re.compile(r"[\wáéíóúàâêôãõçñ']+", re.IGNORECASE)
 
@@ -32,7 +35,20 @@ FACTUAL_MARKERS = {
     "report", "diz", "informou", "mediu", "percent", "data", "study", "fact"
 }
 
-@dataclass
+# Um único matcher compilado com todas as categorias e o léxico de sentimento.
+VOCABULARY = VocabularyMatcher(
+    {
+        "negation": NEGATIONS,
+        "question": QUESTION_TERMS,
+        "opinion": OPINION_MARKERS,
+        "factual": FACTUAL_MARKERS,
+        "first_person": FIRST_PERSON,
+    },
+    LEXICON,
+)
+
+
+@dataclass(slots=True)
 class ParsedSentence:
     tokens: List[str]
     lemmas: List[str]
@@ -44,35 +60,61 @@ class ParsedSentence:
     factual_markers: List[str]
     negation_terms: List[str]
     question_terms: List[str]
+    lexicon_hits: List[LexiconHit] = field(default_factory=list)
+    negated_positions: Set[int] = field(default_factory=set)
+    # texto em minúsculas e posições de cada token nesse texto
+    lowered: str = ""
+    spans: List[Tuple[int, int]] = field(default_factory=list)
 
 
 class SimpleNLPParser:
     """Extracts shallow syntactic/semantic hints without external models."""
 
-    def parse(self, text: str) -> ParsedSentence:
-        tokens = TOKEN_RE.findall(text.lower())
-        negation_terms = [t for t in tokens if t in NEGATIONS]
-        question_terms = [t for t in tokens if t in QUESTION_TERMS]
-        opinion_terms = [t for t in tokens if t in OPINION_MARKERS]
-        factual_terms = [t for t in tokens if t in FACTUAL_MARKERS]
-        
-        has_negation = bool(negation_terms)
-        is_question = text.strip().endswith("?") or bool(question_terms)
-        is_exclamation = text.strip().endswith("!")
-        first_person = any(t in FIRST_PERSON for t in tokens)
-        lemmas = tokens
-        
+    def parse(
+        self,
+        text: str,
+        lowered: Optional[str] = None,
+        spans: Optional[List[Tuple[int, int]]] = None,
+    ) -> ParsedSentence:
+        """
+        `lowered`/`spans` permitem reutilizar o texto em minúsculas e os
+        tokens já calculados pelo `Normalizer` quando `text` não mudou.
+        """
+        if lowered is None or spans is None:
+            lowered = text.lower()
+            spans = [m.span() for m in TOKEN_RE.finditer(lowered)]
+        tokens = [lowered[start:end] for start, end in spans]
+        return self.from_scan(text, VOCABULARY.scan(tokens, lowered, spans), lowered, spans)
+
+    def from_scan(
+        self,
+        text: str,
+        scan: ScanResult,
+        lowered: str,
+        spans: List[Tuple[int, int]],
+    ) -> ParsedSentence:
+        """
+        `ParsedSentence` a partir de uma leitura já feita dos tokens de `text`
+        (a análise incremental monta o `ScanResult` com o estado dos tokens).
+        """
+        negation_terms = scan.terms["negation"]
+        question_terms = scan.terms["question"]
+        stripped = text.strip()
         return ParsedSentence(
-            tokens=tokens,
-            lemmas=lemmas,
-            has_negation=has_negation,
-            is_question=is_question,
-            is_exclamation=is_exclamation,
-            first_person=first_person,
-            opinion_markers=opinion_terms,
-            factual_markers=factual_terms,
+            tokens=scan.tokens,
+            lemmas=scan.tokens,
+            has_negation=bool(negation_terms),
+            is_question=stripped.endswith("?") or bool(question_terms),
+            is_exclamation=stripped.endswith("!"),
+            first_person=bool(scan.terms["first_person"]),
+            opinion_markers=scan.terms["opinion"],
+            factual_markers=scan.terms["factual"],
             negation_terms=negation_terms,
             question_terms=question_terms,
+            lexicon_hits=scan.lexicon_hits,
+            negated_positions=scan.negated,
+            lowered=lowered,
+            spans=spans,
         )
 
-__all__ = ["SimpleNLPParser", "ParsedSentence", "NEGATIONS"]
\ No newline at end of file
+__all__ = ["SimpleNLPParser", "ParsedSentence", "NEGATIONS", "VOCABULARY"]
\ No newline at end of file
@@ -2,27 +2,54 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .nlp_parser import TOKEN_RE
+
+if TYPE_CHECKING:
+    from .langid import LanguageGuess
 
 WHITESPACE_RE = re.compile(r"\s+")
 SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([,.;:!?])")
 DOUBLE_PUNCT_RE = re.compile(r"([.!?]){2,}")
 MULTISPACE_PUNCT_RE = re.compile(r"([,.;:!?])(?!\s)")
 
+# Numa só passagem: espaços antes da pontuação desaparecem, depois de cada
+# sinal fica exatamente um espaço e os restantes blocos de espaços passam a
+# um. Nos blocos sem pontuação o grupo 1 fica vazio e a substituição é " ".
+# Equivale a WHITESPACE_RE + SPACE_BEFORE_PUNCT_RE + MULTISPACE_PUNCT_RE; o
+# DOUBLE_PUNCT_RE antigo nunca encontrava nada depois desses passos (todo o
+# sinal de pontuação já fica seguido de espaço), por isso deixou de correr.
+FUSED_SPACING_RE = re.compile(r"\s*([,.;:!?])\s*|\s+")
 
-def _cleanup_spacing(text: str) -> str:
-    text = SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
-    text = MULTISPACE_PUNCT_RE.sub(r"\1 ", text)
-    return text
+_STEPS = ("collapse_spaces", "normalize_case")
+_STEPS_TRIMMED = ("trim_whitespace",) + _STEPS
 
 
-@dataclass
+@dataclass(slots=True)
 class NormalizedText:
     original: str
     cleaned: str
     normalized: str
-    steps: List[str]
+    steps: Sequence[str]
+    # posições (início, fim) dos tokens (TOKEN_RE) em `cleaned`
+    spans: List[Tuple[int, int]] = field(default_factory=list)
+    # idioma da frase (preenchido pelo pipeline, ver `src.langid`)
+    language: Optional["LanguageGuess"] = None
+
+    @property
+    def aligned(self) -> bool:
+        """True se `normalized` tem as mesmas posições que `cleaned` (quase sempre)."""
+        return len(self.normalized) == len(self.cleaned)
+
+    @property
+    def tokens(self) -> List[str]:
+        """Tokens em minúsculas, tal como `SimpleNLPParser` os extrai de `cleaned`."""
+        if not self.aligned:
+            return TOKEN_RE.findall(self.normalized)
+        normalized = self.normalized
+        return [normalized[start:end] for start, end in self.spans]
 
 
 class Normalizer:
@@ -31,22 +58,17 @@ class Normalizer:
     def normalize(self, text: str) -> NormalizedText:
         if text is None:
             text = ""
-        steps: List[str] = []
         original = text
         cleaned = text.strip()
-        if cleaned != text:
-            steps.append("trim_whitespace")
-        cleaned = WHITESPACE_RE.sub(" ", cleaned)
-        cleaned = _cleanup_spacing(cleaned)
-        cleaned = DOUBLE_PUNCT_RE.sub(lambda m: m.group(1), cleaned)
+        steps = _STEPS_TRIMMED if cleaned != text else _STEPS
+        cleaned = FUSED_SPACING_RE.sub(r"\1 ", cleaned)
         normalized = cleaned.lower()
-        steps.append("collapse_spaces")
-        steps.append("normalize_case")
         return NormalizedText(
             original=original,
             cleaned=cleaned,
             normalized=normalized,
             steps=steps,
+            spans=[m.span() for m in TOKEN_RE.finditer(cleaned)],
         )
 
 
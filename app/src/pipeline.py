@@ -1,34 +1,429 @@
 """NLP pipeline orchestrator."""
 from __future__ import annotations
 
-from dataclasses import asdict
-from typing import Any, Dict
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from functools import cached_property, lru_cache
+from itertools import islice
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from .nlp_parser import SimpleNLPParser
-from .normalizer import Normalizer
-from .rules import RuleBasedClassifier
+from . import nlp_parser
+from .columnar import ColumnarBatch
+from .instrumentation import Instrumentation
+from .langid import LanguageGuess, LanguageModel, default_model
+from .lexicon import LEXICON
+from .nlp_parser import ParsedSentence, SimpleNLPParser
+from .normalizer import NormalizedText, Normalizer
+from .result_cache import ResultCache, content_hash, fingerprint
+from .rules import ClassificationResult, RuleBasedClassifier
 from .sentiment import SentimentAnalyzer
-from .spellchecker import SpellChecker
+from .spellchecker import ENGINES, Correction, PassthroughSpellChecker, SpellChecker
+
+# Incrementar quando o formato do output ou as regras mudam (invalida a cache de resultados).
+RESULT_FORMAT = 3
+
+STAGES = ("normalizer", "spellchecker", "parser", "classifier", "sentiment")
+
+# Resultados das etapas de uma frase: (normalizado, texto corrigido, correções,
+# análise, classificação, sentimento); etapas que não correram ficam None. O
+# idioma da frase vem em `normalizado.language`.
+StageResults = Tuple[
+    NormalizedText, Optional[str], Optional[List[Correction]], Optional[ParsedSentence],
+    Optional[ClassificationResult], Optional[Tuple[float, float, str]],
+]
+
+# Campos do output de `process()` (por ordem) e a última etapa de que cada um precisa.
+OUTPUT_FIELDS = (
+    "original", "normalizada", "idioma", "corrigida", "correcoes", "tipo", "pessoal_factual",
+    "polaridade", "subjetividade", "emocao", "evidencias", "debug_features",
+)
+FIELD_STAGES = {
+    "original": "normalizer",
+    "normalizada": "normalizer",
+    "idioma": "normalizer",
+    "corrigida": "spellchecker",
+    "correcoes": "spellchecker",
+    "tipo": "classifier",
+    "pessoal_factual": "classifier",
+    "evidencias": "classifier",
+    "polaridade": "sentiment",
+    "subjetividade": "sentiment",
+    "emocao": "sentiment",
+    "debug_features": "parser",
+}
+
+
+def validate_fields(fields: Iterable[str]) -> Tuple[str, ...]:
+    """Normaliza uma projeção de campos (ordem de `OUTPUT_FIELDS`); ValueError se houver desconhecidos."""
+    requested = set(fields)
+    unknown = requested.difference(OUTPUT_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown output fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in OUTPUT_FIELDS if name in requested)
+
+
+@dataclass(frozen=True)
+class PipelineConfig:
+    """
+    Etapas ativas e opções do `NLPPipeline`.
+
+    `spellcheck=False` desliga o corretor: "corrigida" é o texto normalizado,
+    "correcoes" fica vazio e os dicionários nunca são carregados.
+
+    Para muitos workers, `shared_dictionaries` (ficheiro criado uma vez pelo
+    processo pai, ver `src.shared_dictionaries`) e `lexicon_path` (léxico
+    compilado, ver `src.compiled_lexicon`) são mapeados só de leitura: todos
+    os processos partilham as mesmas páginas em vez de terem cópias.
+
+    `spellchecker_engine=None` escolhe `default_engine`: "symspell" com
+    `shared_dictionaries` e "pyspellchecker" sem eles. O índice SymSpell
+    leva ~8-14 s a construir em cada processo, o que só compensa em
+    serviços que o constroem em `warmup()` e corrigem muitas palavras
+    desconhecidas.
+    """
+
+    spellcheck: bool = True
+    spellchecker_engine: Optional[str] = None
+    shared_dictionaries: Optional[str] = None
+    lexicon_path: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.spellchecker_engine is not None and self.spellchecker_engine not in ENGINES:
+            raise ValueError(
+                f"unknown spellchecker engine {self.spellchecker_engine!r} (expected one of {ENGINES})"
+            )
+        if self.shared_dictionaries is not None and self.spellchecker_engine not in (None, "symspell"):
+            raise ValueError("shared dictionaries require the symspell engine")
+
+
+@dataclass
+class BatchStats:
+    """Aggregated timings of a `process_batch` run."""
+
+    sentences: int = 0
+    wall_seconds: float = 0.0
+    stage_seconds: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+
+    def add_stage_seconds(self, stage_seconds: Dict[str, float]) -> None:
+        for stage, seconds in stage_seconds.items():
+            self.stage_seconds[stage] += seconds
+
+    def throughput(self) -> Dict[str, float]:
+        """Sentences per second, per stage and end-to-end ("total")."""
+        rates = {
+            stage: (self.sentences / seconds if seconds else 0.0)
+            for stage, seconds in self.stage_seconds.items()
+        }
+        rates["total"] = self.sentences / self.wall_seconds if self.wall_seconds else 0.0
+        return rates
 
 
 class NLPPipeline:
-    def __init__(self) -> None:
-        self.normalizer = Normalizer()
-        self.spellchecker = SpellChecker()
-        self.parser = SimpleNLPParser()
-        self.classifier = RuleBasedClassifier()
-        self.sentiment = SentimentAnalyzer()
-
-    def process(self, text: str) -> Dict[str, Any]:
+    """
+    Normalização, correção, análise, regras e sentimento de uma frase.
+
+    Cada etapa é criada no primeiro uso (construir o pipeline não carrega
+    dicionários); `warmup()` carrega tudo de uma vez, ex.: antes de aceitar
+    pedidos. As etapas podem ser substituídas por atribuição.
+    """
+
+    def __init__(
+        self,
+        instrumentation: Optional[Instrumentation] = None,
+        result_cache: Optional[ResultCache] = None,
+        config: Optional[PipelineConfig] = None,
+    ) -> None:
+        self.config = config if config is not None else PipelineConfig()
+        self.last_batch_stats: Optional[BatchStats] = None
+        self.instrumentation = instrumentation
+        # Resultados completos por texto normalizado (frases repetidas não voltam a correr as etapas)
+        self.result_cache = result_cache
+        self._cache_version: Optional[Tuple[Tuple[Any, ...], str]] = None
+        # `DocumentAnalyzer` de `process_document` (o conjunto de processos fica entre chamadas)
+        self._document_analyzer: Optional[Any] = None
+        if instrumentation is not None:
+            instrumentation.register_cache("correction", lambda: self.spellchecker.cache.stats())
+            if result_cache is not None:
+                instrumentation.register_cache("result", result_cache.stats)
+
+    # --- etapas (preguiçosas) ----------------------------------------------
+
+    @cached_property
+    def normalizer(self) -> Normalizer:
+        return Normalizer()
+
+    @cached_property
+    def spellchecker(self) -> SpellChecker:
+        if not self.config.spellcheck:
+            return PassthroughSpellChecker()
+        return SpellChecker(
+            engine=self.config.spellchecker_engine,
+            shared_dictionaries=self.config.shared_dictionaries,
+            language_model=self.language_model,
+        )
+
+    @cached_property
+    def language_model(self) -> LanguageModel:
+        return default_model()
+
+    @cached_property
+    def parser(self) -> SimpleNLPParser:
+        return SimpleNLPParser()
+
+    @cached_property
+    def classifier(self) -> RuleBasedClassifier:
+        return RuleBasedClassifier()
+
+    @cached_property
+    def sentiment(self) -> SentimentAnalyzer:
+        if self.config.lexicon_path is not None:
+            from .compiled_lexicon import load_lexicon
+
+            return SentimentAnalyzer(load_lexicon(self.config.lexicon_path))
+        return SentimentAnalyzer()
+
+    @property
+    def cache_version(self) -> str:
+        """
+        Impressão digital de tudo aquilo de que o output depende: léxico,
+        vocabulários do parser, dicionários e motor do corretor (sem carregar
+        os dicionários) e modelo de idioma. Recalculada quando o léxico, o
+        corretor ou o modelo de idioma são substituídos.
+        """
+        lexicon = self.sentiment.lexicon
+        spellchecker = self.spellchecker
+        language_model = self.language_model
+        identity = (id(lexicon), id(spellchecker), spellchecker.engine, id(language_model))
+        if self._cache_version is None or self._cache_version[0] != identity:
+            version = fingerprint([
+                RESULT_FORMAT,
+                sorted((LEXICON if lexicon is None else lexicon).items()),
+                *(sorted(vocabulary) for vocabulary in (
+                    nlp_parser.NEGATIONS, nlp_parser.QUESTION_TERMS, nlp_parser.FIRST_PERSON,
+                    nlp_parser.OPINION_MARKERS, nlp_parser.FACTUAL_MARKERS,
+                )),
+                spellchecker.version,
+                language_model.tag,
+            ])
+            self._cache_version = (identity, version)
+        return self._cache_version[1]
+
+    def warmup(self) -> None:
+        """Cria já todas as etapas, modelo de idioma, dicionários e índice SymSpell em vez de na primeira frase."""
+        for stage in STAGES:
+            getattr(self, stage)
+        self.language_model
+        self.spellchecker.warmup()
+
+    def prepare_workers(self) -> None:
+        """
+        Antes de criar workers: com dicionários partilhados, garante que o
+        ficheiro existe (construído aqui, uma vez) para os workers só o mapearem.
+        """
+        if self.config.spellcheck and self.config.shared_dictionaries is not None:
+            self.spellchecker.warmup()
+
+    def _identify(self, normalized: NormalizedText) -> LanguageGuess:
+        """Idioma da frase pelos seus tokens, guardado em `normalized.language` (calculado uma vez)."""
+        if normalized.language is None:
+            cleaned = normalized.cleaned
+            normalized.language = self.language_model.identify(cleaned[start:end] for start, end in normalized.spans)
+        return normalized.language
+
+    def _correct(self, normalized: NormalizedText) -> Tuple[str, List[Correction]]:
+        return self.spellchecker.correct_sentence(
+            normalized.cleaned, normalized.spans, normalized.language.dictionary
+        )
+
+    def _parse(self, normalized: NormalizedText, corrected_text: str, corrections: List[Correction]) -> ParsedSentence:
+        # Sem correções o texto é o mesmo: reaproveitar minúsculas e tokens
+        if not corrections and normalized.aligned:
+            return self.parser.parse(corrected_text, normalized.normalized, normalized.spans)
+        return self.parser.parse(corrected_text)
+
+    def process(self, text: str, fields: Optional[Collection[str]] = None) -> Dict[str, Any]:
+        """
+        Analisa uma frase. Com `fields` devolve só esses campos e salta as
+        etapas de que nenhum deles precisa (ex.: só `normalizada` não corre o
+        corretor; só `corrigida` não corre parser, regras nem sentimento).
+        """
+        projection = validate_fields(fields) if fields is not None else None
+        if self.result_cache is not None:
+            return self._process_cached(text, projection)
+        if projection is not None:
+            return self._process_projected(text, projection)
+        if self.instrumentation is not None:
+            return self._process_timed(text)
+        return self._analyze(self.normalizer.normalize(text))
+
+    def _analyze(self, normalized: NormalizedText) -> Dict[str, Any]:
+        """Etapas a seguir à normalização (o modo documento normaliza o texto inteiro uma vez)."""
+        self._identify(normalized)
+        corrected_text, corrections = self._correct(normalized)
+        parsed = self._parse(normalized, corrected_text, corrections)
+        classification = self.classifier.classify(parsed, corrected_text)
+        sentiment = self.sentiment.analyze_parsed(parsed)
+        return self._build_output(normalized, corrected_text, corrections, parsed, classification, sentiment)
+
+    def _process_cached(
+        self,
+        text: str,
+        fields: Optional[Sequence[str]] = None,
+        stage_seconds: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Any]:
+        """
+        `process` através de `self.result_cache`, com chave no texto normalizado.
+
+        Guarda-se sempre o output completo (numa falha com `fields` correm
+        todas as etapas), para que qualquer projeção seja servida da cache.
+        """
+        normalized = self.normalizer.normalize(text)
+        key = content_hash("nlp", self.cache_version, normalized.cleaned)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            output = {"original": normalized.original, **cached}
+        else:
+            output = self._process_timed(text, stage_seconds)
+            self.result_cache.put(key, {name: value for name, value in output.items() if name != "original"})
+        return output if fields is None else {name: output[name] for name in fields}
+
+    def process_document(self, text: str, workers: int = 1) -> Dict[str, Any]:
+        """
+        Modo documento (`src.document`): o texto é partido em frases (PT/EN),
+        cada frase é analisada como em `process` e o resultado junta as
+        análises das frases e estatísticas do documento inteiro.
+
+        Com `workers > 1` o conjunto de processos (cada um carrega dicionários
+        e índice SymSpell) é criado no primeiro documento longo e reutilizado
+        pelas chamadas seguintes com o mesmo `workers`, até `close()`.
+        """
+        from .document import DocumentAnalyzer
+
+        analyzer = self._document_analyzer
+        if analyzer is None or analyzer.workers != workers:
+            if analyzer is not None:
+                analyzer.close()
+            analyzer = self._document_analyzer = DocumentAnalyzer(self, workers=workers)
+        return analyzer.analyze(text)
+
+    def close(self) -> None:
+        """Termina os processos do modo documento (se existirem)."""
+        if self._document_analyzer is not None:
+            self._document_analyzer.close()
+            self._document_analyzer = None
+
+    def _process_timed(self, text: str, stage_seconds: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Same as `process`, timing each stage (wall and thread CPU time).
+
+        Wall times are added to `stage_seconds` when given, and everything is
+        recorded in `self.instrumentation` when enabled.
+        """
+        return self._build_output(*self._run_timed(text, stage_seconds))
+
+    def _run_timed(self, text: str, stage_seconds: Optional[Dict[str, float]] = None) -> StageResults:
+        """Etapas de `_process_timed`, devolvendo os resultados de cada uma (sem construir o dict)."""
+        clock = time.perf_counter
+        cpu_clock = time.thread_time
+        w0, c0 = clock(), cpu_clock()
         normalized = self.normalizer.normalize(text)
-        corrected_text, corrections = self.spellchecker.correct_sentence(normalized.cleaned)
-        parsed = self.parser.parse(corrected_text)
+        self._identify(normalized)
+        w1, c1 = clock(), cpu_clock()
+        corrected_text, corrections = self._correct(normalized)
+        w2, c2 = clock(), cpu_clock()
+        parsed = self._parse(normalized, corrected_text, corrections)
+        w3, c3 = clock(), cpu_clock()
         classification = self.classifier.classify(parsed, corrected_text)
-        polarity, subjectivity, emotion = self.sentiment.analyze(parsed.tokens)
+        w4, c4 = clock(), cpu_clock()
+        sentiment = self.sentiment.analyze_parsed(parsed)
+        w5, c5 = clock(), cpu_clock()
+
+        wall = {
+            "normalizer": w1 - w0,
+            "spellchecker": w2 - w1,
+            "parser": w3 - w2,
+            "classifier": w4 - w3,
+            "sentiment": w5 - w4,
+        }
+        if stage_seconds is not None:
+            for stage, seconds in wall.items():
+                stage_seconds[stage] += seconds
+        if self.instrumentation is not None:
+            cpu = {
+                "normalizer": c1 - c0,
+                "spellchecker": c2 - c1,
+                "parser": c3 - c2,
+                "classifier": c4 - c3,
+                "sentiment": c5 - c4,
+            }
+            self.instrumentation.record_sentence(wall, cpu, len(parsed.tokens), len(corrections))
+        return normalized, corrected_text, corrections, parsed, classification, sentiment
+
+    def _process_projected(
+        self,
+        text: str,
+        fields: Sequence[str],
+        stage_seconds: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, Any]:
+        """`process` limitado aos campos `fields` (já validados), cronometrando as etapas que correm."""
+        output = self._build_partial_output(*self._run_projected(text, fields, stage_seconds))
+        return {name: output[name] for name in fields}
+
+    def _run_projected(
+        self,
+        text: str,
+        fields: Sequence[str],
+        stage_seconds: Optional[Dict[str, float]] = None,
+    ) -> StageResults:
+        """Só as etapas de que `fields` precisa; as restantes ficam None."""
+        stages = {FIELD_STAGES[name] for name in fields}
+        needs_parse = not stages.isdisjoint(("parser", "classifier", "sentiment"))
+        clock = time.perf_counter
+        cpu_clock = time.thread_time
+        wall: Dict[str, float] = {}
+        cpu: Dict[str, float] = {}
+        corrected_text = corrections = parsed = classification = sentiment = None
 
+        start, cpu_start = clock(), cpu_clock()
+        normalized = self.normalizer.normalize(text)
+        if needs_parse or "spellchecker" in stages or "idioma" in fields:
+            self._identify(normalized)
+        wall["normalizer"], cpu["normalizer"] = clock() - start, cpu_clock() - cpu_start
+        if needs_parse or "spellchecker" in stages:
+            start, cpu_start = clock(), cpu_clock()
+            corrected_text, corrections = self._correct(normalized)
+            wall["spellchecker"], cpu["spellchecker"] = clock() - start, cpu_clock() - cpu_start
+        if needs_parse:
+            start, cpu_start = clock(), cpu_clock()
+            parsed = self._parse(normalized, corrected_text, corrections)
+            wall["parser"], cpu["parser"] = clock() - start, cpu_clock() - cpu_start
+        if "classifier" in stages:
+            start, cpu_start = clock(), cpu_clock()
+            classification = self.classifier.classify(parsed, corrected_text)
+            wall["classifier"], cpu["classifier"] = clock() - start, cpu_clock() - cpu_start
+        if "sentiment" in stages:
+            start, cpu_start = clock(), cpu_clock()
+            sentiment = self.sentiment.analyze_parsed(parsed)
+            wall["sentiment"], cpu["sentiment"] = clock() - start, cpu_clock() - cpu_start
+
+        if stage_seconds is not None:
+            for stage, seconds in wall.items():
+                stage_seconds[stage] += seconds
+        if self.instrumentation is not None:
+            self.instrumentation.record_sentence(
+                wall, cpu, len(parsed.tokens) if parsed is not None else 0, len(corrections or ())
+            )
+        return normalized, corrected_text, corrections, parsed, classification, sentiment
+
+    @staticmethod
+    def _build_output(normalized, corrected_text, corrections, parsed, classification, sentiment) -> Dict[str, Any]:
+        polarity, subjectivity, emotion = sentiment
         return {
             "original": normalized.original,
             "normalizada": normalized.normalized,
+            "idioma": normalized.language.language,
             "corrigida": corrected_text,
             "correcoes": [
                 {"from": c.original, "to": c.corrected, "pos": c.position}
@@ -48,11 +443,198 @@ class NLPPipeline:
             },
         }
 
+    @staticmethod
+    def _build_partial_output(normalized, corrected_text, corrections, parsed, classification, sentiment) -> Dict[str, Any]:
+        """Como `_build_output`, só com os campos das etapas que correram."""
+        output: Dict[str, Any] = {"original": normalized.original, "normalizada": normalized.normalized}
+        if normalized.language is not None:
+            output["idioma"] = normalized.language.language
+        if corrections is not None:
+            output["corrigida"] = corrected_text
+            output["correcoes"] = [
+                {"from": c.original, "to": c.corrected, "pos": c.position}
+                for c in corrections
+            ]
+        if classification is not None:
+            output["tipo"] = classification.sentence_type
+            output["pessoal_factual"] = classification.nature
+        if sentiment is not None:
+            polarity, subjectivity, emotion = sentiment
+            output["polaridade"] = round(polarity, 2)
+            output["subjetividade"] = round(subjectivity, 2)
+            output["emocao"] = emotion
+        if classification is not None:
+            output["evidencias"] = classification.evidences
+        if parsed is not None:
+            output["debug_features"] = {
+                "has_negation": parsed.has_negation,
+                "is_question": parsed.is_question,
+                "is_exclamation": parsed.is_exclamation,
+                "first_person": parsed.first_person,
+            }
+        return output
+
+    def _process_chunk(
+        self, chunk: List[str], fields: Optional[Sequence[str]] = None, columnar: bool = False
+    ) -> Tuple[Union[List[Dict[str, Any]], ColumnarBatch], Dict[str, float]]:
+        stage_seconds = dict.fromkeys(STAGES, 0.0)
+        if columnar:
+            return self._process_chunk_columnar(chunk, fields, stage_seconds), stage_seconds
+        if self.result_cache is not None:
+            results = [self._process_cached(text, fields, stage_seconds) for text in chunk]
+        elif fields is None:
+            results = [self._process_timed(text, stage_seconds) for text in chunk]
+        else:
+            results = [self._process_projected(text, fields, stage_seconds) for text in chunk]
+        return results, stage_seconds
+
+    def _process_chunk_columnar(
+        self, chunk: List[str], fields: Optional[Sequence[str]], stage_seconds: Dict[str, float]
+    ) -> ColumnarBatch:
+        batch = ColumnarBatch(fields if fields is not None else OUTPUT_FIELDS)
+        if self.result_cache is not None:
+            for text in chunk:
+                batch.append_output(self._process_cached(text, fields, stage_seconds))
+        elif fields is None:
+            for text in chunk:
+                batch.append(*self._run_timed(text, stage_seconds))
+        else:
+            for text in chunk:
+                batch.append(*self._run_projected(text, fields, stage_seconds))
+        return batch
+
+    def process_batch(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 256,
+        fields: Optional[Collection[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Processa muitas frases, devolvendo os resultados pela ordem de entrada.
+
+        Com `workers > 1` os blocos de `chunksize` frases são distribuídos por
+        processos que carregam os dicionários uma única vez. `workers=None`
+        usa todos os cores. O input é consumido de forma preguiçosa e os
+        tempos por etapa ficam em `self.last_batch_stats`. `fields` funciona
+        como em `process`.
+        """
+        for results in self._map_chunks(texts, workers, chunksize, fields, columnar=False):
+            yield from results
+
+    def process_columnar(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 4096,
+        fields: Optional[Collection[str]] = None,
+    ) -> Iterator[ColumnarBatch]:
+        """
+        Como `process_batch`, mas devolve um `ColumnarBatch` (colunas
+        compactas, ver `src.columnar`) por bloco de `chunksize` frases, sem
+        criar um dict por frase. `ColumnarBatch.concat(...)` junta os blocos.
+        """
+        return self._map_chunks(texts, workers, chunksize, fields, columnar=True)
+
+    def _map_chunks(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int],
+        chunksize: int,
+        fields: Optional[Collection[str]],
+        columnar: bool,
+    ) -> Iterator[Any]:
+        """Resultados de cada bloco de `texts` (lista de dicts ou `ColumnarBatch`), por ordem."""
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1")
+        projection = validate_fields(fields) if fields is not None else None
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        stats = BatchStats()
+        self.last_batch_stats = stats
+        started = time.perf_counter()
+        chunks = _chunked(texts, chunksize)
+
+        if workers <= 1:
+            for chunk in chunks:
+                results, stage_seconds = self._process_chunk(chunk, projection, columnar)
+                stats.add_stage_seconds(stage_seconds)
+                stats.sentences += len(results)
+                stats.wall_seconds = time.perf_counter() - started
+                yield results
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.prepare_workers()
+        instrumented = self.instrumentation is not None
+        # cada worker abre a sua cache com a mesma configuração (e o mesmo ficheiro SQLite)
+        cache_config = self.result_cache.config() if self.result_cache is not None else None
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(instrumented, cache_config, self.config)
+        ) as executor:
+            # Limitar blocos em voo para manter memória constante com inputs enormes.
+            pending: deque = deque()
+            for chunk in islice(chunks, workers * 2):
+                pending.append(executor.submit(_process_chunk_in_worker, chunk, projection, columnar))
+            while pending:
+                results, stage_seconds, metrics, pid = pending.popleft().result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    pending.append(executor.submit(_process_chunk_in_worker, next_chunk, projection, columnar))
+                if metrics is not None:
+                    self.instrumentation.merge(metrics, source_pid=pid)
+                stats.add_stage_seconds(stage_seconds)
+                stats.sentences += len(results)
+                stats.wall_seconds = time.perf_counter() - started
+                yield results
+
+
+def _chunked(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Pipeline de cada processo worker (criado uma vez pelo initializer).
+_WORKER_PIPELINE: Optional[NLPPipeline] = None
+
+
+def _init_worker(
+    instrumented: bool = False,
+    cache_config: Optional[Dict[str, Any]] = None,
+    config: Optional[PipelineConfig] = None,
+) -> None:
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = NLPPipeline(
+        Instrumentation() if instrumented else None,
+        ResultCache(**cache_config) if cache_config is not None else None,
+        config,
+    )
+
+
+def _process_chunk_in_worker(
+    chunk: List[str], fields: Optional[Sequence[str]] = None, columnar: bool = False
+) -> Tuple[Any, Dict[str, float], Optional[Instrumentation], int]:
+    """Processa um bloco e devolve também as métricas acumuladas desde o último bloco."""
+    results, stage_seconds = _WORKER_PIPELINE._process_chunk(chunk, fields, columnar)
+    instrumentation = _WORKER_PIPELINE.instrumentation
+    metrics = instrumentation.drain() if instrumentation is not None else None
+    return results, stage_seconds, metrics, os.getpid()
+
+
+@lru_cache(maxsize=1)
+def _default_pipeline() -> NLPPipeline:
+    return NLPPipeline()
+
 
 def analyze_sentence(sentence: str) -> Dict[str, Any]:
-    """Convenience helper for quick scripts/tests."""
-    pipeline = NLPPipeline()
-    return pipeline.process(sentence)
+    """Convenience helper for quick scripts/tests (reuses one shared pipeline)."""
+    return _default_pipeline().process(sentence)
 
 
-__all__ = ["NLPPipeline", "analyze_sentence"]
+__all__ = ["NLPPipeline", "BatchStats", "ColumnarBatch", "PipelineConfig", "OUTPUT_FIELDS", "analyze_sentence", "validate_fields"]
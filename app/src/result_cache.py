@@ -0,0 +1,268 @@
+"""
+Cache de resultados endereçada por conteúdo (frases e gravações repetidas).
+
+Duas camadas: uma LRU em memória e, opcionalmente, uma base SQLite em disco
+(partilhável entre processos e reinícios) com TTL e limite de tamanho. As
+chaves são o SHA-256 do conteúdo (texto normalizado ou bytes do áudio)
+combinado com uma versão que resume tudo aquilo de que o resultado depende:
+léxico, vocabulários do parser, dicionários, tamanho do modelo... Mudar o
+léxico muda a versão e as entradas antigas deixam simplesmente de ser usadas
+(e acabam removidas pelo TTL ou pelo limite de tamanho).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import sqlite3
+
+Content = Union[str, bytes, bytearray, memoryview]
+
+
+def content_hash(*parts: Content) -> str:
+    """SHA-256 (hex) de várias partes, separadas sem ambiguidade."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else bytes(part)
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def fingerprint(items: Iterable[Any]) -> str:
+    """Impressão digital curta de dados estruturados (ex.: um léxico) para versões de cache."""
+    digest = hashlib.sha256()
+    for item in items:
+        digest.update(repr(item).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Cache de dois níveis: LRU em memória (`maxsize` entradas) + SQLite opcional.
+
+    As chaves já vêm versionadas de quem usa a cache (ver `content_hash`), por
+    isso a mesma cache pode ser partilhada pelo pipeline e pelo áudio. Os
+    valores são objetos JSON. `ttl` (segundos) aplica-se às duas camadas;
+    `max_disk_bytes` limita o tamanho dos valores guardados em disco (as
+    entradas menos usadas recentemente são apagadas primeiro). A cache é
+    segura entre threads; vários processos podem abrir o mesmo ficheiro.
+
+    Uma leitura do disco não escreve: o instante de acesso só conta se o
+    guardado tiver mais de `ACCESS_RESOLUTION` segundos e fica em memória
+    até ser gravado de uma vez (antes de apagar entradas por tamanho, a cada
+    `EVICTION_INTERVAL` acessos pendentes e em `close`). Os workers que
+    partilham o ficheiro não se bloqueiam uns aos outros a cada acerto.
+    """
+
+    SCHEMA_VERSION = 1
+    # de quantas em quantas escritas se verifica o limite de tamanho em disco
+    EVICTION_INTERVAL = 256
+    # precisão (segundos) do instante de último acesso usado pela remoção por tamanho
+    ACCESS_RESOLUTION = 60.0
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_disk_bytes: Optional[int] = None,
+    ) -> None:
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self.path = path
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # chave -> (JSON, instante de expiração ou None)
+        self._memory: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional["sqlite3.Connection"] = None
+        self._writes = 0
+        # chave -> instante de acesso ainda por gravar em disco
+        self._accessed: Dict[str, float] = {}
+        if path:
+            self._open(path)
+
+    def config(self) -> Dict[str, Any]:
+        """Argumentos para criar uma cache equivalente (ex.: noutro processo)."""
+        return {
+            "maxsize": self.maxsize,
+            "path": self.path,
+            "ttl": self.ttl,
+            "max_disk_bytes": self.max_disk_bytes,
+        }
+
+    # --- disco -------------------------------------------------------------
+
+    def _open(self, path: str) -> None:
+        import sqlite3
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " expires REAL, accessed REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+        db.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+        self._db = db
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._flush_accessed()
+                self._db.close()
+                self._db = None
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[str, Optional[float]]]:
+        row = self._db.execute("SELECT value, expires, accessed FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires, accessed = row
+        if expires is not None and expires <= now:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            return None
+        if now - accessed >= self.ACCESS_RESOLUTION:
+            self._accessed[key] = now
+            if len(self._accessed) >= self.EVICTION_INTERVAL:
+                self._flush_accessed()
+        return value, expires
+
+    def _flush_accessed(self) -> None:
+        """Grava os instantes de acesso pendentes numa só transação."""
+        if not self._accessed:
+            return
+        updates = [(accessed, key) for key, accessed in self._accessed.items()]
+        self._accessed.clear()
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany("UPDATE results SET accessed = MAX(accessed, ?) WHERE key = ?", updates)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _disk_put(self, key: str, value: str, expires: Optional[float], now: float) -> None:
+        self._accessed.pop(key, None)
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), expires, now),
+        )
+        self._writes += 1
+        if self._writes % self.EVICTION_INTERVAL == 0:
+            self._evict_disk(now)
+
+    def _evict_disk(self, now: float) -> None:
+        self._flush_accessed()
+        self._db.execute("DELETE FROM results WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        if self.max_disk_bytes is None:
+            return
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        if total <= self.max_disk_bytes:
+            return
+        # apagar as menos usadas até ficar a 90% do limite
+        excess = total - int(self.max_disk_bytes * 0.9)
+        removed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            victims.append((key,))
+            removed += size
+            if removed >= excess:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    # --- API ---------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return json.loads(entry[0])
+            if entry is not None:
+                del self._memory[key]
+            if self._db is not None:
+                entry = self._disk_get(key, now)
+                if entry is not None:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._remember(key, entry)
+                    return json.loads(entry[0])
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remember(key, (encoded, expires))
+            if self._db is not None:
+                self._disk_put(key, encoded, expires, now)
+
+    def _remember(self, key: str, entry: Tuple[str, Optional[float]]) -> None:
+        if not self.maxsize:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._accessed.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self, disk: bool = False) -> Dict[str, int]:
+        """
+        Contadores da cache. `disk=True` junta o número de entradas e os bytes
+        em disco (`disk_entries`, `disk_bytes`): percorre a tabela toda, por
+        isso fica fora dos contadores recolhidos pela instrumentação.
+        """
+        with self._lock:
+            stats = {
+                "size": len(self._memory),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+            if disk and self._db is not None:
+                count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+                stats["disk_entries"] = count
+                stats["disk_bytes"] = size
+            return stats
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # a ligação SQLite não atravessa processos: reabrir a partir da configuração
+        return self.config()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+
+__all__ = ["ResultCache", "content_hash", "fingerprint"]
@@ -1,14 +1,12 @@
 """Rule based reasoning for type/nature/evidence extraction."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from typing import List, NamedTuple
 
 from .nlp_parser import ParsedSentence
 
 
-@dataclass
-class ClassificationResult:
+class ClassificationResult(NamedTuple):
     sentence_type: str
     nature: str
     evidences: List[str]
@@ -2,144 +2,85 @@
 from __future__ import annotations
 
 from collections import Counter
-from typing import Dict, Tuple
-
-# Importar as negações do parser
-from .nlp_parser import NEGATIONS
-
-# Estrutura: "palavra": (Polaridade, Subjetividade, Emoção)
-# Polaridade: -1.0 (Negativo) a 1.0 (Positivo)
-LEXICON: Dict[str, Tuple[float, float, str]] = {
-    # --- ALEGRIA (JOY) ---
-    "feliz": (0.9, 0.7, "alegria"), "contente": (0.8, 0.6, "alegria"),
-    "excelente": (0.9, 0.6, "alegria"), "bom": (0.6, 0.5, "alegria"),
-    "adoro": (0.9, 0.8, "alegria"), "amo": (1.0, 0.9, "alegria"),
-    "fantástico": (0.9, 0.8, "alegria"), "maravilhoso": (1.0, 0.9, "alegria"),
-    "happy": (0.9, 0.7, "alegria"), "great": (0.8, 0.6, "alegria"),
-    "love": (0.9, 0.8, "alegria"), "good": (0.6, 0.5, "alegria"),
-    "amazing": (0.9, 0.8, "alegria"), "fun": (0.8, 0.6, "alegria"),
-    "ganhei": (0.9, 0.5, "alegria"), "win": (0.9, 0.5, "alegria"),
-    "parabéns": (0.9, 0.6, "alegria"), "congrats": (0.9, 0.6, "alegria"),
-    "top": (0.7, 0.6, "alegria"), "fixe": (0.7, 0.6, "alegria"),
-    "legal": (0.6, 0.5, "alegria"), "espetáculo": (0.9, 0.8, "alegria"),
-    "brutal": (0.8, 0.7, "alegria"), "lindo": (0.8, 0.7, "alegria"),
-    "obrigado": (0.5, 0.2, "alegria"), "thanks": (0.5, 0.2, "alegria"),
-    "excited": (0.8, 0.7, "alegria"), "entusiasmado": (0.8, 0.7, "alegria"),
-    "orgulho": (0.9, 0.7, "alegria"), "proud": (0.9, 0.7, "alegria"),
-    "rir": (0.7, 0.5, "alegria"), "laugh": (0.7, 0.5, "alegria"),
-    "lol": (0.6, 0.4, "alegria"), "haha": (0.6, 0.4, "alegria"),
-
-    # --- TRISTEZA (SADNESS) ---
-    "infelizmente": (-0.7, 0.8, "tristeza"), "triste": (-0.9, 0.9, "tristeza"),
-    "magoado": (-0.8, 0.8, "tristeza"), "deprimido": (-0.9, 0.9, "tristeza"),
-    "pena": (-0.5, 0.6, "tristeza"), "chumbar": (-0.8, 0.5, "tristeza"),
-    "sad": (-0.8, 0.8, "tristeza"), "bad": (-0.7, 0.6, "tristeza"),
-    "sorry": (-0.5, 0.5, "tristeza"), "miss": (-0.6, 0.7, "tristeza"),
-    "cry": (-0.8, 0.8, "tristeza"), "chorar": (-0.8, 0.8, "tristeza"),
-    "alone": (-0.7, 0.8, "tristeza"), "sozinho": (-0.7, 0.8, "tristeza"),
-    "perdi": (-0.8, 0.6, "tristeza"), "lost": (-0.8, 0.6, "tristeza"),
-    "saudade": (-0.6, 0.8, "tristeza"), "luto": (-1.0, 0.9, "tristeza"),
-    "desiludido": (-0.7, 0.7, "tristeza"), "disappointed": (-0.7, 0.7, "tristeza"),
-    "cansei": (-0.6, 0.6, "tristeza"), "tired": (-0.5, 0.5, "tristeza"),
-    "pobre": (-0.4, 0.2, "tristeza"), "poor": (-0.4, 0.2, "tristeza"),
-
-    # --- RAIVA (ANGER) ---
-    "raiva": (-0.9, 0.8, "raiva"), "furioso": (-0.9, 0.8, "raiva"),
-    "irritado": (-0.7, 0.8, "raiva"), "chato": (-0.6, 0.7, "raiva"),
-    "odeio": (-1.0, 0.9, "raiva"), "detesto": (-0.9, 0.9, "raiva"),
-    "estúpido": (-0.8, 0.9, "raiva"), "horrível": (-0.9, 0.8, "raiva"),
-    "anger": (-0.9, 0.8, "raiva"), "hate": (-0.9, 0.9, "raiva"),
-    "annoying": (-0.7, 0.7, "raiva"), "terrible": (-0.9, 0.8, "raiva"),
-    "mad": (-0.8, 0.8, "raiva"), "lento": (-0.5, 0.4, "raiva"),
-    "burro": (-0.8, 0.9, "raiva"), "idiot": (-0.8, 0.9, "raiva"),
-    "merda": (-0.9, 0.9, "raiva"), "shit": (-0.9, 0.9, "raiva"),
-    "porra": (-0.8, 0.9, "raiva"), "fuck": (-0.9, 0.9, "raiva"),
-    "injusto": (-0.7, 0.6, "raiva"), "unfair": (-0.7, 0.6, "raiva"),
-    "farto": (-0.7, 0.7, "raiva"), "fed up": (-0.7, 0.7, "raiva"),
-
-    # --- MEDO (FEAR) ---
-    "medo": (-0.8, 0.8, "medo"), "assustado": (-0.7, 0.8, "medo"),
-    "perigoso": (-0.7, 0.4, "medo"), "nervoso": (-0.5, 0.7, "medo"),
-    "ansioso": (-0.5, 0.8, "medo"), "pânico": (-0.9, 0.9, "medo"),
-    "scared": (-0.8, 0.8, "medo"), "afraid": (-0.7, 0.8, "medo"),
-    "fear": (-0.8, 0.8, "medo"), "danger": (-0.8, 0.5, "medo"),
-    "horror": (-0.9, 0.9, "medo"), "socorro": (-0.5, 0.6, "medo"),
-    "help": (-0.4, 0.6, "medo"), "correr": (-0.2, 0.4, "medo"),
-    "fugir": (-0.5, 0.6, "medo"), "run": (-0.2, 0.4, "medo"),
-    "stress": (-0.6, 0.5, "medo"), "tenso": (-0.5, 0.5, "medo"),
-
-    # --- SURPRESA (SURPRISE) ---
-    "surpresa": (0.3, 0.6, "surpresa"), "espantado": (0.4, 0.7, "surpresa"),
-    "choque": (-0.2, 0.8, "surpresa"), "incrivel": (0.8, 0.7, "surpresa"),
-    "wow": (0.5, 0.6, "surpresa"), "surprise": (0.3, 0.6, "surpresa"),
-    "shocked": (-0.2, 0.8, "surpresa"), "really?": (0.1, 0.5, "surpresa"),
-    "sério?": (0.1, 0.5, "surpresa"), "nossa": (0.3, 0.6, "surpresa"),
-    "eita": (0.1, 0.5, "surpresa"), "omg": (0.2, 0.6, "surpresa"),
-    "impossível": (-0.1, 0.4, "surpresa"), "impossible": (-0.1, 0.4, "surpresa"),
-
-    # --- NOJO (DISGUST) ---
-    "nojo": (-0.9, 0.9, "nojo"), "nojento": (-0.9, 0.9, "nojo"),
-    "podre": (-0.9, 0.6, "nojo"), "lixo": (-0.8, 0.8, "nojo"),
-    "enjoo": (-0.6, 0.8, "nojo"), "repugnante": (-0.9, 0.8, "nojo"),
-    "disgust": (-0.9, 0.9, "nojo"), "gross": (-0.8, 0.8, "nojo"),
-    "trash": (-0.8, 0.8, "nojo"), "sick": (-0.7, 0.8, "nojo"),
-    "ew": (-0.6, 0.9, "nojo"), "nasty": (-0.8, 0.8, "nojo"),
-    "vomitar": (-0.9, 0.9, "nojo"), "cheiro": (-0.3, 0.4, "nojo"), # contexto negativo usual
-
-    # --- CONFIANÇA (TRUST) ---
-    "confio": (0.8, 0.7, "confiança"), "verdade": (0.6, 0.2, "confiança"),
-    "certo": (0.5, 0.3, "confiança"), "seguro": (0.7, 0.4, "confiança"),
-    "amigo": (0.8, 0.6, "confiança"), "concordo": (0.6, 0.4, "confiança"),
-    "trust": (0.8, 0.7, "confiança"), "true": (0.6, 0.2, "confiança"),
-    "sure": (0.6, 0.3, "confiança"), "safe": (0.7, 0.4, "confiança"),
-    "agree": (0.6, 0.4, "confiança"), "friend": (0.8, 0.6, "confiança"),
-    "claro": (0.4, 0.2, "confiança"), "definitely": (0.5, 0.3, "confiança"),
-    "líder": (0.5, 0.3, "confiança"), "apoio": (0.7, 0.5, "confiança"),
-
-    # --- ANTECIPAÇÃO (ANTICIPATION) ---
-    "espero": (0.4, 0.6, "antecipação"), "breve": (0.2, 0.2, "antecipação"),
-    "ansiosamente": (0.6, 0.8, "antecipação"), "preparado": (0.5, 0.4, "antecipação"),
-    "hope": (0.6, 0.6, "antecipação"), "wait": (0.0, 0.5, "antecipação"),
-    "soon": (0.3, 0.2, "antecipação"), "ready": (0.5, 0.4, "antecipação"),
-    "plan": (0.2, 0.1, "antecipação"), "plano": (0.2, 0.1, "antecipação"),
-    "amanhã": (0.1, 0.1, "antecipação"), "tomorrow": (0.1, 0.1, "antecipação"),
-    "vamos": (0.3, 0.3, "antecipação"), "let's": (0.3, 0.3, "antecipação"),
-    "futuro": (0.4, 0.2, "antecipação"), "future": (0.4, 0.2, "antecipação"),
+from typing import Collection, Dict, Iterable, List, Mapping, Optional
+
+from .lexicon import EMOTION_PRIORITY, LEXICON
+from .matcher import LexiconEntry, LexiconHit, match_lexicon
+# Importar o matcher partilhado do parser
+from .nlp_parser import VOCABULARY, ParsedSentence
+
+# Emoção resultante quando a palavra vem logo a seguir a uma negação
+NEGATED_EMOTION: Dict[str, str] = {
+    "alegria": "tristeza",
+    "tristeza": "alegria",
+    "raiva": "calmo",
+    "medo": "confiança",
+    "confiança": "medo",
+    "nojo": "neutro",
+    "antecipação": "surpresa",
 }
 
-EMOTION_PRIORITY = ["raiva", "nojo", "medo", "tristeza", "alegria", "surpresa", "antecipação", "confiança"]
-
 class SentimentAnalyzer:
     """Aggregates lexicon scores with negation handling."""
 
+    def __init__(self, lexicon: Optional[Mapping[str, LexiconEntry]] = None) -> None:
+        # None = LEXICON embutido (já marcado pelo matcher do parser). Outro
+        # léxico (ex.: `compiled_lexicon.load_lexicon(...)`, ou um ChainMap
+        # de léxicos de domínio) é consultado diretamente.
+        self.lexicon = lexicon
+        self._max_words: Optional[int] = None
+        self._batch = None
+
+    @property
+    def max_words(self) -> int:
+        if self._max_words is None:
+            declared = getattr(self.lexicon, "max_words", None)
+            if declared is None:
+                declared = max((len(term.split()) for term in self.lexicon), default=1)
+            self._max_words = max(declared, 1)
+        return self._max_words
+
+    def _custom_hits(self, tokens: List[str], text: Optional[str] = None, spans=None) -> List[LexiconHit]:
+        return match_lexicon(tokens, self.lexicon, self.max_words, text, spans)
+
     def analyze(self, tokens: list[str]) -> tuple[float, float, str]:
         if not tokens:
             return 0.0, 0.0, "neutro"
-            
+        scan = VOCABULARY.scan([token.lower() for token in tokens])
+        hits = scan.lexicon_hits if self.lexicon is None else self._custom_hits(scan.tokens)
+        return self.score_hits(hits, scan.negated)
+
+    def analyze_parsed(self, parsed: ParsedSentence) -> tuple[float, float, str]:
+        """Usa as entradas do léxico já marcadas pelo parser (sem novo scan)."""
+        if not parsed.tokens:
+            return 0.0, 0.0, "neutro"
+        if self.lexicon is None:
+            hits = parsed.lexicon_hits
+        else:
+            hits = self._custom_hits(parsed.tokens, parsed.lowered, parsed.spans)
+        return self.score_hits(hits, parsed.negated_positions)
+
+    def analyze_batch(self, token_lists: List[List[str]]) -> List[tuple[float, float, str]]:
+        """Equivalente a `[self.analyze(t) for t in token_lists]`, vetorizado com NumPy."""
+        if self._batch is None:
+            from .sentiment_batch import BatchSentimentAnalyzer
+
+            self._batch = BatchSentimentAnalyzer(self.lexicon)
+        return self._batch.analyze_batch(token_lists)
+
+    def score_hits(
+        self, lexicon_hits: Iterable[LexiconHit], negated: Collection[int]
+    ) -> tuple[float, float, str]:
         total_polarity = 0.0
         total_subjectivity = 0.0
         hits = 0
         emotions = Counter()
-        
-        for i, token in enumerate(tokens):
-            token_lower = token.lower()
-            
-            entry = LEXICON.get(token_lower)
-            if not entry:
-                continue
-                
-            polarity, subjectivity, emotion = entry
-            
+
+        for position, _term, polarity, subjectivity, emotion in lexicon_hits:
             # --- LÓGICA DE NEGAÇÃO ---
-            if i > 0 and tokens[i-1].lower() in NEGATIONS:
+            if position in negated:
                 polarity = polarity * -1.0
-                if emotion == "alegria": emotion = "tristeza"
-                elif emotion == "tristeza": emotion = "alegria"
-                elif emotion == "raiva": emotion = "calmo"
-                elif emotion == "medo": emotion = "confiança"
-                elif emotion == "confiança": emotion = "medo"
-                elif emotion == "nojo": emotion = "neutro"
-                elif emotion == "antecipação": emotion = "surpresa"
+                emotion = NEGATED_EMOTION.get(emotion, emotion)
             # -------------------------
 
             total_polarity += polarity
@@ -153,12 +94,12 @@ class SentimentAnalyzer:
         polarity_score = total_polarity / hits
         subjectivity_score = total_subjectivity / hits
         
-        final_emotion = self._select_emotion(emotions)
+        final_emotion = self.select_emotion(emotions)
         
         return polarity_score, subjectivity_score, final_emotion
 
     @staticmethod
-    def _select_emotion(counter: Counter) -> str:
+    def select_emotion(counter: Counter) -> str:
         if not counter:
             return "neutro"
         best_emotion = "neutro"
@@ -172,4 +113,4 @@ class SentimentAnalyzer:
             return best_emotion
         return counter.most_common(1)[0][0]
 
-__all__ = ["SentimentAnalyzer"]
\ No newline at end of file
+__all__ = ["SentimentAnalyzer", "LEXICON", "NEGATED_EMOTION"]
\ No newline at end of file
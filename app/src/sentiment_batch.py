@@ -0,0 +1,153 @@
+"""
+Vectorized (NumPy) sentiment scoring for many sentences at once.
+
+Todas as frases são achatadas num único array de tokens (ragged: offsets por
+frase). Cada token é convertido num código com o id do léxico e a flag de
+negação (uma consulta a dict por token); a inversão por negação usa uma
+máscara deslocada e uma tabela de remapeamento de emoções, e as médias e
+histogramas de emoções por frase saem de `np.bincount` sobre o id da frase.
+
+`np.bincount` acumula os pesos sequencialmente pela ordem dos tokens, tal
+como o ciclo escalar, por isso os resultados são bit-a-bit iguais aos de
+`SentimentAnalyzer.analyze`. Frases com inícios de expressões com várias
+palavras ("fed up") ou cuja emoção só é decidida pelo desempate do
+`Counter` (apenas emoções fora de `EMOTION_PRIORITY`) usam o caminho escalar.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .lexicon import EMOTION_PRIORITY, LEXICON
+from .matcher import LexiconEntry
+from .nlp_parser import NEGATIONS
+from .sentiment import NEGATED_EMOTION, SentimentAnalyzer
+
+SentimentScore = Tuple[float, float, str]
+
+
+class BatchSentimentAnalyzer:
+    """Tabelas NumPy pré-calculadas de um léxico, reutilizáveis entre lotes."""
+
+    def __init__(self, lexicon: Optional[Mapping[str, LexiconEntry]] = None) -> None:
+        self.lexicon = lexicon
+        self._scalar = SentimentAnalyzer(lexicon)
+        entries = LEXICON if lexicon is None else lexicon
+
+        unigrams: List[Tuple[str, LexiconEntry]] = []
+        phrase_starts = set()
+        for term, entry in entries.items():
+            words = term.split()
+            if len(words) == 1 and term[-1] not in "?!":
+                unigrams.append((term, entry))
+            else:
+                phrase_starts.add(words[0].rstrip("?!"))
+                phrase_starts.add(words[0])
+
+        emotions = list(EMOTION_PRIORITY)
+        for _, (_, _, emotion) in unigrams:
+            if emotion not in emotions:
+                emotions.append(emotion)
+        # a tabela de remapeamento cobre todas as emoções (incl. as de
+        # EMOTION_PRIORITY), por isso a lista tem de ser fechada pela negação
+        for name in emotions:
+            negated = NEGATED_EMOTION.get(name, name)
+            if negated not in emotions:
+                emotions.append(negated)
+        self.emotions = emotions
+        emotion_index = {name: i for i, name in enumerate(emotions)}
+        self._n_priority = len(EMOTION_PRIORITY)
+
+        self._polarity = np.array([entry[0] for _, entry in unigrams], dtype=np.float64)
+        self._subjectivity = np.array([entry[1] for _, entry in unigrams], dtype=np.float64)
+        self._emotion = np.array([emotion_index[entry[2]] for _, entry in unigrams], dtype=np.intp)
+        self._negated_emotion = np.array(
+            [emotion_index[NEGATED_EMOTION.get(name, name)] for name in emotions], dtype=np.intp
+        )
+
+        # código = (id no léxico + 1) * 4 + 2 * início de expressão + negação
+        codes: Dict[str, int] = {}
+        for lex_id, (term, _) in enumerate(unigrams):
+            codes[term] = (lex_id + 1) * 4
+        for term in phrase_starts:
+            codes[term] = codes.get(term, 0) | 2
+        for term in NEGATIONS:
+            codes[term] = codes.get(term, 0) | 1
+        self._codes = codes
+
+    def analyze_batch(self, token_lists: Sequence[Sequence[str]]) -> List[SentimentScore]:
+        n_sentences = len(token_lists)
+        if not n_sentences:
+            return []
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.intp, count=n_sentences)
+        n_tokens = int(lengths.sum())
+        results: List[SentimentScore] = [(0.0, 0.0, "neutro")] * n_sentences
+        if not n_tokens:
+            return results
+
+        # um único lower() em C para todos os tokens (o separador não tem caixa)
+        flat = "\0".join("\0".join(tokens) for tokens in token_lists if tokens).lower().split("\0")
+        if len(flat) != n_tokens:  # tokens com "\0" lá dentro
+            flat = [token.lower() for tokens in token_lists for token in tokens]
+        get = self._codes.get
+        codes = np.fromiter((get(token, 0) for token in flat), dtype=np.int64, count=n_tokens)
+        lex_ids = (codes >> 2) - 1
+        is_negation = (codes & 1).astype(bool)
+        is_phrase_start = (codes & 2).astype(bool)
+
+        sentence_ids = np.repeat(np.arange(n_sentences), lengths)
+        starts = np.cumsum(lengths) - lengths
+
+        # máscara de negação deslocada: o token anterior (na mesma frase) nega
+        negated = np.zeros(n_tokens, dtype=bool)
+        negated[1:] = is_negation[:-1]
+        negated[starts[lengths > 0]] = False
+
+        hit = lex_ids >= 0
+        hit_ids = lex_ids[hit]
+        hit_sentences = sentence_ids[hit]
+        hit_negated = negated[hit]
+
+        polarity = self._polarity[hit_ids]
+        polarity = np.where(hit_negated, -polarity, polarity)
+        subjectivity = self._subjectivity[hit_ids]
+        emotion = self._emotion[hit_ids]
+        emotion = np.where(hit_negated, self._negated_emotion[emotion], emotion)
+
+        hits = np.bincount(hit_sentences, minlength=n_sentences)
+        total_polarity = np.bincount(hit_sentences, weights=polarity, minlength=n_sentences)
+        total_subjectivity = np.bincount(hit_sentences, weights=subjectivity, minlength=n_sentences)
+        n_emotions = len(self.emotions)
+        histogram = np.bincount(
+            hit_sentences * n_emotions + emotion, minlength=n_sentences * n_emotions
+        ).reshape(n_sentences, n_emotions)
+
+        priority_counts = histogram[:, : self._n_priority]
+        best_priority = priority_counts.argmax(axis=1)  # primeira ocorrência do máximo
+        has_priority = priority_counts.max(axis=1) > 0
+
+        scalar_rows = np.bincount(sentence_ids[is_phrase_start], minlength=n_sentences) > 0
+        scalar_rows |= (hits > 0) & ~has_priority
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            polarity_score = (total_polarity / hits).tolist()
+            subjectivity_score = (total_subjectivity / hits).tolist()
+        hits_list = hits.tolist()
+        best_list = best_priority.tolist()
+        scalar_list = scalar_rows.tolist()
+        emotions = self.emotions
+
+        for row, tokens in enumerate(token_lists):
+            if not tokens:
+                continue
+            if scalar_list[row]:
+                results[row] = self._scalar.analyze(list(tokens))
+            elif not hits_list[row]:
+                results[row] = (0.0, 0.1, "neutro")
+            else:
+                results[row] = (polarity_score[row], subjectivity_score[row], emotions[best_list[row]])
+        return results
+
+
+__all__ = ["BatchSentimentAnalyzer"]
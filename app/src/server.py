@@ -0,0 +1,450 @@
+"""
+Serviço HTTP (asyncio, só biblioteca standard) à volta do NLPPipeline.
+
+Os pedidos concorrentes são juntados em micro-lotes (até `max_batch_size`
+frases ou `max_wait_ms` depois da primeira) e processados por um pipeline
+já aquecido: no próprio processo (`workers=0`, numa thread) ou num conjunto
+de processos, cada um com o seu pipeline carregado uma única vez. A fila tem
+tamanho limitado: quando está cheia o serviço responde 503 com `Retry-After`
+em vez de deixar a latência crescer sem limite.
+
+Endpoints:
+    POST /process  {"text": "...", "fields": [...]}     -> output de process()
+    POST /batch    {"texts": ["...", ...], "fields": [...]} -> {"results": [...]}
+    GET  /metrics  formato de texto do Prometheus (fila, lotes, latências, etapas)
+    GET  /health   {"status": "ok"}
+
+Uso (a partir de `app/`):
+    python -m src.server --port 8080 --workers 4 --max-batch-size 64 --max-wait-ms 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from . import pipeline as pipeline_module
+from .instrumentation import DEFAULT_BUCKETS, Histogram, Instrumentation
+from .pipeline import NLPPipeline, PipelineConfig, _init_worker, _process_chunk_in_worker, validate_fields
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class Overloaded(Exception):
+    """A fila de pedidos está cheia."""
+
+
+@dataclass
+class ServerConfig:
+    host: str = "127.0.0.1"
+    port: int = 8080
+    workers: int = 0  # 0 = pipeline no próprio processo
+    max_batch_size: int = 64
+    max_wait_ms: float = 5.0
+    max_queue: int = 1024
+    max_body_bytes: int = 1 << 20
+
+
+class ServerMetrics:
+    """Métricas do serviço (o event loop é single-thread, não precisa de lock)."""
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, int] = dict.fromkeys(
+            ("requests", "sentences", "rejected", "errors", "batches"), 0
+        )
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = Histogram(DEFAULT_BUCKETS)
+        self.latency = Histogram(DEFAULT_BUCKETS)
+
+    def to_prometheus(self, queue_depth: int, in_flight: int, prefix: str = "nlp_server") -> str:
+        lines: List[str] = []
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, value in (("queue_depth", queue_depth), ("batches_in_flight", in_flight)):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        for name, histogram in (
+            ("batch_size", self.batch_size),
+            ("queue_wait_seconds", self.queue_wait),
+            ("request_seconds", self.latency),
+        ):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            cumulative = 0
+            for bound, count in zip([*map(repr, histogram.buckets), "+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{prefix}_{name}_sum {histogram.sum!r}")
+            lines.append(f"{prefix}_{name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class _Item:
+    __slots__ = ("text", "fields", "future", "enqueued")
+
+    def __init__(self, text: str, fields: Optional[Tuple[str, ...]], future: asyncio.Future) -> None:
+        self.text = text
+        self.fields = fields
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+def _warm_worker() -> None:
+    # corre em cada processo worker, depois de `_init_worker`
+    pipeline_module._WORKER_PIPELINE.warmup()
+
+
+class MicroBatcher:
+    """
+    Junta pedidos concorrentes em lotes e processa-os num pipeline aquecido.
+
+    Com `workers=0` usa `pipeline` (ou cria um) numa thread dedicada; com
+    `workers > 1` usa um `ProcessPoolExecutor` com um pipeline por processo.
+    """
+
+    def __init__(self, config: ServerConfig, pipeline: Optional[NLPPipeline] = None) -> None:
+        self.config = config
+        self.metrics = ServerMetrics()
+        self.instrumentation = Instrumentation()
+        self.pipeline = pipeline
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self.in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        workers = self.config.workers
+        if workers > 0:
+            config = None
+            if self.pipeline is not None:
+                config = self.pipeline.config
+                await loop.run_in_executor(None, self.pipeline.prepare_workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(True, None, config)
+            )
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_worker) for _ in range(workers)))
+        else:
+            if self.pipeline is None:
+                self.pipeline = await loop.run_in_executor(None, NLPPipeline, self.instrumentation)
+            elif self.pipeline.instrumentation is None:
+                self.pipeline.instrumentation = self.instrumentation
+            else:
+                self.instrumentation = self.pipeline.instrumentation
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nlp-batch")
+            await loop.run_in_executor(self._executor, self.pipeline.warmup)
+        self._queue = asyncio.Queue(maxsize=self.config.max_queue)
+        self._slots = asyncio.Semaphore(max(1, workers))
+        self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._queue is not None and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if not item.future.done():
+                item.future.set_exception(Overloaded("server is shutting down"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def free_slots(self) -> int:
+        return self.config.max_queue - self.queue_depth
+
+    def submit(self, text: str, fields: Optional[Tuple[str, ...]] = None) -> asyncio.Future:
+        """Põe uma frase na fila; `Overloaded` se a fila estiver cheia."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(_Item(text, fields, future))
+        except asyncio.QueueFull:
+            self.metrics.counters["rejected"] += 1
+            raise Overloaded() from None
+        return future
+
+    async def _collect(self) -> None:
+        queue = self._queue
+        max_size = self.config.max_batch_size
+        max_wait = self.config.max_wait_ms / 1000
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + max_wait
+            while len(batch) < max_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # esperar por um executor livre antes de juntar o lote seguinte
+            await self._slots.acquire()
+            task = asyncio.create_task(self._execute(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _run_chunk(self, texts: List[str], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+        return self.pipeline._process_chunk(texts, fields)[0]
+
+    async def _execute(self, batch: List[_Item]) -> None:
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            started = time.perf_counter()
+            self.metrics.counters["batches"] += 1
+            self.metrics.batch_size.observe(len(batch))
+            for item in batch:
+                self.metrics.queue_wait.observe(started - item.enqueued)
+
+            # pedidos com projeções diferentes no mesmo lote são processados em grupos
+            groups: Dict[Optional[Tuple[str, ...]], List[_Item]] = {}
+            for item in batch:
+                groups.setdefault(item.fields, []).append(item)
+            for fields, items in groups.items():
+                texts = [item.text for item in items]
+                try:
+                    if self.config.workers > 0:
+                        results, _, metrics, pid = await loop.run_in_executor(
+                            self._executor, _process_chunk_in_worker, texts, fields
+                        )
+                        if metrics is not None:
+                            self.instrumentation.merge(metrics, source_pid=pid)
+                    else:
+                        results = await loop.run_in_executor(self._executor, self._run_chunk, texts, fields)
+                except Exception as exc:  # noqa: BLE001 - o erro vai para cada pedido
+                    self.metrics.counters["errors"] += len(items)
+                    for item in items:
+                        if not item.future.done():
+                            item.future.set_exception(exc)
+                    continue
+                for item, result in zip(items, results):
+                    if not item.future.done():
+                        item.future.set_result(result)
+            self.metrics.counters["sentences"] += len(batch)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+
+class NLPServer:
+    """Servidor HTTP/1.1 mínimo (Content-Length, keep-alive) sobre `MicroBatcher`."""
+
+    def __init__(self, config: Optional[ServerConfig] = None, pipeline: Optional[NLPPipeline] = None) -> None:
+        self.config = config or ServerConfig()
+        self.batcher = MicroBatcher(self.config, pipeline)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handlers: set = set()
+
+    @property
+    def port(self) -> int:
+        """Porta efetiva (útil com `port=0` nos testes)."""
+        return self._server.sockets[0].getsockname()[1] if self._server else self.config.port
+
+    async def start(self) -> None:
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.config.host, self.config.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # ligações keep-alive inativas: fechar em vez de esperar pelo cliente
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        await self.batcher.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, keep_alive=False)
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and (version == "HTTP/1.1" or headers.get("connection", "").lower() == "keep-alive")
+                )
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    await self._respond(writer, 411, {"error": "Content-Length required"}, keep_alive=False)
+                    break
+                raw_length = headers.get("content-length", "0") or "0"
+                # só algarismos ASCII: "-5", "abc" ou "1e3" não chegam a `int`/`readexactly`
+                if not (raw_length.isascii() and raw_length.isdigit()):
+                    await self._respond(writer, 400, {"error": "invalid Content-Length"}, keep_alive=False)
+                    break
+                length = int(raw_length)
+                if length > self.config.max_body_bytes:
+                    await self._respond(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload, extra = await self._route(method, target.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        keep_alive: bool,
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        head.extend(f"{name}: {value}" for name, value in (extra_headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Any, Optional[Dict[str, str]]]:
+        if path == "/health":
+            return 200, {"status": "ok", "queue_depth": self.batcher.queue_depth}, None
+        if path == "/metrics":
+            if method != "GET":
+                return 405, {"error": "use GET"}, None
+            batcher = self.batcher
+            text = batcher.metrics.to_prometheus(batcher.queue_depth, batcher.in_flight)
+            return 200, text + batcher.instrumentation.to_prometheus(), None
+        if path not in ("/process", "/batch"):
+            return 404, {"error": f"unknown path {path}"}, None
+        if method != "POST":
+            return 405, {"error": "use POST"}, None
+
+        started = time.perf_counter()
+        metrics = self.batcher.metrics
+        metrics.counters["requests"] += 1
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("expected a JSON object")
+            fields = request.get("fields")
+            fields = validate_fields(fields) if fields is not None else None
+            if path == "/process":
+                texts = [request.get("text")]
+            else:
+                texts = request.get("texts")
+                if not isinstance(texts, list):
+                    raise ValueError("'texts' must be a list of strings")
+            if not all(isinstance(text, str) for text in texts):
+                raise ValueError("texts must be strings")
+        except ValueError as exc:  # inclui JSONDecodeError
+            return 400, {"error": str(exc)}, None
+
+        if len(texts) > self.batcher.free_slots():
+            metrics.counters["rejected"] += 1
+            return 503, {"error": "server overloaded, retry later"}, {"Retry-After": "1"}
+        try:
+            futures = [self.batcher.submit(text, fields) for text in texts]
+        except Overloaded:
+            return 503, {"error": "server overloaded, retry later"}, {"Retry-After": "1"}
+        try:
+            results = await asyncio.gather(*futures)
+        except Exception as exc:  # noqa: BLE001
+            return 500, {"error": f"{type(exc).__name__}: {exc}"}, None
+        finally:
+            metrics.latency.observe(time.perf_counter() - started)
+        if path == "/process":
+            return 200, results[0], None
+        return 200, {"results": results}, None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    defaults = ServerConfig()
+    parser = argparse.ArgumentParser(description="Serviço HTTP do pipeline NLP com micro-batching.")
+    parser.add_argument("--host", default=defaults.host)
+    parser.add_argument("--port", type=int, default=defaults.port)
+    parser.add_argument("--workers", type=int, default=defaults.workers,
+                        help="processos com pipeline (0 = no próprio processo, -1 = todos os cores)")
+    parser.add_argument("--max-batch-size", type=int, default=defaults.max_batch_size)
+    parser.add_argument("--max-wait-ms", type=float, default=defaults.max_wait_ms)
+    parser.add_argument("--max-queue", type=int, default=defaults.max_queue)
+    parser.add_argument("--shared-dictionaries", help="dicionários partilhados pelos workers (criado se faltar)")
+    args = parser.parse_args(argv)
+
+    config = ServerConfig(
+        host=args.host,
+        port=args.port,
+        workers=(os.cpu_count() or 1) if args.workers < 0 else args.workers,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_queue=args.max_queue,
+    )
+    print(f"A servir em http://{config.host}:{config.port} (workers={config.workers})")
+    try:
+        pipeline = None
+        if args.shared_dictionaries:
+            pipeline = NLPPipeline(config=PipelineConfig(shared_dictionaries=args.shared_dictionaries))
+        asyncio.run(NLPServer(config, pipeline).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+__all__ = ["MicroBatcher", "NLPServer", "Overloaded", "ServerConfig", "ServerMetrics", "main"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Dicionários de correção compactos e partilhados entre processos.
+
+Cada `SpellChecker` normal carrega os dicionários PT/EN do pyspellchecker e
+constrói o índice SymSpell: ~350 MB de dicts Python por processo, copiados em
+cada worker. Aqui o processo pai escreve uma única vez um ficheiro imutável:
+
+    cabeçalho | tamanhos das secções | etiqueta | palavras (PT ∪ EN) |
+    frequências PT e EN uint32 | prefixo -> palavras | deleções | deleção -> prefixos
+
+em que palavras e deleções são tabelas de strings UTF-8 com uma tabela de
+dispersão (CRC-32, sondagem linear) para pesquisa em O(1). Os workers abrem o
+ficheiro com `mmap` só de leitura: as páginas vêm da cache do sistema e são
+as mesmas em todos os processos (com `fork` ou `spawn`), sem cópia por
+worker. `SpellChecker(shared_dictionaries=caminho)` cria o ficheiro se ainda
+não existir ou se a etiqueta (versão dos dicionários) não corresponder.
+
+Uso:
+    python -m src.shared_dictionaries -o cache/dicionarios.bin
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+from zlib import crc32
+
+from .compiled_lexicon import _pad4
+from .symspell import SymSpellIndex
+
+LANGUAGES = ("pt", "en")
+
+MAGIC = b"DIC1"
+VERSION = 1
+# magic, versão, distância máxima, comprimento do prefixo, maior palavra PT, maior palavra EN
+_HEADER = struct.Struct("<4sIIIII")
+# secções, pela ordem em que estão no ficheiro (cada uma alinhada a 4 bytes)
+_SECTIONS = (
+    "tag",
+    "word_offsets", "word_strings", "word_slots", "freq_pt", "freq_en",
+    "prefix_starts", "prefix_words",
+    "delete_offsets", "delete_strings", "delete_slots", "delete_starts", "delete_prefixes",
+)
+_DIRECTORY = struct.Struct(f"<{len(_SECTIONS)}I")
+
+
+def _uint32(values: Iterable[int]) -> bytes:
+    column = array("I", values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _string_table(keys: List[bytes]) -> Tuple[bytes, bytes, bytes]:
+    """(offsets, strings, slots) de uma tabela de strings com dispersão por CRC-32."""
+    offsets = array("I", [0])
+    strings = bytearray()
+    for key in keys:
+        strings += key
+        offsets.append(len(strings))
+    size = 1
+    while size < 2 * len(keys):  # ocupação <= 50%
+        size <<= 1
+    mask = size - 1
+    slots = array("I", bytes(4 * size))
+    for index, key in enumerate(keys):
+        slot = crc32(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = index + 1  # 0 = vazio
+    return _uint32(offsets), bytes(strings), _uint32(slots)
+
+
+def write_shared_dictionaries(
+    path: str,
+    dictionaries: Mapping[str, Mapping[str, int]],
+    tag: str,
+    max_distance: int = 2,
+    prefix_length: int = 7,
+) -> None:
+    """
+    Escreve os dicionários `{"pt": {palavra: freq}, "en": ...}` e o respetivo
+    índice SymSpell no formato partilhado (de forma atómica). `tag` identifica
+    a origem dos dicionários (ver `SharedDictionaries.tag`).
+    """
+    index = SymSpellIndex(dictionaries, max_distance, prefix_length)
+    words = sorted({word for language in LANGUAGES for word in dictionaries[language]})
+    word_ids = {word: i for i, word in enumerate(words)}
+    prefixes = sorted(index._by_prefix)
+    prefix_ids = {prefix: i for i, prefix in enumerate(prefixes)}
+    deletes = sorted(index._deletes)
+
+    prefix_starts = [0]
+    prefix_words: List[int] = []
+    for prefix in prefixes:
+        prefix_words.extend(sorted(word_ids[word] for word in index._by_prefix[prefix]))
+        prefix_starts.append(len(prefix_words))
+    delete_starts = [0]
+    delete_prefixes: List[int] = []
+    for delete in deletes:
+        delete_prefixes.extend(sorted(prefix_ids[prefix] for prefix in index._prefixes(delete)))
+        delete_starts.append(len(delete_prefixes))
+
+    word_offsets, word_strings, word_slots = _string_table([word.encode("utf-8") for word in words])
+    delete_offsets, delete_strings, delete_slots = _string_table([delete.encode("utf-8") for delete in deletes])
+    sections = {
+        "tag": tag.encode("utf-8"),
+        "word_offsets": word_offsets,
+        "word_strings": word_strings,
+        "word_slots": word_slots,
+        "freq_pt": _uint32(dictionaries["pt"].get(word, 0) for word in words),
+        "freq_en": _uint32(dictionaries["en"].get(word, 0) for word in words),
+        "prefix_starts": _uint32(prefix_starts),
+        "prefix_words": _uint32(prefix_words),
+        "delete_offsets": delete_offsets,
+        "delete_strings": delete_strings,
+        "delete_slots": delete_slots,
+        "delete_starts": _uint32(delete_starts),
+        "delete_prefixes": _uint32(delete_prefixes),
+    }
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(
+            MAGIC, VERSION, max_distance, prefix_length,
+            index.longest_word_length["pt"], index.longest_word_length["en"],
+        ))
+        f.write(_DIRECTORY.pack(*(len(sections[name]) for name in _SECTIONS)))
+        for name in _SECTIONS:
+            data = sections[name]
+            f.write(data + b"\0" * _pad4(len(data)))
+    os.replace(tmp_path, path)
+
+
+class _StringTable:
+    """Pesquisa de strings (bytes) numa tabela de dispersão mapeada."""
+
+    __slots__ = ("_mm", "_offsets", "_base", "_slots", "_mask", "size")
+
+    def __init__(self, mm: mmap.mmap, offsets, base: int, slots) -> None:
+        self._mm = mm
+        self._offsets = offsets
+        self._base = base
+        self._slots = slots
+        self._mask = len(slots) - 1
+        self.size = len(offsets) - 1
+
+    def find(self, key: bytes) -> int:
+        """Índice de `key`, ou -1."""
+        slots, offsets, mm, base, mask = self._slots, self._offsets, self._mm, self._base, self._mask
+        slot = crc32(key) & mask
+        while True:
+            entry = slots[slot]
+            if not entry:
+                return -1
+            start = base + offsets[entry - 1]
+            end = base + offsets[entry]
+            if end - start == len(key) and mm[start:end] == key:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def string(self, index: int) -> str:
+        return self._mm[self._base + self._offsets[index]:self._base + self._offsets[index + 1]].decode("utf-8")
+
+
+class _DictionaryView(Mapping):
+    """Dicionário palavra -> frequência de uma língua, só de leitura."""
+
+    def __init__(self, words: _StringTable, frequencies) -> None:
+        self._words = words
+        self._frequencies = frequencies
+        self._size: Optional[int] = None
+
+    def __getitem__(self, word: str) -> int:
+        index = self._words.find(word.encode("utf-8"))
+        frequency = self._frequencies[index] if index >= 0 else 0
+        if not frequency:
+            raise KeyError(word)
+        return frequency
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        index = self._words.find(word.encode("utf-8"))
+        return index >= 0 and self._frequencies[index] > 0
+
+    def __len__(self) -> int:
+        if self._size is None:
+            self._size = sum(1 for frequency in self._frequencies if frequency)
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for index, frequency in enumerate(self._frequencies):
+            if frequency:
+                yield self._words.string(index)
+
+
+class SharedSymSpellIndex(SymSpellIndex):
+    """`SymSpellIndex` sobre as tabelas mapeadas (mesmas consultas e resultados, só de leitura)."""
+
+    def __init__(self, shared: "SharedDictionaries") -> None:
+        self.dictionaries = {language: shared.dictionary(language) for language in LANGUAGES}
+        self.max_distance = shared.max_distance
+        self.prefix_length = shared.prefix_length
+        self.longest_word_length = dict(shared.longest_word_length)
+        self._shared = shared
+
+    def _prefixes(self, delete: str) -> Iterable[Hashable]:
+        shared = self._shared
+        index = shared._deletes.find(delete.encode("utf-8"))
+        if index < 0:
+            return ()
+        return shared._delete_prefixes[shared._delete_starts[index]:shared._delete_starts[index + 1]]
+
+    def _terms(self, prefix: Hashable) -> Iterable[str]:
+        shared = self._shared
+        words = shared._words
+        for word in shared._prefix_words[shared._prefix_starts[prefix]:shared._prefix_starts[prefix + 1]]:
+            yield words.string(word)
+
+    def add_words(self, words: Iterable[str]) -> None:
+        raise TypeError("shared dictionaries are read-only")
+
+
+class SharedDictionaries:
+    """
+    Dicionários PT/EN e índice SymSpell mapeados de um ficheiro
+    (`write_shared_dictionaries`). `palavra in shared` diz se a palavra (em
+    minúsculas) existe em PT ou EN com uma só pesquisa.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_distance, prefix_length, longest_pt, longest_en = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not a shared dictionaries file (version {VERSION})")
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.longest_word_length = {"pt": longest_pt, "en": longest_en}
+        sizes = _DIRECTORY.unpack_from(mm, _HEADER.size)
+        view = memoryview(mm)
+        positions: Dict[str, int] = {}
+        columns: Dict[str, object] = {}
+        pos = _HEADER.size + _DIRECTORY.size
+        for name, size in zip(_SECTIONS, sizes):
+            positions[name] = pos
+            if name not in ("tag", "word_strings", "delete_strings"):
+                columns[name] = self._column(view[pos:pos + size])
+            pos += size + _pad4(size)
+        self.tag = mm[positions["tag"]:positions["tag"] + sizes[0]].decode("utf-8")
+        self._mm = mm
+        self._columns = columns
+        self._words = _StringTable(mm, columns["word_offsets"], positions["word_strings"], columns["word_slots"])
+        self._deletes = _StringTable(
+            mm, columns["delete_offsets"], positions["delete_strings"], columns["delete_slots"]
+        )
+        self._frequencies = {"pt": columns["freq_pt"], "en": columns["freq_en"]}
+        self._prefix_starts = columns["prefix_starts"]
+        self._prefix_words = columns["prefix_words"]
+        self._delete_starts = columns["delete_starts"]
+        self._delete_prefixes = columns["delete_prefixes"]
+        self._index: Optional[SharedSymSpellIndex] = None
+
+    @staticmethod
+    def _column(view: memoryview):
+        if sys.byteorder == "little":
+            return view.cast("I")
+        column = array("I", view.tobytes())
+        column.byteswap()
+        return column
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self._words.find(word.encode("utf-8")) >= 0
+
+    def __len__(self) -> int:
+        return self._words.size
+
+    def frequency(self, word: str, language: str) -> int:
+        """Frequência de `word` no dicionário `language` (0 se não existir)."""
+        index = self._words.find(word.encode("utf-8"))
+        return self._frequencies[language][index] if index >= 0 else 0
+
+    def dictionary(self, language: str) -> _DictionaryView:
+        return _DictionaryView(self._words, self._frequencies[language])
+
+    @property
+    def index(self) -> SharedSymSpellIndex:
+        if self._index is None:
+            self._index = SharedSymSpellIndex(self)
+        return self._index
+
+    def close(self) -> None:
+        self._index = None
+        self._words = self._deletes = None
+        for column in self._columns.values():
+            if isinstance(column, memoryview):
+                column.release()
+        self._columns = {}
+        self._mm.close()
+
+
+def open_shared_dictionaries(path: str, tag: Optional[str] = None) -> Optional[SharedDictionaries]:
+    """Abre `path`; None se não existir, não for deste formato ou tiver outra etiqueta."""
+    try:
+        shared = SharedDictionaries(path)
+    except (FileNotFoundError, ValueError, struct.error):
+        return None
+    if tag is not None and shared.tag != tag:
+        shared.close()
+        return None
+    return shared
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Constrói os dicionários de correção partilhados (PT/EN).")
+    parser.add_argument("-o", "--output", required=True, help="ficheiro de saída")
+    args = parser.parse_args(argv)
+
+    from .spellchecker import SpellChecker
+
+    shared = SpellChecker(shared_dictionaries=args.output).shared
+    print(f"{len(shared)} palavras -> {args.output} ({os.path.getsize(args.output) >> 20} MiB)")
+
+
+__all__ = [
+    "SharedDictionaries",
+    "SharedSymSpellIndex",
+    "open_shared_dictionaries",
+    "write_shared_dictionaries",
+]
+
+
+if __name__ == "__main__":
+    main()
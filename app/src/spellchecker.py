@@ -1,46 +1,349 @@
 """
-Spellchecker robusto usando a biblioteca 'pyspellchecker'.
+Spellchecker robusto usando os dicionários da biblioteca 'pyspellchecker'.
 Suporta PT e EN simultaneamente.
+
+A geração de candidatos usa o motor original do pyspellchecker ou
+(`engine="symspell"`) um índice de deleções simétricas
+(`symspell.SymSpellIndex`): ~0,2 ms em vez de ~150 ms por palavra
+desconhecida, mas o índice leva ~8-14 s a construir em cada processo. Por
+omissão o SymSpell só é usado com dicionários partilhados, onde o índice vem
+já feito do ficheiro.
+
+Cada frase tem um dicionário preferido, dado pelo identificador de idioma
+(`src.langid`): EN numa frase inglesa com confiança, PT nas restantes. As
+palavras são procuradas primeiro nesse dicionário e, numa frase inglesa, as
+desconhecidas são corrigidas com o dicionário EN (exceto as que parecem
+claramente portuguesas). Com PT tudo funciona como antes.
 """
 from __future__ import annotations
 
+import json
+import os
 import re
-from dataclasses import dataclass
-from typing import List, Set
-from spellchecker import SpellChecker as PySpellChecker
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .symspell import SymSpellIndex
+
+if TYPE_CHECKING:
+    from spellchecker import SpellChecker as PySpellChecker
+
+    from .langid import LanguageModel
+    from .shared_dictionaries import SharedDictionaries
 
 _WORD_RE = re.compile(r"\b[\wáéíóúàâêôãõçñ']+\b", re.IGNORECASE)
 
-@dataclass
-class Correction:
+
+
+def _word_spans(text: str, token_spans: Sequence[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+    """
+    Converte spans do TOKEN_RE do parser nos spans que `_WORD_RE` daria.
+
+    Cada token é um bloco máximo de letras/apóstrofos; com as fronteiras `\b`
+    o `_WORD_RE` apanha o mesmo bloco sem os apóstrofos das pontas.
+    """
+    for start, end in token_spans:
+        while start < end and text[start] == "'":
+            start += 1
+        while end > start and text[end - 1] == "'":
+            end -= 1
+        if start < end:
+            yield start, end
+
+
+# (palavra conhecida?, sugestão ou None se for para manter)
+CacheEntry = Tuple[bool, Optional[str]]
+
+class Correction(NamedTuple):
     original: str
     corrected: str
     position: int
 
+class CorrectionCache:
+    """
+    Cache LRU limitada palavra -> (conhecida?, sugestão), segura entre threads.
+    As correções com o dicionário EN (frases inglesas) ficam em "en:palavra".
+
+    As entradas são separadas por `version` (a `SpellChecker.version` de quem
+    as calculou: motor, dicionários e modelo de idioma), por isso a mesma
+    cache pode ser partilhada por corretores diferentes sem que um veja as
+    correções do outro. Todas as partições contam para `maxsize`.
+
+    Pode ser guardada em disco (`save`, com a versão de cada entrada) para
+    que um reinício não volte a calcular as correções.
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, maxsize: int = 100_000, path: Optional[str] = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def get(self, word: str, version: str = "") -> Optional[CacheEntry]:
+        key = (version, word)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, word: str, entry: CacheEntry, version: str = "") -> None:
+        key = (version, word)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Grava as entradas (da menos para a mais recente) de forma atómica."""
+        path = path or self.path
+        if not path:
+            raise ValueError("no path given for the correction cache")
+        with self._lock:
+            entries = [
+                [version, word, known, suggestion]
+                for (version, word), (known, suggestion) in self._data.items()
+            ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.FORMAT_VERSION, "entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        """Junta as entradas de `path`; ficheiros noutro formato (ex.: sem versões) são ignorados."""
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != self.FORMAT_VERSION:
+            return
+        for version, word, known, suggestion in payload.get("entries", []):
+            self.put(word, (bool(known), suggestion), version)
+
+
+# Cache partilhada por omissão por todos os SpellChecker do processo.
+DEFAULT_CACHE = CorrectionCache()
+
+
+ENGINES = ("symspell", "pyspellchecker")
+
+
+def default_engine(shared_dictionaries: Optional[str] = None) -> str:
+    """Motor por omissão: SymSpell só quando o índice vem de dicionários partilhados."""
+    return "symspell" if shared_dictionaries is not None else "pyspellchecker"
+
+
+# Termos técnicos ou específicos que os dicionários possam não ter
+CUSTOM_WORDS = frozenset({"streamlit", "app", "python", "code", "olá", "whisper", "software"})
+
+
+def dictionaries_tag() -> str:
+    """Origem dos dicionários (versão do pyspellchecker e termos extra), sem os carregar."""
+    from spellchecker import __version__
+
+    return f"pyspellchecker-{__version__}:{','.join(sorted(CUSTOM_WORDS))}"
+
+
 class SpellChecker:
-    def __init__(self) -> None:
-        # Carregar dicionários completos
+    """
+    Corretor PT/EN. Os dicionários completos (~1s a carregar) só são lidos
+    na primeira palavra a verificar, ou em `warmup()`.
+
+    Com `shared_dictionaries` (caminho de um ficheiro, ver
+    `src.shared_dictionaries`) os dicionários e o índice SymSpell são
+    mapeados desse ficheiro, partilhado por todos os processos, em vez de
+    carregados em cada um; o primeiro processo que precisar dele cria-o.
+
+    `engine` escolhe o motor (ver o docstring do módulo); por omissão
+    `default_engine(shared_dictionaries)`.
+
+    `language_model` (por omissão `langid.default_model()`) escolhe o
+    dicionário preferido de cada frase e das suas palavras desconhecidas.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[CorrectionCache] = None,
+        engine: Optional[str] = None,
+        shared_dictionaries: Optional[str] = None,
+        language_model: Optional["LanguageModel"] = None,
+    ) -> None:
+        if engine is None:
+            engine = default_engine(shared_dictionaries)
+        if engine not in ENGINES:
+            raise ValueError(f"unknown spellchecker engine {engine!r} (expected one of {ENGINES})")
+        if shared_dictionaries is not None and engine != "symspell":
+            raise ValueError("shared dictionaries require the symspell engine")
+        self.engine = engine
+        self.cache = cache if cache is not None else DEFAULT_CACHE
+        self.shared_dictionaries = shared_dictionaries
+        self._index: Optional[SymSpellIndex] = None
+        self._dictionaries: Optional[Tuple["PySpellChecker", "PySpellChecker"]] = None
+        self._shared: Optional["SharedDictionaries"] = None
+        self._language_model = language_model
+        self._load_lock = threading.Lock()
+
+    @property
+    def language_model(self) -> "LanguageModel":
+        if self._language_model is None:
+            from .langid import default_model
+
+            self._language_model = default_model()
+        return self._language_model
+
+    def _load(self) -> Tuple["PySpellChecker", "PySpellChecker"]:
+        """Carrega os dicionários completos (uma vez, mesmo com várias threads)."""
+        with self._load_lock:
+            if self._dictionaries is None:
+                self._dictionaries = self._read_dictionaries()
+        return self._dictionaries
+
+    @staticmethod
+    def _read_dictionaries() -> Tuple["PySpellChecker", "PySpellChecker"]:
+        from spellchecker import SpellChecker as PySpellChecker
+
         print("A carregar dicionários de correção (PT/EN)...")
-        self.spell_pt = PySpellChecker(language='pt')
-        self.spell_en = PySpellChecker(language='en')
-        
-        # Adicionar termos técnicos ou específicos que o dicionário possa não ter
-        custom_words = {"streamlit", "app", "python", "code", "olá", "whisper", "software"}
-        self.spell_pt.word_frequency.load_words(custom_words)
-        self.spell_en.word_frequency.load_words(custom_words)
+        spell_pt = PySpellChecker(language='pt')
+        spell_en = PySpellChecker(language='en')
+        spell_pt.word_frequency.load_words(CUSTOM_WORDS)
+        spell_en.word_frequency.load_words(CUSTOM_WORDS)
+        return spell_pt, spell_en
+
+    @property
+    def shared(self) -> "SharedDictionaries":
+        """Dicionários partilhados (mapeados; o ficheiro é criado se faltar ou estiver desatualizado)."""
+        if self._shared is None:
+            from .shared_dictionaries import open_shared_dictionaries, write_shared_dictionaries
+
+            with self._load_lock:
+                if self._shared is None:
+                    path = self.shared_dictionaries
+                    tag = dictionaries_tag()
+                    shared = open_shared_dictionaries(path, tag)
+                    if shared is None:
+                        # só este processo tem os dicts Python, e só enquanto escreve o ficheiro
+                        spell_pt, spell_en = self._dictionaries or self._read_dictionaries()
+                        write_shared_dictionaries(path, {
+                            "pt": spell_pt.word_frequency.dictionary,
+                            "en": spell_en.word_frequency.dictionary,
+                        }, tag)
+                        shared = open_shared_dictionaries(path, tag)
+                    self._shared = shared
+        return self._shared
+
+    @property
+    def spell_pt(self) -> "PySpellChecker":
+        return (self._dictionaries or self._load())[0]
+
+    @property
+    def spell_en(self) -> "PySpellChecker":
+        return (self._dictionaries or self._load())[1]
+
+    @cached_property
+    def version(self) -> str:
+        """Identifica motor, dicionários e modelo de idioma sem carregar os dicionários (para versões de cache)."""
+        return f"{self.engine}:{dictionaries_tag()}:langid-{self.language_model.tag}"
+
+    def warmup(self) -> None:
+        """Carrega já os dicionários (e o índice SymSpell) em vez de na primeira frase."""
+        if self.shared_dictionaries is not None:
+            self.shared
+            return
+        self._load()
+        if self.engine == "symspell":
+            self.index
+
+    @property
+    def index(self) -> SymSpellIndex:
+        """Índice SymSpell sobre PT+EN, construído na primeira palavra desconhecida."""
+        if self.shared_dictionaries is not None:
+            return self.shared.index
+        if self._index is None:
+            self._index = SymSpellIndex({
+                "pt": self.spell_pt.word_frequency.dictionary,
+                "en": self.spell_en.word_frequency.dictionary,
+            })
+        return self._index
+
+    def _correction(self, word: str, language: str) -> Optional[str]:
+        if self.engine == "symspell":
+            return self.index.correction(word, language)
+        return (self.spell_en if language == "en" else self.spell_pt).correction(word)
+
+    def _is_known(self, word: str, language: str = "pt") -> bool:
+        """Verifica se a palavra existe em PT ou EN (começando pelo dicionário `language`)."""
+        lowered = word.lower()
+        if self.shared_dictionaries is not None:
+            # uma só procura no vocabulário comum aos dois idiomas
+            return lowered in (self._shared or self.shared)
+        spell_pt, spell_en = self._dictionaries or self._load()
+        if language == "en":
+            return lowered in spell_en or lowered in spell_pt
+        return lowered in spell_pt or lowered in spell_en
 
-    def _is_known(self, word: str) -> bool:
-        """Verifica se a palavra existe em PT ou EN."""
-        return (word.lower() in self.spell_pt) or (word.lower() in self.spell_en)
+    def _route(self, word: str, language: str) -> str:
+        """Dicionário das correções de `word` numa frase cujo dicionário preferido é `language`."""
+        if language == "en" and self.language_model.token_language(word) != "pt":
+            return "en"
+        return "pt"
 
-    def _suggest(self, word: str) -> str:
+    def _is_english(self, word: str) -> bool:
+        lowered = word.lower()
+        if self.shared_dictionaries is not None:
+            return (self._shared or self.shared).frequency(lowered, "en") > 0
+        return lowered in self.spell_en
+
+    def _lookup(self, word: str, language: str = "pt") -> CacheEntry:
+        """Calcula a entrada de cache de uma palavra (sem consultar a cache)."""
+        if self._is_known(word, language):
+            return True, None
+        suggestion = self._suggest(word, language)
+        # Se não houver sugestão ou for igual, mantém
+        if not suggestion or suggestion.lower() == word.lower():
+            return False, None
+        return False, suggestion
+
+    def _suggest(self, word: str, language: str = "pt") -> str:
         """
         Tenta corrigir. Prioridade:
         1. Se a palavra for muito parecida com uma PT, corrige para PT.
         2. Se for muito parecida com uma EN, corrige para EN.
+        Com `language="en"` (palavra de uma frase inglesa) só o dicionário EN é usado.
         """
+        if language == "en":
+            return self._correction(word, "en") or word
+
         # Tenta correção em PT primeiro (regra do projeto: default PT)
-        res_pt = self.spell_pt.correction(word)
+        res_pt = self._correction(word, "pt")
         
         # Se o PT não mudou nada ou devolveu a mesma, confiamos
         if res_pt == word:
@@ -48,7 +351,7 @@ class SpellChecker:
             
         # Se o PT mudou, vamos ver se em Inglês a palavra original existia
         # (ex: "date" em ingles não deve virar "data" em pt se o contexto for misto)
-        if word.lower() in self.spell_en:
+        if self._is_english(word):
             return word
             
         return res_pt if res_pt else word
@@ -61,7 +364,40 @@ class SpellChecker:
             return suggestion.capitalize()
         return suggestion
 
-    def correct_sentence(self, text: str) -> tuple[str, List[Correction]]:
+    def _correct_unknown(self, word: str, language: str = "pt") -> Optional[str]:
+        # Gralhas e calão repetidos vêm da cache partilhada (partição desta versão)
+        key = word if language == "pt" else f"{language}:{word}"
+        entry = self.cache.get(key, self.version)
+        if entry is None:
+            entry = self._lookup(word, language)
+            self.cache.put(key, entry, self.version)
+        known, suggestion = entry
+        if known or suggestion is None:
+            return None
+        # Aplicar correção mantendo maiúsculas/minúsculas
+        return self._preserve_case(word, suggestion)
+
+    def correct_word(self, word: str, language: str = "pt") -> Optional[str]:
+        """
+        Correção de uma palavra isolada, como em `correct_sentence` numa frase
+        com dicionário preferido `language`; None se fica igual.
+        """
+        if self._is_known(word, language):
+            return None
+        return self._correct_unknown(word, self._route(word, language))
+
+    def correct_sentence(
+        self,
+        text: str,
+        spans: Optional[Sequence[Tuple[int, int]]] = None,
+        language: Optional[str] = None,
+    ) -> tuple[str, List[Correction]]:
+        """
+        Corrige `text`. `spans` são as posições dos tokens já calculadas pelo
+        `Normalizer` (TOKEN_RE); se vierem, o texto não volta a ser tokenizado.
+        `language` é o dicionário preferido da frase ("pt" ou "en", ver
+        `LanguageGuess.dictionary`); sem ele o idioma é identificado aqui.
+        """
         if not text:
             return "", []
             
@@ -69,31 +405,55 @@ class SpellChecker:
         output: List[str] = []
         cursor = 0
         
-        for match in _WORD_RE.finditer(text):
-            start, end = match.span()
-            word = match.group(0)
+        if spans is not None:
+            word_spans = _word_spans(text, spans)
+        else:
+            word_spans = (m.span() for m in _WORD_RE.finditer(text))
+        if language is None:
+            word_spans = list(word_spans)
+            language = self.language_model.identify(text[start:end] for start, end in word_spans).dictionary
+        for start, end in word_spans:
+            word = text[start:end]
             
             # Adicionar o texto entre palavras (espaços, pontuação)
             output.append(text[cursor:start])
             cursor = end
             
-            # Verificar se a palavra existe
-            if self._is_known(word):
+            # Caminho rápido: palavra conhecida não precisa de cache nem lock
+            if self._is_known(word, language):
                 output.append(word)
                 continue
-                
-            # Se não existe, tentar corrigir
-            suggestion = self._suggest(word)
-            
-            # Se não houver sugestão ou for igual, mantém
-            if not suggestion or suggestion.lower() == word.lower():
+
+            corrected = self._correct_unknown(word, self._route(word, language))
+            if corrected is None:
                 output.append(word)
                 continue
-                
-            # Aplicar correção mantendo maiúsculas/minúsculas
-            corrected = self._preserve_case(word, suggestion)
             output.append(corrected)
-            corrections.append(Correction(original=word, corrected=corrected, position=start))
+            corrections.append(Correction(word, corrected, start))
             
         output.append(text[cursor:])
-        return "".join(output), corrections
\ No newline at end of file
+        return "".join(output), corrections
+
+
+class PassthroughSpellChecker:
+    """Corretor desligado (`PipelineConfig(spellcheck=False)`): o texto fica como está."""
+
+    engine = "off"
+    version = "off"
+
+    def __init__(self, cache: Optional[CorrectionCache] = None) -> None:
+        self.cache = cache if cache is not None else DEFAULT_CACHE
+
+    def warmup(self) -> None:
+        pass
+
+    def correct_word(self, word: str, language: str = "pt") -> Optional[str]:
+        return None
+
+    def correct_sentence(
+        self,
+        text: str,
+        spans: Optional[Sequence[Tuple[int, int]]] = None,
+        language: Optional[str] = None,
+    ) -> tuple[str, List[Correction]]:
+        return text or "", []
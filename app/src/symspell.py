@@ -0,0 +1,263 @@
+"""
+Índice de correção "symmetric delete" (estilo SymSpell).
+
+Em vez de gerar todas as edições a distância 2 de cada palavra desconhecida
+(como faz o pyspellchecker), pré-calcula as deleções dos prefixos de todas as
+palavras dos dicionários. Uma consulta gera apenas as deleções do prefixo da
+palavra (poucas sondagens a um dict) e verifica a distância real dos
+candidatos encontrados.
+
+A ordenação replica `PySpellChecker.correction`: candidatos a distância 1
+antes dos de distância 2, preferência por candidatos que só diferem em
+acentos e, por fim, maior frequência.
+"""
+from __future__ import annotations
+
+import string
+import unicodedata
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Set, Union
+
+_NUMERIC_LIKE = ("nan", "inf", "infinity")
+
+
+def _deletes(term: str, max_distance: int) -> Set[str]:
+    """Todas as variantes de `term` com até `max_distance` letras apagadas."""
+    result = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) <= 1:
+                continue
+            for i in range(len(item)):
+                next_frontier.add(item[:i] + item[i + 1:])
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def damerau_levenshtein(a: str, b: str) -> int:
+    """Distância Damerau-Levenshtein (sem restrições, algoritmo Lowrance-Wagner)."""
+    len_a, len_b = len(a), len(b)
+    infinity = len_a + len_b
+    d = [[0] * (len_b + 2) for _ in range(len_a + 2)]
+    d[0][0] = infinity
+    for i in range(len_a + 1):
+        d[i + 1][0] = infinity
+        d[i + 1][1] = i
+    for j in range(len_b + 1):
+        d[0][j + 1] = infinity
+        d[1][j + 1] = j
+    last_row: Dict[str, int] = {}
+    for i in range(1, len_a + 1):
+        char_a = a[i - 1]
+        last_match_col = 0
+        for j in range(1, len_b + 1):
+            k = last_row.get(b[j - 1], 0)
+            l = last_match_col
+            if char_a == b[j - 1]:
+                cost = 0
+                last_match_col = j
+            else:
+                cost = 1
+            d[i + 1][j + 1] = min(
+                d[i][j] + cost,
+                d[i + 1][j] + 1,
+                d[i][j + 1] + 1,
+                d[k][l] + (i - k - 1) + 1 + (j - l - 1),
+            )
+        last_row[char_a] = i
+    return d[len_a + 1][len_b + 1]
+
+
+def bounded_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Distância Damerau-Levenshtein se for <= `max_distance`, senão `max_distance + 1`.
+
+    Corta o prefixo/sufixo comum e usa uma banda OSA com saída antecipada;
+    o algoritmo completo só corre em diferenças curtas (<= 4 letras), o único
+    caso em que a OSA pode exceder a distância real dentro do limite.
+    """
+    start = 0
+    stop_a, stop_b = len(a), len(b)
+    while start < stop_a and start < stop_b and a[start] == b[start]:
+        start += 1
+    while stop_a > start and stop_b > start and a[stop_a - 1] == b[stop_b - 1]:
+        stop_a -= 1
+        stop_b -= 1
+    a = a[start:stop_a]
+    b = b[start:stop_b]
+    len_a, len_b = len(a), len(b)
+    limit = max_distance + 1
+    if abs(len_a - len_b) > max_distance:
+        return limit
+    if not len_a or not len_b:
+        return max(len_a, len_b)
+    if len_a <= 4 and len_b <= 4:
+        return min(damerau_levenshtein(a, b), limit)
+
+    previous2: List[int] = []
+    previous = [j if j <= max_distance else limit for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [limit] * (len_b + 1)
+        if i <= max_distance:
+            current[0] = i
+        char_a = a[i - 1]
+        row_min = current[0]
+        for j in range(max(1, i - max_distance), min(len_b, i + max_distance) + 1):
+            char_b = b[j - 1]
+            value = previous[j - 1] + (char_a != char_b)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            if value > limit:
+                value = limit
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min >= limit:
+            return limit
+        previous2, previous = previous, current
+    return previous[len_b]
+
+
+def _remove_diacritics(text: str) -> str:
+    nfkd_form = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in nfkd_form if not unicodedata.combining(c))
+
+
+def _should_check(word: str, longest_word_length: int) -> bool:
+    """Mesmo filtro do pyspellchecker (pontuação, números, palavras enormes)."""
+    if len(word) == 1 and word in string.punctuation:
+        return False
+    if len(word) > longest_word_length + 3:
+        return False
+    if word.lower() in _NUMERIC_LIKE:
+        return True
+    try:
+        float(word)
+        return False
+    except ValueError:
+        return True
+
+
+class SymSpellIndex:
+    """
+    Índice de deleções sobre a união de vários dicionários palavra -> frequência.
+
+    Os dicionários são guardados por referência (não são copiados); cada
+    consulta indica qual deles deve fornecer os candidatos.
+    """
+
+    def __init__(
+        self,
+        dictionaries: Mapping[str, Mapping[str, int]],
+        max_distance: int = 2,
+        prefix_length: int = 7,
+    ) -> None:
+        if prefix_length <= max_distance:
+            raise ValueError("prefix_length must be greater than max_distance")
+        self.dictionaries = dictionaries
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.longest_word_length = {
+            name: max((len(w) for w in words), default=0) for name, words in dictionaries.items()
+        }
+        # deleção -> prefixo(s) que a geram (str se for só um, para poupar
+        # memória); prefixo -> palavras com esse prefixo
+        self._deletes: Dict[str, Union[str, List[str]]] = {}
+        self._by_prefix: Dict[str, List[str]] = {}
+        seen: Set[str] = set()
+        for words in dictionaries.values():
+            for word in words:
+                if word in seen:
+                    continue
+                seen.add(word)
+                self._add(word)
+
+    def _add(self, word: str) -> None:
+        prefix = word[: self.prefix_length]
+        words = self._by_prefix.get(prefix)
+        if words is None:
+            words = self._by_prefix[prefix] = []
+            deletes = self._deletes
+            for delete in _deletes(prefix, self.max_distance):
+                existing = deletes.get(delete)
+                if existing is None:
+                    deletes[delete] = prefix
+                elif isinstance(existing, str):
+                    deletes[delete] = [existing, prefix]
+                else:
+                    existing.append(prefix)
+        words.append(word)
+
+    def add_words(self, words: Iterable[str]) -> None:
+        """Indexa palavras acrescentadas aos dicionários depois da construção."""
+        for word in words:
+            prefix = word[: self.prefix_length]
+            if word not in self._by_prefix.get(prefix, ()):
+                self._add(word)
+            for name, dictionary in self.dictionaries.items():
+                if word in dictionary:
+                    self.longest_word_length[name] = max(self.longest_word_length[name], len(word))
+
+    def _prefixes(self, delete: str) -> Iterable[Hashable]:
+        """Prefixos (ou identificadores de prefixo) que geram a deleção `delete`."""
+        prefixes = self._deletes.get(delete, ())
+        return (prefixes,) if isinstance(prefixes, str) else prefixes
+
+    def _terms(self, prefix: Hashable) -> Iterable[str]:
+        """Palavras indexadas com o prefixo `prefix`."""
+        return self._by_prefix[prefix]
+
+    def candidates(self, word: str, dictionary: str) -> List[str]:
+        """
+        Palavras de `dictionary` à menor distância (1 ou 2) de `word`.
+
+        Lista vazia se não houver nenhuma até `max_distance`.
+        """
+        words = self.dictionaries[dictionary]
+        query = word.lower()
+        query_len = len(query)
+        max_distance = self.max_distance
+        best_distance = max_distance + 1
+        best: List[str] = []
+        visited: Set[Hashable] = set()
+        for delete in _deletes(query[: self.prefix_length], max_distance):
+            for prefix in self._prefixes(delete):
+                if prefix in visited:
+                    continue
+                visited.add(prefix)
+                for term in self._terms(prefix):
+                    if abs(len(term) - query_len) > max_distance or term == query or term not in words:
+                        continue
+                    distance = bounded_distance(query, term, max_distance)
+                    if distance < best_distance:
+                        best_distance = distance
+                        best = [term]
+                    elif distance == best_distance:
+                        best.append(term)
+        return best
+
+    def correction(self, word: str, dictionary: str) -> Optional[str]:
+        """Equivalente a `PySpellChecker.correction` sobre `dictionary`."""
+        words = self.dictionaries[dictionary]
+        longest = self.longest_word_length[dictionary]
+        if word.lower() in words or not _should_check(word, longest):
+            return word
+        candidates = self.candidates(word, dictionary)
+        if not candidates:
+            return None
+        # Empates de frequência resolvidos por ordem alfabética (determinístico)
+        candidates.sort()
+        word_no_accents = _remove_diacritics(word)
+        diacritics_candidates = [c for c in candidates if _remove_diacritics(c) == word_no_accents]
+        if diacritics_candidates:
+            return max(diacritics_candidates, key=words.__getitem__)
+        return max(candidates, key=words.__getitem__)
+
+
+__all__ = ["SymSpellIndex", "bounded_distance", "damerau_levenshtein"]
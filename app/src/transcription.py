@@ -0,0 +1,280 @@
+"""
+Motor de transcrição Whisper para áudio longo.
+
+- O idioma é detetado uma única vez, na primeira janela de ~30s com voz, e
+  restringido a PT/EN antes de descodificar (nunca há segunda passagem: um
+  idioma fora de PT/EN é descodificado logo como PT, "pt (forçado)").
+- O áudio é partido em blocos delimitados por silêncio (VAD por energia), com
+  no máximo 30s cada (a janela do Whisper).
+- Os blocos são descodificados num conjunto de processos criados por `fork`
+  depois de o modelo estar carregado: todos partilham as páginas do mesmo
+  modelo (copy-on-write) em vez de cada worker o carregar. Threads não servem
+  aqui: o `transcribe` do Whisper instala hooks de kv-cache no modelo.
+- `stream()` devolve cada bloco (por ordem) assim que está pronto, para o
+  texto poder entrar no pipeline antes de o ficheiro inteiro estar transcrito.
+- O modelo em si é um `ASRBackend` (`src/asr_backends.py`): openai-whisper ou
+  faster-whisper int8; backends sem suporte para `fork` descodificam no
+  próprio processo.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import whisper
+
+    from .asr_backends import ASRBackend
+
+SAMPLE_RATE = 16000  # whisper.audio.SAMPLE_RATE
+WINDOW_SECONDS = 30  # janela de contexto do Whisper
+SUPPORTED_LANGUAGES = ("pt", "en")
+FORCED_LANGUAGE = "pt"
+
+
+@dataclass
+class TranscriptChunk:
+    index: int
+    start: float  # segundos desde o início da gravação
+    end: float
+    text: str
+    language: str
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "start": round(self.start, 2),
+            "end": round(self.end, 2),
+            "text": self.text,
+            "language": self.language,
+        }
+
+
+def frame_rms(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """RMS por frame (sem sobreposição); o último frame incompleto é descartado."""
+    n_frames = len(audio) // frame_length
+    if not n_frames:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * frame_length].reshape(n_frames, frame_length)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def vad_chunks(
+    audio: np.ndarray,
+    sample_rate: int = SAMPLE_RATE,
+    frame_ms: int = 30,
+    min_silence_ms: int = 300,
+    max_chunk_s: float = WINDOW_SECONDS,
+    pad_ms: int = 150,
+    min_energy: float = 1e-4,
+) -> List[Tuple[int, int]]:
+    """
+    Blocos (início, fim) em amostras com voz, cada um com no máximo `max_chunk_s`.
+
+    Um frame tem voz se a energia passar de 3x o ruído de fundo (percentil
+    10), limitado a metade do percentil 90. O limiar é relativo à gravação:
+    uma gravação baixa (RMS ~3e-3) também tem voz. `min_energy` (~-80 dBFS)
+    só descarta silêncio digital e dither. Pausas curtas
+    (< `min_silence_ms`) não cortam; regiões vizinhas são agrupadas até
+    `max_chunk_s` para não descodificar pedaços minúsculos, e regiões mais
+    longas são cortadas no frame mais silencioso dos últimos 5s antes do limite.
+    """
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    rms = frame_rms(audio, frame_length)
+    if not len(rms):
+        return []
+    noise_floor, loud = np.percentile(rms, (10, 90))
+    # sem pausas (voz contínua) o percentil 10 já é voz: limitar a metade do percentil 90
+    threshold = max(min_energy, min(3.0 * float(noise_floor), 0.5 * float(loud)))
+    voiced = rms > threshold
+    if not voiced.any():
+        return []
+
+    # regiões contíguas de voz (em frames)
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    max_frames = max(1, int(max_chunk_s * 1000 / frame_ms))
+    min_gap = max(1, min_silence_ms // frame_ms)
+    pad = pad_ms // frame_ms
+
+    grouped: List[List[int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if grouped and (start - grouped[-1][1] < min_gap or end - grouped[-1][0] <= max_frames):
+            grouped[-1][1] = end
+        else:
+            grouped.append([start, end])
+
+    chunks: List[Tuple[int, int]] = []
+    search = max(1, int(5000 / frame_ms))
+    for start, end in grouped:
+        while end - start > max_frames:
+            window_start = start + max_frames - search
+            cut = window_start + int(np.argmin(rms[window_start:start + max_frames]))
+            chunks.append((start, cut))
+            start = cut
+        chunks.append((start, end))
+
+    n_samples = len(audio)
+    return [
+        (max(0, (start - pad) * frame_length), min(n_samples, (end + pad) * frame_length))
+        for start, end in chunks
+    ]
+
+
+def restrict_language(probs: Dict[str, float]) -> Tuple[str, str]:
+    """
+    (idioma para descodificar, etiqueta) a partir das probabilidades de idioma:
+    o mais provável se for PT ou EN, senão ("pt", "pt (forçado)").
+    """
+    detected = max(probs, key=probs.get)
+    if detected in SUPPORTED_LANGUAGES:
+        return detected, detected
+    return FORCED_LANGUAGE, f"{FORCED_LANGUAGE} (forçado)"
+
+
+def detect_language(model: "whisper.Whisper", audio: np.ndarray) -> Tuple[str, str]:
+    """Deteta o idioma na primeira janela de 30s de `audio` com um modelo openai-whisper (ver `restrict_language`)."""
+    from .asr_backends import WhisperBackend
+
+    return restrict_language(WhisperBackend(model=model).language_probs(audio))
+
+
+# Backend partilhado pelos workers (herdado via fork, nunca serializado).
+_SHARED_BACKEND: Optional["ASRBackend"] = None
+
+
+def _init_decoder(threads: int) -> None:
+    _SHARED_BACKEND.set_threads(threads)
+
+
+def _decode_in_worker(audio: np.ndarray, language: str) -> Tuple[str, List[Dict[str, Any]]]:
+    return _SHARED_BACKEND.decode(audio, language)
+
+
+class TranscriptionEngine:
+    """
+    Transcreve áudio (float32 mono a 16 kHz) por blocos, em paralelo.
+
+    `backend` é um `ASRBackend` (um modelo openai-whisper também serve).
+    `workers <= 1` (ou sistemas sem `fork`, ou backends que não o suportam)
+    descodifica no próprio processo,
+    um pedido de cada vez (várias sessões podem partilhar o motor). O conjunto
+    de processos é criado no primeiro áudio com mais de um bloco e
+    reutilizado; `close()` termina-o.
+    """
+
+    def __init__(
+        self,
+        backend: Union["ASRBackend", "whisper.Whisper"],
+        workers: Optional[int] = None,
+        threads_per_worker: int = 1,
+        max_chunk_s: float = WINDOW_SECONDS,
+    ) -> None:
+        from .asr_backends import ASRBackend, WhisperBackend
+
+        if not isinstance(backend, ASRBackend):
+            backend = WhisperBackend(model=backend)
+        self.backend = backend
+        if workers is None:
+            workers = max(1, (os.cpu_count() or 1) // max(1, threads_per_worker))
+        if not backend.forkable or "fork" not in multiprocessing.get_all_start_methods():
+            workers = 1
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.max_chunk_s = max_chunk_s
+        self._executor: Optional[Executor] = None
+        # o modelo no próprio processo não pode ser usado por duas threads ao mesmo tempo
+        self._model_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+
+    def _pool(self) -> Executor:
+        global _SHARED_BACKEND
+        with self._pool_lock:
+            if self._executor is None:
+                _SHARED_BACKEND = self.backend  # antes do fork, para os workers o herdarem
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                    initializer=_init_decoder,
+                    initargs=(self.threads_per_worker,),
+                )
+            return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stream(self, audio: np.ndarray) -> Iterator[TranscriptChunk]:
+        """Transcreve `audio`, devolvendo os blocos por ordem à medida que ficam prontos."""
+        audio = np.asarray(audio, dtype=np.float32)
+        bounds = vad_chunks(audio, max_chunk_s=self.max_chunk_s)
+        if not bounds:
+            return
+        with self._model_lock:
+            language, label = restrict_language(self.backend.language_probs(audio[bounds[0][0]:]))
+
+        if self.workers <= 1 or len(bounds) == 1:
+            for index, (start, end) in enumerate(bounds):
+                with self._model_lock:
+                    text, segments = self.backend.decode(audio[start:end], language)
+                yield self._chunk(index, start, end, text, label, segments)
+            return
+
+        executor = self._pool()
+        pending: Deque = deque()
+        queued = iter(enumerate(bounds))
+        # no máximo 2 blocos por worker em voo (memória constante em ficheiros longos)
+        for index, (start, end) in queued:
+            pending.append((index, start, end, executor.submit(_decode_in_worker, audio[start:end], language)))
+            if len(pending) >= 2 * self.workers:
+                break
+        while pending:
+            index, start, end, future = pending.popleft()
+            text, segments = future.result()
+            following = next(queued, None)
+            if following is not None:
+                next_index, (next_start, next_end) = following
+                pending.append((
+                    next_index, next_start, next_end,
+                    executor.submit(_decode_in_worker, audio[next_start:next_end], language),
+                ))
+            yield self._chunk(index, start, end, text, label, segments)
+
+    @staticmethod
+    def _chunk(index: int, start: int, end: int, text: str, label: str, segments) -> TranscriptChunk:
+        offset = start / SAMPLE_RATE
+        for segment in segments:
+            segment["start"] += offset
+            segment["end"] += offset
+        return TranscriptChunk(index, offset, end / SAMPLE_RATE, text, label, segments)
+
+    def transcribe(self, audio: np.ndarray) -> Dict[str, Any]:
+        """Transcrição completa: {"text", "language", "chunks"}."""
+        chunks = list(self.stream(audio))
+        return {
+            "text": " ".join(chunk.text for chunk in chunks if chunk.text).strip(),
+            "language": chunks[0].language if chunks else "unknown",
+            "chunks": [chunk.to_dict() for chunk in chunks],
+        }
+
+
+__all__ = [
+    "SAMPLE_RATE",
+    "TranscriptChunk",
+    "TranscriptionEngine",
+    "detect_language",
+    "frame_rms",
+    "restrict_language",
+    "vad_chunks",
+]
@@ -1,20 +1,29 @@
 """Minimal Streamlit UI for the local NLP pipeline."""
 from __future__ import annotations
 
+import time
+
 import streamlit as st
-import os
 
+from src.incremental import IncrementalSession
 from src.pipeline import NLPPipeline
-from src.audio import get_transcriber 
+from src.audio import get_audio_jobs
+from src.audio_jobs import DONE, FAILED
+
+# Intervalo (s) entre verificações enquanto uma gravação está a ser processada
+POLL_INTERVAL_S = 0.5
 
 st.set_page_config(page_title="Analise de Frases", layout="wide")
 st.title("Analisador local de frases e voz")
-st.caption("Processamento: Whisper (Texto) + Librosa (Tom de Voz) + Regras NLP")
+st.caption("Processamento: Whisper (Texto) + RMS/YIN (Tom de Voz) + Regras NLP")
 
 if 'pipeline' not in st.session_state:
     st.session_state.pipeline = NLPPipeline()
 
 pipeline = st.session_state.pipeline
+# A caixa de texto é reanalisada a cada interação: só a parte editada é refeita
+if 'text_session' not in st.session_state:
+    st.session_state.text_session = IncrementalSession(pipeline)
 
 # --- SECÇÃO DE ÁUDIO ---
 st.subheader("🎤 Entrada de Voz")
@@ -24,36 +33,33 @@ audio_value = st.audio_input("Grave a sua voz aqui")
 
 transcribed_text = ""
 voice_analysis = None
+audio_job = None
 
 if audio_value:
-    audio_file_path = "gravacao_temp.wav"
-    with open(audio_file_path, "wb") as f:
-        f.write(audio_value.read())
-    
-    with st.spinner("A processar áudio (Whisper + Librosa)..."):
-        try:
-            transcriber = get_transcriber()
-            
-            # 1. Transcrever Texto (Com filtro PT/EN)
-            result_whisper = transcriber.transcribe(audio_file_path)
-            
-            text_from_voice = result_whisper["text"]
-            detected_lang = result_whisper["language"]
-            
-            transcribed_text = text_from_voice
-            
-            if "pt" in detected_lang:
-                st.success(f"Idioma detetado: Português ({detected_lang})")
-            elif "en" in detected_lang:
-                st.info(f"Idioma detetado: Inglês ({detected_lang})")
-            else:
-                st.warning(f"Idioma: {detected_lang}")
-
-            # 2. Analisar Emoção na Voz
-            voice_analysis = transcriber.analyze_voice_features(audio_file_path)
-            
-        except Exception as e:
-            st.error(f"Erro: {e}. (Verifica se tens o FFmpeg instalado!)")
+    # Cada gravação (SHA-256 dos bytes) é processada uma única vez, numa thread
+    # de fundo partilhada por todas as sessões: os reruns só consultam o estado.
+    audio_job = get_audio_jobs().submit(audio_value.getvalue())
+
+    if audio_job.status == DONE:
+        result_whisper = audio_job.result["transcricao"]
+
+        text_from_voice = result_whisper["text"]
+        detected_lang = result_whisper["language"]
+
+        transcribed_text = text_from_voice
+
+        if "pt" in detected_lang:
+            st.success(f"Idioma detetado: Português ({detected_lang})")
+        elif "en" in detected_lang:
+            st.info(f"Idioma detetado: Inglês ({detected_lang})")
+        else:
+            st.warning(f"Idioma: {detected_lang}")
+
+        voice_analysis = audio_job.result["voz"]
+    elif audio_job.status == FAILED:
+        st.error(f"Erro: {audio_job.error}. (Verifica se tens o FFmpeg instalado!)")
+    else:
+        st.info("⏳ A processar áudio (Whisper + Tom de Voz)...")
 
 # --- MOSTRAR RESULTADOS DA VOZ ---
 if voice_analysis:
@@ -72,7 +78,7 @@ default_text = transcribed_text if transcribed_text else "A Nicole anda de bicic
 text = st.text_area("Texto a analisar", value=default_text, height=100)
 
 if st.button("Analisar Texto") or (text.strip() and transcribed_text):
-    resultado = pipeline.process(text)
+    resultado = st.session_state.text_session.update(text)
     
     # Criar colunas para visualização
     c1, c2, c3 = st.columns(3)
@@ -130,4 +136,10 @@ if st.button("Analisar Texto") or (text.strip() and transcribed_text):
         st.write(f"Subjetividade: `{resultado['subjetividade']}` (0 a 1)")
 
     with st.expander("Ver JSON Técnico"):
-        st.json(resultado)
\ No newline at end of file
+        st.json(resultado)
+
+# Gravação ainda em processamento: voltar a verificar daqui a pouco (o resto da
+# página já foi desenhado e continua a responder).
+if audio_job is not None and not audio_job.finished:
+    time.sleep(POLL_INTERVAL_S)
+    st.rerun()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# os testes importam `src` a partir de app/, como os módulos e os benchmarks
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src import asr_backends
+from src.asr_backends import ASRBackend, select_backend
+from src.transcription import SAMPLE_RATE
+
+
+class _FakeBackend(ASRBackend):
+    """Backend sem modelo: o RTF vem do tamanho pedido."""
+
+    name = "fake"
+    rtf = {"tiny": 0.1, "base": 0.3, "small": 0.9}
+
+    def cache_tag(self):
+        return [self.name, self.model_size]
+
+    def language_probs(self, audio):
+        return {"pt": 0.9, "en": 0.1}
+
+    def decode(self, audio, language):
+        return "", []
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ASRBackend("base")
+
+    class Partial(ASRBackend):
+        def cache_tag(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Partial("base")
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setitem(asr_backends.BACKENDS, "fake", _FakeBackend)
+    clips = {}
+
+    def measure(backend, clip):
+        clips[backend.model_size] = len(clip)
+        return _FakeBackend.rtf[backend.model_size]
+
+    monkeypatch.setattr(asr_backends, "measure_rtf", measure)
+    return clips
+
+
+def test_synthetic_calibration_warns(fake):
+    with pytest.warns(UserWarning, match="synthetic"):
+        backend, measured = select_backend("fake", target_rtf=0.5)
+    assert backend.model_size == "base"
+    assert measured == {"tiny": 0.1, "base": 0.3, "small": 0.9}
+
+
+def test_recorded_calibration_clip_does_not_warn(fake, recwarn):
+    clip = np.zeros(3 * SAMPLE_RATE, dtype=np.float32)
+    backend, _ = select_backend("fake", target_rtf=0.2, clip=clip)
+    assert backend.model_size == "tiny"
+    assert fake["tiny"] == len(clip)
+    assert not [w for w in recwarn if issubclass(w.category, UserWarning)]
@@ -0,0 +1,85 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from src import asr_backends, audio_frontend
+from src.asr_backends import ASRBackend
+from src.audio import AudioTranscriber
+from src.result_cache import ResultCache
+from src.transcription import SAMPLE_RATE
+
+
+class _EchoBackend(ASRBackend):
+    """Backend sem modelo que conta os blocos descodificados."""
+
+    name = "echo"
+    model = None
+    decoded = 0
+
+    def cache_tag(self):
+        return [self.name, self.model_size]
+
+    def language_probs(self, audio):
+        return {"pt": 0.9, "en": 0.1}
+
+    def decode(self, audio, language):
+        type(self).decoded += 1
+        return "olá mundo", []
+
+
+def _wav(seconds=3.0):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = 0.2 * np.sin(2 * np.pi * 180 * t) * ((t * 2.5).astype(int) % 3 != 2)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    monkeypatch.setitem(asr_backends.BACKENDS, "echo", _EchoBackend)
+    monkeypatch.setattr(_EchoBackend, "decoded", 0)
+    loads = []
+    load_clip = audio_frontend.load_clip
+
+    def counting_load_clip(source, *args, **kwargs):
+        loads.append(type(source).__name__)
+        return load_clip(source, *args, **kwargs)
+
+    monkeypatch.setattr(audio_frontend, "load_clip", counting_load_clip)
+    transcriber = AudioTranscriber(backend="echo", workers=1, cache=ResultCache())
+    transcriber.loads = loads
+    yield transcriber
+    transcriber.close()
+
+
+def test_analyze_reuses_transcribe_and_voice_entries(transcriber):
+    data = _wav()
+    transcript = transcriber.transcribe(data)
+    voice = transcriber.analyze_voice_features(data)
+    assert transcript["text"] and _EchoBackend.decoded
+    decoded, loads = _EchoBackend.decoded, len(transcriber.loads)
+
+    analysis = transcriber.analyze(data)
+    assert _EchoBackend.decoded == decoded
+    assert len(transcriber.loads) == loads  # nem sequer descodifica o WAV
+    assert (analysis.text, analysis.language, analysis.voice) == (transcript["text"], transcript["language"], voice)
+    assert analysis.duration == pytest.approx(3.0)
+    assert analysis.chunks == transcript["chunks"]
+
+
+def test_transcribe_reuses_analyze_entries(transcriber):
+    data = _wav()
+    analysis = transcriber.analyze(io.BytesIO(data))
+    decoded, loads = _EchoBackend.decoded, len(transcriber.loads)
+    assert loads == 1
+
+    assert transcriber.transcribe(data)["text"] == analysis.text
+    assert transcriber.analyze_voice_features(data) == analysis.voice
+    assert (_EchoBackend.decoded, len(transcriber.loads)) == (decoded, loads)
@@ -0,0 +1,38 @@
+import json
+
+from src.audio_batch import resume_output
+
+
+def _line(record):
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def test_resume_retries_failed_recordings(tmp_path):
+    path = tmp_path / "chamadas.jsonl"
+    ok_a = _line({"path": "a.wav", "transcricao": {"text": "olá"}})
+    failed = _line({"path": "b.wav", "erro": "RuntimeError: ffmpeg"})
+    ok_c = _line({"path": "c.wav", "transcricao": {"text": "bom dia"}})
+    path.write_bytes(ok_a + failed + ok_c + b'{"path": "d.wav", "transc')
+
+    assert resume_output(str(path)) == {"a.wav", "c.wav"}
+    assert path.read_bytes() == ok_a + ok_c
+
+
+def test_resume_keeps_a_clean_output_untouched(tmp_path):
+    path = tmp_path / "chamadas.jsonl"
+    content = _line({"path": "a.wav"}) + _line({"path": "b.wav"})
+    path.write_bytes(content)
+    mtime = path.stat().st_mtime_ns
+
+    assert resume_output(str(path)) == {"a.wav", "b.wav"}
+    assert path.read_bytes() == content
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_resume_stops_at_the_first_invalid_line(tmp_path):
+    path = tmp_path / "chamadas.jsonl"
+    ok = _line({"path": "a.wav"})
+    path.write_bytes(ok + b"nao e json\n" + _line({"path": "b.wav"}))
+
+    assert resume_output(str(path)) == {"a.wav"}
+    assert path.read_bytes() == ok
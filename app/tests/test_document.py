@@ -0,0 +1,41 @@
+import pytest
+
+from src.document import split_sentences
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Fomos ao mar. Depois jantámos.", ["Fomos ao mar.", "Depois jantámos."]),
+        ("He went out. Then he came back.", ["He went out.", "Then he came back."]),
+        ("I said no. She left.", ["I said no.", "She left."]),
+        ("Chegou às 3.5 h. Ele está feliz!", ["Chegou às 3. 5 h.", "Ele está feliz!"]),
+        ("Comprei pão, leite, etc. Depois saí.", ["Comprei pão, leite, etc.", "Depois saí."]),
+        ("O jogo foi em set. Ganhámos.", ["O jogo foi em set.", "Ganhámos."]),
+    ],
+)
+def test_ordinary_words_end_sentences(text, expected):
+    assert split_sentences(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "O Sr. Silva chegou cedo.",
+        "Ver o art. 5 da lei.",
+        "Nasceu a 3 de set. 2024 em Lisboa.",
+        "The No. 5 bus is late.",
+        "She moved to St. Louis last year.",
+        "Works at Acme Co. Ltd since May.",
+        "J. K. Rowling wrote it.",
+        "Some fruits, e. g. Apples, are sweet.",
+        "O valor é 3.5 por cento.",
+        "Foi ao mar. e voltou.",
+    ],
+)
+def test_abbreviations_do_not_end_sentences(text):
+    assert len(split_sentences(text)) == 1
+
+
+def test_question_and_exclamation_always_end():
+    assert split_sentences("O Dr. Costa saiu? Sim! Voltou.") == ["O Dr. Costa saiu?", "Sim!", "Voltou."]
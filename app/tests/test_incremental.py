@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from src.incremental import IncrementalSession
+from src.nlp_parser import SimpleNLPParser
+from src.pipeline import NLPPipeline, PipelineConfig
+from src.rules import ClassificationResult, RuleBasedClassifier
+
+EXTRA = [
+    "fed up", "really?", "não gosto", "nao gosto disso!", "  eu acho  ,que  sim ?? ", "wow!",
+    "I am not happy at all", "sério?", "The show was great and I think it works.",
+]
+INSERTS = [" ", "a", "?", "!", ",", " nao ", " not ", "happy", "fed", " up", "'", "  ", ".", "x", " feliz ", " really", "İ"]
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    # muitas palavras desconhecidas (a meio de ser escritas): o SymSpell compensa o índice
+    return NLPPipeline(config=PipelineConfig(spellchecker_engine="symspell"))
+
+
+def test_random_edits_match_process(pipeline):
+    rng = random.Random(5)
+    texts = list(generate_corpus(CorpusSpec(size=80, seed=9))) + EXTRA
+    for _ in range(25):
+        session = IncrementalSession(pipeline)
+        target = " ".join(rng.sample(texts, 3))
+        # escrita, alguns caracteres de cada vez
+        for end in list(range(1, len(target), rng.randint(1, 4))) + [len(target)]:
+            assert session.update(target[:end]) == pipeline.process(target[:end])
+        current = target
+        for _ in range(15):
+            position = rng.randint(0, len(current))
+            operation = rng.random()
+            if operation < 0.4:
+                current = current[:position] + rng.choice(INSERTS) + current[position:]
+            elif operation < 0.8:
+                current = current[:position] + current[position + rng.randint(1, 6):]
+            else:
+                current = rng.choice(texts)
+            assert session.update(current) == pipeline.process(current)
+
+
+class _LoudClassifier(RuleBasedClassifier):
+    def classify(self, parsed, text):
+        result = super().classify(parsed, text)
+        return ClassificationResult(result.sentence_type.upper(), result.nature, result.evidences)
+
+
+class _UpperParser(SimpleNLPParser):
+    def parse(self, text, lowered=None, spans=None):
+        return super().parse(text.upper())
+
+
+def test_uses_pipeline_classifier(pipeline):
+    session = IncrementalSession(pipeline)
+    session.update("eu nao gosto")
+    pipeline.classifier = _LoudClassifier()
+    try:
+        text = "eu nao gosto disso!"
+        result = session.update(text)
+        assert result["tipo"] == "NEGAÇÃO"
+        assert result == pipeline.process(text)
+    finally:
+        del pipeline.classifier
+
+
+def test_custom_parser_falls_back_to_process(pipeline):
+    session = IncrementalSession(pipeline)
+    pipeline.parser = _UpperParser()
+    try:
+        text = "Eu acho que sim?"
+        assert session.update(text) == pipeline.process(text)
+        assert session.last_update == {"fallback": 1}
+    finally:
+        del pipeline.parser
@@ -0,0 +1,38 @@
+import time
+
+from src.instrumentation import Instrumentation
+from src.pipeline import NLPPipeline, PipelineConfig
+
+
+class _SlowClassifier:
+    """Classificador que espera (tempo real sem CPU)."""
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+
+    def classify(self, parsed, text):
+        time.sleep(0.05)
+        return self.classifier.classify(parsed, text)
+
+
+def _pipeline():
+    pipeline = NLPPipeline(config=PipelineConfig(spellcheck=False), instrumentation=Instrumentation())
+    pipeline.classifier = _SlowClassifier(pipeline.classifier)
+    return pipeline
+
+
+def test_full_and_projected_paths_record_thread_cpu_time():
+    for fields in (None, ["tipo"]):
+        pipeline = _pipeline()
+        pipeline.process("Eu nao gosto disto!", fields=fields)
+        metrics = pipeline.instrumentation
+        assert metrics.wall["classifier"].sum >= 0.05
+        assert metrics.cpu["classifier"].sum < 0.02
+        assert set(metrics.cpu) == set(metrics.wall)
+        assert metrics.counters["sentences"] == 1
+
+
+def test_projected_path_records_only_the_stages_it_runs():
+    pipeline = _pipeline()
+    pipeline.process("Eu nao gosto disto!", fields=["normalizada"])
+    assert set(pipeline.instrumentation.cpu) == {"normalizer"}
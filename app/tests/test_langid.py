@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+from src.langid import MIN_ENGLISH_WORDS, TOKEN_THRESHOLD, LanguageModel, default_model
+from src.nlp_parser import TOKEN_RE
+
+
+def _words(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+@pytest.fixture(scope="module")
+def model():
+    return default_model()
+
+
+@pytest.mark.parametrize("text", [
+    "Eu acho que sim",
+    "não gosto disto",
+    "O show foi top",
+    "Ok",
+    "OK, vamos embora",
+    "O meeting foi cancelado",
+    "Adorei o feedback do cliente",
+    "bug no deploy de hoje",
+])
+def test_portuguese_sentences_use_the_portuguese_dictionary(model, text):
+    assert model.identify(_words(text)).dictionary == "pt"
+
+
+@pytest.mark.parametrize("text", [
+    "The show was great",
+    "I love it",
+    "this is fine",
+    "The weather is nice today",
+    "Good morning everyone",
+])
+def test_english_sentences_use_the_english_dictionary(model, text):
+    guess = model.identify(_words(text))
+    assert guess.language == "en" and guess.dictionary == "en"
+
+
+def test_a_loanword_does_not_make_a_sentence_english(model):
+    guess = model.identify(_words("O show foi top"))
+    assert guess.language == "pt" and not guess.confident
+
+
+def test_empty_and_tied_sentences_are_portuguese(model):
+    assert model.identify([]) == ("pt", 0.5)
+    assert model.guess(0, 0, 0) == ("pt", 0.5)
+
+
+def test_english_needs_more_english_than_portuguese_words():
+    strong = 8 * TOKEN_THRESHOLD
+    assert LanguageModel.guess(strong, 0, MIN_ENGLISH_WORDS).language == "en"
+    assert LanguageModel.guess(strong, 0, MIN_ENGLISH_WORDS - 1).language == "pt"
+    assert LanguageModel.guess(strong, 3, 3).language == "pt"
+    assert LanguageModel.guess(strong, 2, 3).language == "en"
+
+
+def test_identify_is_the_sum_of_token_evidence(model):
+    rng = random.Random(3)
+    vocabulary = _words("the show foi top eu acho que this is fine não gosto ok data car 3 teh hapy")
+    for _ in range(200):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 8))]
+        totals = [sum(column) for column in zip((0, 0, 0), *(model.evidence(model.token_score(w)) for w in words))]
+        assert model.identify(words) == model.guess(*totals)
+
+
+def test_save_and_load_round_trip(tmp_path, model):
+    path = str(tmp_path / "langid.bin")
+    model.save(path)
+    loaded = LanguageModel.load(path)
+    assert loaded.weights == model.weights
+    assert loaded.tag == model.tag
+    for word in _words("o show foi top the weather"):
+        assert loaded.token_score(word) == model.token_score(word)
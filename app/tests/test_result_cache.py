@@ -0,0 +1,81 @@
+import sqlite3
+
+import pytest
+
+from src import result_cache
+from src.result_cache import ResultCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(result_cache, "time", clock)
+    return clock
+
+
+def _accessed(path, key):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT accessed FROM results WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_disk_hits_do_not_write(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(maxsize=0, path=path)
+    cache.put("a", {"x": 1})
+    changes = cache._db.total_changes
+    for step in range(50):
+        clock.now += 5
+        assert cache.get("a") == {"x": 1}
+    assert cache._db.total_changes == changes
+    assert _accessed(path, "a") == 1_000_000.0
+    cache.close()
+    # gravado de uma vez no fecho, com o último acesso
+    assert _accessed(path, "a") == 1_000_250.0
+
+
+def test_recent_access_is_not_queued(tmp_path, clock):
+    cache = ResultCache(maxsize=0, path=str(tmp_path / "cache.sqlite"))
+    cache.put("a", 1)
+    clock.now += ResultCache.ACCESS_RESOLUTION / 2
+    cache.get("a")
+    assert not cache._accessed
+    clock.now += ResultCache.ACCESS_RESOLUTION
+    cache.get("a")
+    assert cache._accessed == {"a": clock.now}
+
+
+def test_eviction_uses_pending_access_times(tmp_path, clock):
+    cache = ResultCache(maxsize=0, path=str(tmp_path / "cache.sqlite"), max_disk_bytes=50)
+    cache.EVICTION_INTERVAL = 3
+    cache.put("old", "x" * 10)
+    clock.now += 1
+    cache.put("new", "y" * 10)
+    clock.now += ResultCache.ACCESS_RESOLUTION
+    assert cache.get("old") == "x" * 10  # acesso ainda só em memória
+    clock.now += 1
+    cache.put("big", "z" * 30)  # 3.ª escrita: remoção por tamanho
+    assert cache.get("new") is None
+    assert cache.get("old") == "x" * 10
+    assert cache.get("big") == "z" * 30
+
+
+def test_values_survive_reopening(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(path=path, ttl=100)
+    cache.put("a", {"tipo": "pergunta"})
+    cache.close()
+    reopened = ResultCache(path=path, ttl=100)
+    assert reopened.get("a") == {"tipo": "pergunta"}
+    assert reopened.stats()["disk_hits"] == 1
+    assert "disk_entries" not in reopened.stats()
+    assert reopened.stats(disk=True)["disk_entries"] == 1
+    clock.now += 101
+    assert ResultCache(maxsize=0, path=path).get("a") is None
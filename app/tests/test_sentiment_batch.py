@@ -0,0 +1,38 @@
+import random
+
+from benchmarks.corpus import CorpusSpec, generate_corpus
+from src.nlp_parser import SimpleNLPParser
+from src.sentiment import SentimentAnalyzer
+
+EXTRA = [
+    "não gosto disso", "nao gosto", "I am not happy at all", "not happy", "fed up", "I am so fed up",
+    "not fed up", "really?", "sério? não!", "nunca feliz nem triste", "", "wow", "odeio, não odeio",
+]
+CUSTOM = {
+    "feliz": (0.8, 0.6, "alegria"), "bem disposto": (0.5, 0.4, "alegria"),
+    "farto": (-0.6, 0.7, "raiva"), "de saco cheio": (-0.7, 0.8, "raiva"),
+    "estranho": (-0.1, 0.5, "curiosidade"),  # emoção fora de EMOTION_PRIORITY
+}
+
+
+def _token_lists(extra):
+    parser = SimpleNLPParser()
+    texts = list(generate_corpus(CorpusSpec(size=300, seed=4))) + extra
+    random.Random(2).shuffle(texts)
+    return [parser.parse(text).tokens for text in texts]
+
+
+def test_batch_matches_scalar():
+    analyzer = SentimentAnalyzer()
+    token_lists = _token_lists(EXTRA)
+    assert analyzer.analyze_batch(token_lists) == [analyzer.analyze(tokens) for tokens in token_lists]
+
+
+def test_batch_matches_scalar_custom_lexicon():
+    analyzer = SentimentAnalyzer(CUSTOM)
+    extra = EXTRA + [
+        "não estou bem disposto", "estou de saco cheio", "nao feliz", "muito estranho", "não estranho",
+        "feliz estranho estranho", "farto farto feliz",
+    ]
+    token_lists = _token_lists(extra)
+    assert analyzer.analyze_batch(token_lists) == [analyzer.analyze(tokens) for tokens in token_lists]
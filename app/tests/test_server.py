@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import pytest
+
+from src.pipeline import NLPPipeline, PipelineConfig
+from src.server import NLPServer, ServerConfig
+
+
+async def _request(port, method, path, body=None, headers=None, raw=None):
+    """Um pedido HTTP/1.1 (fecha a ligação); devolve (status, headers, corpo)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if raw is None:
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        head = {"Host": "localhost", "Connection": "close", "Content-Length": str(len(data))}
+        head.update(headers or {})
+        raw = (
+            f"{method} {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in head.items()) + "\r\n"
+        ).encode("latin-1") + data
+    writer.write(raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    response_headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    content_type = response_headers.get("content-type", "")
+    return status, response_headers, json.loads(payload) if "json" in content_type else payload.decode()
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return NLPPipeline(config=PipelineConfig(spellcheck=False))
+
+
+def _serve(pipeline, scenario, **config):
+    async def main():
+        server = NLPServer(ServerConfig(port=0, **config), pipeline)
+        await server.start()
+        try:
+            await scenario(server.port)
+        finally:
+            await server.stop()
+
+    asyncio.run(main())
+
+
+def test_process_and_batch_match_pipeline(pipeline):
+    texts = ["Eu não gosto disto!", "I am happy today", "Porque é que saiu?"]
+
+    async def scenario(port):
+        status, _, body = await _request(port, "POST", "/process", {"text": texts[0]})
+        assert status == 200
+        assert body == pipeline.process(texts[0])
+
+        status, _, body = await _request(port, "POST", "/batch", {"texts": texts, "fields": ["tipo", "idioma"]})
+        assert status == 200
+        assert body == {"results": [pipeline.process(text, fields=["tipo", "idioma"]) for text in texts]}
+
+        results = await asyncio.gather(*(_request(port, "POST", "/process", {"text": text}) for text in texts * 5))
+        assert [body for _, _, body in results] == [pipeline.process(text) for text in texts * 5]
+
+        status, _, body = await _request(port, "GET", "/health")
+        assert status == 200 and body["status"] == "ok"
+        status, _, body = await _request(port, "GET", "/metrics")
+        assert status == 200 and "nlp_server_requests_total" in body
+
+    _serve(pipeline, scenario)
+
+
+def test_overload_returns_503_with_retry_after(pipeline):
+    async def scenario(port):
+        status, headers, body = await _request(port, "POST", "/batch", {"texts": ["a", "b", "c"]})
+        assert status == 503
+        assert headers["retry-after"] == "1"
+        assert "overloaded" in body["error"]
+
+    _serve(pipeline, scenario, max_queue=2)
+
+
+@pytest.mark.parametrize(
+    "raw, status",
+    [
+        (b"POST /process HTTP/1.1\r\nContent-Length: abc\r\n\r\n", 400),
+        (b"POST /process HTTP/1.1\r\nContent-Length: -5\r\n\r\n", 400),
+        (b"POST /process HTTP/1.1\r\nContent-Length: 1e3\r\n\r\n", 400),
+        (b"GARBAGE\r\n\r\n", 400),
+        (b"POST /process HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n", 411),
+        (b"POST /process HTTP/1.1\r\nContent-Length: 99999999\r\n\r\n", 413),
+        (b"POST /process HTTP/1.1\r\nContent-Length: 5\r\nConnection: close\r\n\r\n{oops", 400),
+    ],
+)
+def test_malformed_requests_get_an_error_response(pipeline, raw, status):
+    async def scenario(port):
+        got, _, _ = await _request(port, None, None, raw=raw)
+        assert got == status
+        # o servidor continua a responder depois do pedido inválido
+        got, _, _ = await _request(port, "GET", "/health")
+        assert got == 200
+
+    _serve(pipeline, scenario)
+
+
+@pytest.mark.parametrize(
+    "method, path, body, status",
+    [
+        ("POST", "/process", {"text": "olá", "fields": ["nao_existe"]}, 400),
+        ("POST", "/batch", {"texts": "not a list"}, 400),
+        ("POST", "/process", {"text": 3}, 400),
+        ("POST", "/process", [1, 2], 400),
+        ("GET", "/process", None, 405),
+        ("GET", "/nowhere", None, 404),
+    ],
+)
+def test_invalid_payloads(pipeline, method, path, body, status):
+    async def scenario(port):
+        got, _, payload = await _request(port, method, path, body)
+        assert got == status
+        assert "error" in payload
+
+    _serve(pipeline, scenario)
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from src.shared_dictionaries import open_shared_dictionaries, write_shared_dictionaries
+from src.spellchecker import CorrectionCache, SpellChecker, dictionaries_tag
+
+PT = {
+    "casa": 900, "casaco": 40, "caso": 300, "gato": 120, "gata": 60, "não": 5000, "gosto": 700,
+    "coração": 200, "ação": 150, "data": 400, "feliz": 350, "felizmente": 30, "acho": 800, "que": 9000,
+}
+EN = {
+    "house": 800, "cat": 300, "case": 500, "date": 400, "happy": 600, "not": 7000, "the": 20000,
+    "data": 300, "fed": 90, "up": 3000, "heart": 200, "happily": 40,
+}
+ALPHABET = "abcdefghijklmnopqrstuvwxyzãçé"
+
+
+def _misspellings(words, rng):
+    for word in words:
+        yield word
+        yield word.upper()
+        for _ in range(4):
+            chars = list(word)
+            for _ in range(rng.randint(1, 2)):
+                position = rng.randrange(len(chars) + 1)
+                operation = rng.random()
+                if operation < 0.4 and position < len(chars):
+                    chars[position] = rng.choice(ALPHABET)
+                elif operation < 0.7 and position < len(chars):
+                    del chars[position]
+                else:
+                    chars.insert(position, rng.choice(ALPHABET))
+            if chars:
+                yield "".join(chars)
+
+
+@pytest.fixture
+def checkers(tmp_path):
+    from spellchecker import SpellChecker as PySpellChecker
+
+    path = str(tmp_path / "dicionarios.bin")
+    write_shared_dictionaries(path, {"pt": PT, "en": EN}, dictionaries_tag())
+
+    # o mesmo vocabulário carregado no processo, com o índice SymSpell em memória
+    spell_pt, spell_en = PySpellChecker(language=None), PySpellChecker(language=None)
+    spell_pt.word_frequency.load_json(PT)
+    spell_en.word_frequency.load_json(EN)
+    local = SpellChecker(CorrectionCache(), engine="symspell")
+    local._dictionaries = spell_pt, spell_en
+
+    shared = SpellChecker(CorrectionCache(), shared_dictionaries=path)
+    yield local, shared
+    shared.shared.close()
+
+
+def test_file_round_trip(tmp_path):
+    path = str(tmp_path / "dicionarios.bin")
+    write_shared_dictionaries(path, {"pt": PT, "en": EN}, "etiqueta")
+    assert open_shared_dictionaries(path, "outra") is None
+    shared = open_shared_dictionaries(path, "etiqueta")
+    try:
+        assert shared.tag == "etiqueta"
+        assert len(shared) == len(PT.keys() | EN.keys())
+        assert dict(shared.dictionary("pt").items()) == PT
+        assert dict(shared.dictionary("en").items()) == EN
+        assert shared.frequency("data", "en") == 300
+        assert shared.frequency("casa", "en") == 0
+        assert "coração" in shared and "coracao" not in shared
+    finally:
+        shared.close()
+
+
+def test_lookup_matches_in_process_checker(checkers):
+    local, shared = checkers
+    words = list(_misspellings(sorted(PT.keys() | EN.keys()), random.Random(3)))
+    for language in ("pt", "en"):
+        for word in words:
+            assert shared._lookup(word, language) == local._lookup(word, language), (word, language)
+            assert shared.index.correction(word.lower(), language) == local.index.correction(word.lower(), language)
+    # o ficheiro foi reaberto (mesma etiqueta), sem ler os dicionários do pyspellchecker
+    assert shared._dictionaries is None and len(shared.shared) == len(PT.keys() | EN.keys())
+
+
+def test_corrections_match_in_process_checker(checkers):
+    local, shared = checkers
+    for text in ("eu acho que nao gosto da caza", "The caat is not hapy", "Coracao feliz, gatto ou gata?"):
+        assert shared.correct_sentence(text) == local.correct_sentence(text)
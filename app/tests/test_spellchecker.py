@@ -0,0 +1,59 @@
+import json
+
+from src.pipeline import NLPPipeline, PipelineConfig
+from src.spellchecker import CorrectionCache, SpellChecker, default_engine
+
+
+def test_entries_are_partitioned_by_version():
+    cache = CorrectionCache()
+    cache.put("teh", (False, "the"), "symspell:a")
+    assert cache.get("teh", "symspell:a") == (False, "the")
+    assert cache.get("teh", "pyspellchecker:a") is None
+    assert cache.get("teh") is None
+    cache.put("teh", (False, "te"), "pyspellchecker:a")
+    assert cache.get("teh", "symspell:a") == (False, "the")
+    assert cache.stats()["size"] == 2
+
+
+def test_partitions_share_the_size_limit():
+    cache = CorrectionCache(maxsize=2)
+    cache.put("a", (True, None), "v1")
+    cache.put("b", (True, None), "v2")
+    cache.put("c", (True, None), "v1")
+    assert cache.get("a", "v1") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_save_and_load_keep_versions(tmp_path):
+    path = str(tmp_path / "correcoes.json")
+    cache = CorrectionCache(path=path)
+    cache.put("nao", (False, "não"), "symspell:a")
+    cache.put("en:teh", (False, "the"), "symspell:a")
+    cache.put("nao", (False, "nao"), "symspell:b")
+    cache.save()
+
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    assert payload["version"] == CorrectionCache.FORMAT_VERSION
+    assert ["symspell:a", "nao", False, "não"] in payload["entries"]
+
+    reloaded = CorrectionCache(path=path)
+    assert reloaded.get("nao", "symspell:a") == (False, "não")
+    assert reloaded.get("en:teh", "symspell:a") == (False, "the")
+    assert reloaded.get("nao", "symspell:b") == (False, "nao")
+
+
+def test_files_without_versions_are_ignored(tmp_path):
+    path = tmp_path / "antiga.json"
+    path.write_text(json.dumps({"version": 1, "entries": [["nao", False, "não"]]}), encoding="utf-8")
+    cache = CorrectionCache(path=str(path))
+    assert cache.stats()["size"] == 0
+
+
+def test_default_engine_builds_no_index_without_shared_dictionaries(tmp_path):
+    assert default_engine() == "pyspellchecker"
+    assert default_engine(str(tmp_path / "d.bin")) == "symspell"
+    assert SpellChecker().engine == "pyspellchecker"
+    assert SpellChecker(shared_dictionaries=str(tmp_path / "d.bin")).engine == "symspell"
+    assert NLPPipeline().spellchecker.engine == "pyspellchecker"
+    assert NLPPipeline(config=PipelineConfig(spellchecker_engine="symspell")).spellchecker.engine == "symspell"
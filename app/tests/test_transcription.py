@@ -0,0 +1,36 @@
+import numpy as np
+
+from src.transcription import SAMPLE_RATE, vad_chunks
+
+
+def _speech(level, seconds=12.0, seed=0):
+    """Rajadas de ruído (sílabas de ~0,4 s) com pausas, ao nível RMS `level`, sobre ruído de fundo 30 dB abaixo."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    audio = rng.normal(0.0, level / 30, n)
+    envelope = (np.arange(n) // int(0.4 * SAMPLE_RATE)) % 3 != 2
+    audio += envelope * rng.normal(0.0, level, n)
+    return audio.astype(np.float32)
+
+
+def test_quiet_recording_is_not_dropped():
+    audio = _speech(3e-3)
+    chunks = vad_chunks(audio)
+    assert chunks
+    assert chunks[0][0] < SAMPLE_RATE and chunks[-1][1] > len(audio) - SAMPLE_RATE
+
+
+def test_quiet_and_loud_recordings_give_the_same_chunks():
+    assert vad_chunks(_speech(3e-3)) == vad_chunks(_speech(0.1))
+
+
+def test_digital_silence_has_no_chunks():
+    assert vad_chunks(np.zeros(5 * SAMPLE_RATE, dtype=np.float32)) == []
+    dither = np.random.default_rng(1).normal(0.0, 2e-5, 5 * SAMPLE_RATE).astype(np.float32)
+    assert vad_chunks(dither) == []
+
+
+def test_chunks_respect_the_window():
+    chunks = vad_chunks(_speech(0.05, seconds=95.0))
+    assert len(chunks) >= 4
+    assert all(end - start <= 31 * SAMPLE_RATE for start, end in chunks)